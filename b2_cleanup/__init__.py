@@ -1,6 +1,24 @@
 """B2 Cleanup Tool - Clean up unfinished Backblaze B2 large uploads."""
 
-from .core import B2CleanupTool
+__version__ = "0.1.4"
+__all__ = [
+    "AsyncB2CleanupTool",
+    "B2CleanupTool",
+    "CleanupSummary",
+    "ReclaimReport",
+    "SweepReport",
+    "SweepSummary",
+]
 
-__version__ = "0.1.3"
-__all__ = ["B2CleanupTool"]
\ No newline at end of file
+
+def __getattr__(name):
+    # Importing core pulls in b2sdk; defer it so the CLI starts quickly
+    if name == "AsyncB2CleanupTool":
+        from . import aio
+
+        return aio.AsyncB2CleanupTool
+    if name in __all__:
+        from . import core
+
+        return getattr(core, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
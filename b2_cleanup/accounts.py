@@ -0,0 +1,339 @@
+"""Clean up several B2 accounts at once, one worker process per account.
+
+Accounts are listed in a TOML file::
+
+    [[accounts]]
+    name = "production"
+    key_id = "0012345..."
+    key_env = "B2_PRODUCTION_KEY"     # or: key = "K001..."
+    buckets = ["backup-*", "logs"]
+
+    [[accounts]]
+    name = "archive"
+    key_id_env = "B2_ARCHIVE_KEY_ID"
+    key_env = "B2_ARCHIVE_KEY"
+    all_buckets = true
+
+Each account runs in its own process with its own authorized B2Api, so
+accounts do not share a connection pool, a rate limiter or the GIL. Only
+a small AccountSummary per account is sent back, and log lines are
+forwarded to the parent's logging setup, tagged with the account name.
+"""
+
+import logging
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from logging.handlers import QueueHandler, QueueListener
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    import tomli as tomllib
+
+from .core import B2CleanupTool
+
+# Account names double as cache subdirectory names
+_ACCOUNT_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+
+logger = logging.getLogger("B2Cleanup")
+
+
+class Account:
+    """One account of a config file: its credentials and the buckets to clean up."""
+
+    __slots__ = ("name", "key_id", "key", "buckets", "all_buckets")
+
+    def __init__(self, name: str, key_id: str, key: str, buckets=(), all_buckets: bool = False):
+        self.name = name
+        self.key_id = key_id
+        self.key = key
+        self.buckets = list(buckets)
+        self.all_buckets = all_buckets
+
+    def __repr__(self):
+        # Never show the key
+        return f"<Account {self.name!r} key_id={self.key_id!r}>"
+
+
+def _credential(entry: dict, field: str, where: str) -> str:
+    """Read ``field`` from ``entry``, or from the environment variable named by ``field_env``."""
+    env_field = f"{field}_env"
+    if (field in entry) == (env_field in entry):
+        raise ValueError(f"{where}: set exactly one of '{field}' and '{env_field}'")
+    if field in entry:
+        value = entry[field]
+    else:
+        value = os.environ.get(entry[env_field])
+        if not value:
+            raise ValueError(f"{where}: environment variable {entry[env_field]} is not set")
+    if not isinstance(value, str) or not value:
+        raise ValueError(f"{where}: '{field}' must be a non-empty string")
+    return value
+
+
+def read_accounts(path: str):
+    """Read and validate the accounts of a TOML config file.
+
+    Returns:
+        A list of Account objects, in file order.
+
+    Raises:
+        ValueError: If the file is not valid TOML or an account is invalid.
+    """
+    try:
+        with open(path, "rb") as f:
+            config = tomllib.load(f)
+    except tomllib.TOMLDecodeError as e:
+        raise ValueError(f"{path}: {e}")
+    entries = config.get("accounts")
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"{path}: no [[accounts]] tables")
+
+    accounts = []
+    names = set()
+    for number, entry in enumerate(entries, 1):
+        where = f"{path}: account {number}"
+        if not isinstance(entry, dict):
+            raise ValueError(f"{where}: must be an [[accounts]] table, not {entry!r}")
+        name = entry.get("name")
+        if not isinstance(name, str) or not _ACCOUNT_NAME.match(name):
+            raise ValueError(f"{where}: 'name' must be letters, digits, '.', '_' or '-'")
+        if name in names:
+            raise ValueError(f"{where}: duplicate name '{name}'")
+        names.add(name)
+        where = f"{path}: account '{name}'"
+        buckets = entry.get("buckets", [])
+        all_buckets = entry.get("all_buckets", False)
+        if not isinstance(buckets, list) or not all(isinstance(b, str) and b for b in buckets):
+            raise ValueError(f"{where}: 'buckets' must be a list of bucket names or patterns")
+        if not isinstance(all_buckets, bool):
+            raise ValueError(f"{where}: 'all_buckets' must be true or false")
+        if bool(buckets) == all_buckets:
+            raise ValueError(f"{where}: set either 'buckets' or 'all_buckets = true'")
+        unknown = set(entry) - {
+            "name", "key_id", "key_id_env", "key", "key_env", "buckets", "all_buckets"
+        }
+        if unknown:
+            raise ValueError(f"{where}: unknown settings {', '.join(sorted(unknown))}")
+        accounts.append(
+            Account(
+                name,
+                _credential(entry, "key_id", where),
+                _credential(entry, "key", where),
+                buckets,
+                all_buckets,
+            )
+        )
+    return accounts
+
+
+class AccountSummary:
+    """Outcome of cleaning up one account, small enough to send between processes."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.buckets = 0
+        self.found = 0
+        self.skipped = 0
+        self.cancelled = 0
+        self.failed = 0
+        self.remaining = 0
+        # bucket name -> error message, for buckets whose cleanup did not complete
+        self.bucket_errors = {}
+        # Set if the account could not be processed at all, e.g. bad credentials
+        self.error = None
+
+    def add_sweep(self, sweep):
+        """Take the totals of a SweepSummary."""
+        self.buckets = sweep.buckets
+        for summary in sweep.summaries:
+            self.found += summary.found
+            self.skipped += summary.skipped
+            self.cancelled += summary.cancelled
+            self.failed += summary.failed
+            self.remaining += summary.remaining
+        self.bucket_errors = {name: str(error) for name, error in sweep.errors.items()}
+
+    @property
+    def ok(self) -> bool:
+        """True if every bucket was cleaned up without failed cancellations."""
+        return self.error is None and not self.bucket_errors and self.failed == 0
+
+    def __repr__(self):
+        return (
+            f"<AccountSummary {self.name!r} buckets={self.buckets} found={self.found} "
+            f"cancelled={self.cancelled} failed={self.failed}>"
+        )
+
+
+class MultiAccountSummary:
+    """Aggregated outcome of cleaning up several accounts."""
+
+    def __init__(self):
+        self.accounts = []
+
+    def add(self, summary: AccountSummary):
+        self.accounts.append(summary)
+
+    @property
+    def errors(self):
+        """Account name -> error, for accounts that could not be processed."""
+        return {a.name: a.error for a in self.accounts if a.error is not None}
+
+    @property
+    def buckets(self):
+        return sum(a.buckets for a in self.accounts)
+
+    @property
+    def found(self):
+        return sum(a.found for a in self.accounts)
+
+    @property
+    def cancelled(self):
+        return sum(a.cancelled for a in self.accounts)
+
+    @property
+    def failed(self):
+        return sum(a.failed for a in self.accounts)
+
+    @property
+    def remaining(self):
+        return sum(a.remaining for a in self.accounts)
+
+    @property
+    def ok(self) -> bool:
+        return all(a.ok for a in self.accounts)
+
+    def __repr__(self):
+        return (
+            f"<MultiAccountSummary accounts={len(self.accounts)} found={self.found} "
+            f"cancelled={self.cancelled} failed={self.failed} errors={len(self.errors)}>"
+        )
+
+
+class _AccountTag(logging.Filter):
+    """Tag a worker's log records with the account it is working on."""
+
+    account = None
+
+    def filter(self, record):
+        if self.account is not None:
+            record.account = self.account
+            record.msg = f"[{self.account}] {record.msg}"
+        return True
+
+
+_account_tag = _AccountTag()
+
+
+def _init_worker(log_queue, level: int):
+    """Send this worker process's log records to the parent through ``log_queue``."""
+    root = logging.getLogger()
+    root.handlers.clear()
+    handler = QueueHandler(log_queue)
+    handler.addFilter(_account_tag)
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+    logger.setLevel(level)
+
+
+def _run_account(account: Account, tool_options: dict) -> AccountSummary:
+    """Clean up one account with its own tool; runs in a worker process."""
+    _account_tag.account = account.name
+    summary = AccountSummary(account.name)
+    options = dict(tool_options)
+    if options.get("cache_dir"):
+        options["cache_dir"] = os.path.join(options["cache_dir"], account.name)
+    try:
+        tool = B2CleanupTool(override_key_id=account.key_id, override_key=account.key, **options)
+        try:
+            sweep = tool.cleanup_buckets(account.buckets, all_buckets=account.all_buckets)
+        finally:
+            tool.close()
+    except Exception as e:
+        logger.error(f"❌ Account '{account.name}' failed: {e}")
+        summary.error = str(e)
+    else:
+        summary.add_sweep(sweep)
+    finally:
+        _account_tag.account = None
+    return summary
+
+
+class _Redispatch(logging.Handler):
+    """Hand records forwarded from a worker to the parent's logger of the same name."""
+
+    def handle(self, record):
+        logging.getLogger(record.name).handle(record)
+        return True
+
+
+def run_accounts(accounts, processes: int = None, mp_context=None, **tool_options):
+    """Clean up ``accounts`` in parallel, one worker process per account at a time.
+
+    Args:
+        accounts: Account objects, e.g. from read_accounts
+        processes: Number of worker processes (defaults to one per account,
+            up to the number of CPUs)
+        mp_context: Optional multiprocessing context to start workers with
+        **tool_options: B2CleanupTool arguments applied to every account;
+            a ``cache_dir`` gets a subdirectory per account
+
+    Returns:
+        A MultiAccountSummary, with the accounts in the order given.
+    """
+    accounts = list(accounts)
+    if not accounts:
+        raise ValueError("no accounts to clean up")
+    if processes is None:
+        processes = min(len(accounts), os.cpu_count() or 1)
+    if processes < 1:
+        raise ValueError("processes must be at least 1")
+    context = mp_context or multiprocessing.get_context()
+    log_queue = context.Queue()
+    forwarder = QueueListener(log_queue, _Redispatch())
+    forwarder.start()
+    logger.info(f"🏢 Cleaning up {len(accounts)} accounts in {processes} processes")
+    results = {}
+    try:
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(log_queue, logger.level),
+        ) as executor:
+            futures = {
+                executor.submit(_run_account, account, tool_options): account
+                for account in accounts
+            }
+            for future in as_completed(futures):
+                account = futures[future]
+                try:
+                    summary = future.result()
+                except Exception as e:
+                    # The worker itself died, e.g. it was killed
+                    logger.error(f"❌ Account '{account.name}' failed: {e!r}")
+                    summary = AccountSummary(account.name)
+                    summary.error = str(e) or type(e).__name__
+                results[account.name] = summary
+                if summary.error is None:
+                    logger.info(
+                        f"🏢 '{account.name}': {summary.buckets} buckets, {summary.found} found, "
+                        f"{summary.cancelled} cancelled, {summary.failed} failed"
+                    )
+    finally:
+        forwarder.stop()
+        log_queue.close()
+
+    multi = MultiAccountSummary()
+    for account in accounts:
+        multi.add(results[account.name])
+    logger.info(
+        f"✅ {len(multi.accounts)} accounts, {multi.buckets} buckets: {multi.found} found, "
+        f"{multi.cancelled} cancelled, {multi.failed} failed, {len(multi.errors)} accounts failed"
+    )
+    if multi.remaining:
+        logger.info(f"⏳ {multi.remaining} listed uploads left for a later run")
+    return multi
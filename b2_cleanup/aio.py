@@ -0,0 +1,451 @@
+"""Asyncio engine: list and cancel unfinished uploads over one pooled HTTP session.
+
+B2CleanupTool gets its concurrency from threads, because b2sdk is
+synchronous. AsyncB2CleanupTool talks to the B2 native API directly with
+aiohttp instead, so thousands of cancellations can be in flight on a single
+thread, all sharing one keep-alive connection pool.
+
+It needs the ``async`` extra: ``pip install "b2-cleanup[async]"``.
+"""
+
+import asyncio
+import base64
+import logging
+import random
+import time
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from .core import (
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+    CleanupSummary,
+    SummaryLogging,
+    SweepSummary,
+)
+from .core import is_transient as is_transient_sync
+from .credentials import resolve_credentials
+from .deadletter import DeadLetter, DeadLetterWriter
+from .defaults import (
+    DEFAULT_ASYNC_CONCURRENCY,
+    DEFAULT_BUCKET_WORKERS,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+)
+from .filters import UploadFilter
+from .metrics import Metrics
+from .records import UploadRecord
+from .throttle import THROTTLE_STATUSES, parse_retry_after
+
+DEFAULT_REALM_URL = "https://api.backblazeb2.com"
+API_PREFIX = "/b2api/v2/"
+REQUEST_TIMEOUT = 60.0
+# Error codes B2 answers with when the authorization token has to be renewed
+REAUTHORIZE_CODES = ("expired_auth_token", "bad_auth_token")
+
+
+class B2ApiError(Exception):
+    """An error response from the B2 native API."""
+
+    def __init__(self, status: int, code: str, message: str, retry_after: float = None):
+        super().__init__(f"{status} {code}: {message}")
+        self.status = status
+        self.code = code
+        self.retry_after = retry_after
+
+    @property
+    def transient(self) -> bool:
+        return self.status in (408, 429) or self.status >= 500
+
+
+def is_transient(error: Exception) -> bool:
+    """Return True if a failed API call is worth retrying."""
+    if isinstance(error, B2ApiError):
+        return error.transient
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError)) or is_transient_sync(error)
+
+
+class AsyncB2Client:
+    """The few B2 native API calls the cleanup needs, on one aiohttp session.
+
+    The session keeps up to ``connections`` connections alive and reuses
+    them across calls. When B2 reports the authorization token as expired,
+    the client authorizes again, once for all concurrent callers, and
+    repeats the call.
+    """
+
+    def __init__(
+        self,
+        key_id: str,
+        key: str,
+        realm_url: str = DEFAULT_REALM_URL,
+        connections: int = DEFAULT_ASYNC_CONCURRENCY,
+        on_response=None,
+    ):
+        """Initialize the client; nothing is sent until the first call.
+
+        Args:
+            key_id: B2 application key ID
+            key: B2 application key
+            realm_url: Base URL of the authorization endpoint
+            connections: Maximum number of open connections
+            on_response: Optional callable given the status of every API response
+        """
+        self.key_id = key_id
+        self.key = key
+        self.realm_url = realm_url.rstrip("/")
+        self.connections = connections
+        self.on_response = on_response
+        self.account_id = None
+        self.authorizations = 0
+        self._api_url = None
+        self._token = None
+        self._session = None
+        self._auth_lock = None
+
+    def _http(self):
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.connections, limit_per_host=0)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+            )
+            self._auth_lock = asyncio.Lock()
+        return self._session
+
+    async def _response_json(self, response):
+        if self.on_response is not None:
+            self.on_response(response.status)
+        if response.status == 200:
+            return await response.json()
+        try:
+            body = await response.json(content_type=None)
+        except ValueError:
+            body = {}
+        raise B2ApiError(
+            response.status,
+            body.get("code", ""),
+            body.get("message", response.reason or ""),
+            parse_retry_after(response.headers.get("Retry-After")),
+        )
+
+    async def authorize(self, stale_token: str = None):
+        """Authorize the account, unless another caller already replaced ``stale_token``."""
+        session = self._http()
+        async with self._auth_lock:
+            if self._token is not None and self._token != stale_token:
+                return
+            credentials = base64.b64encode(f"{self.key_id}:{self.key}".encode()).decode()
+            url = self.realm_url + API_PREFIX + "b2_authorize_account"
+            async with session.get(url, headers={"Authorization": f"Basic {credentials}"}) as response:
+                body = await self._response_json(response)
+            self.account_id = body["accountId"]
+            self._api_url = body["apiUrl"].rstrip("/")
+            self._token = body["authorizationToken"]
+            self.authorizations += 1
+
+    async def call(self, name: str, payload: dict) -> dict:
+        """POST ``payload`` to the API call ``name`` and return the decoded response."""
+        session = self._http()
+        if self._token is None:
+            await self.authorize()
+        for first_attempt in (True, False):
+            token = self._token
+            url = self._api_url + API_PREFIX + name
+            try:
+                async with session.post(url, json=payload, headers={"Authorization": token}) as response:
+                    return await self._response_json(response)
+            except B2ApiError as e:
+                if not (first_attempt and e.status == 401 and e.code in REAUTHORIZE_CODES):
+                    raise
+            await self.authorize(stale_token=token)
+
+    async def get_bucket_id(self, bucket_name: str) -> str:
+        if self._token is None:
+            await self.authorize()
+        body = await self.call(
+            "b2_list_buckets", {"accountId": self.account_id, "bucketName": bucket_name}
+        )
+        if not body["buckets"]:
+            raise ValueError(f"Bucket '{bucket_name}' not found or not accessible")
+        return body["buckets"][0]["bucketId"]
+
+    async def list_unfinished_large_files(
+        self, bucket_id: str, start_file_id: str = None, max_file_count: int = DEFAULT_PAGE_SIZE,
+        prefix: str = None,
+    ) -> dict:
+        payload = {"bucketId": bucket_id, "maxFileCount": max_file_count}
+        if start_file_id is not None:
+            payload["startFileId"] = start_file_id
+        if prefix:
+            payload["namePrefix"] = prefix
+        return await self.call("b2_list_unfinished_large_files", payload)
+
+    async def cancel_large_file(self, file_id: str) -> dict:
+        return await self.call("b2_cancel_large_file", {"fileId": file_id})
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class AsyncB2CleanupTool(SummaryLogging):
+    """Clean up unfinished large file uploads with asyncio instead of threads.
+
+    Listing runs as one task that feeds a queue, drained by ``concurrency``
+    cancellation tasks, so cancelling starts with the first page. At most
+    ``max_in_flight`` listed uploads wait for or undergo cancellation, so
+    memory stays bounded. Use it as an async context manager, or
+    call ``close`` when done::
+
+        async with AsyncB2CleanupTool(concurrency=1000) as tool:
+            summary = await tool.cleanup_unfinished_uploads("my-bucket")
+    """
+
+    def __init__(
+        self,
+        dry_run: bool = False,
+        override_key_id: str = None,
+        override_key: str = None,
+        concurrency: int = DEFAULT_ASYNC_CONCURRENCY,
+        max_in_flight: int = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        bucket_workers: int = DEFAULT_BUCKET_WORKERS,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        dead_letter_file: str = None,
+        prefix: str = None,
+        older_than: float = None,
+        exclude=(),
+        metrics_file: str = None,
+        realm_url: str = DEFAULT_REALM_URL,
+        keep_results: bool = False,
+    ):
+        """Initialize the tool.
+
+        Args:
+            dry_run: If True, only list uploads but don't cancel them
+            override_key_id: Optional B2 key ID to override env/config
+            override_key: Optional B2 application key to override env/config
+            concurrency: Number of cancellations in flight at once per bucket
+            max_in_flight: Maximum number of listed uploads of a bucket waiting
+                to be cancelled at any time (defaults to four per worker)
+            page_size: Number of unfinished files requested per listing page
+            bucket_workers: Number of buckets cleaned up at once by
+                cleanup_buckets; the connection pool holds
+                ``concurrency * bucket_workers`` connections
+            max_retries: Number of times a transiently failing call is retried
+            dead_letter_file: Optional JSON Lines file that failed cancellations
+                are written to
+            prefix: Only clean up uploads whose file name starts with this
+            older_than: Only clean up uploads started at least this many seconds ago
+            exclude: Glob patterns of file names to leave alone
+            metrics_file: Optional file Prometheus metrics are written to on close
+            realm_url: Base URL of the B2 authorization endpoint
+            keep_results: If True, summaries list every cancelled upload in
+                ``results``, not just the failed ones
+
+        Raises:
+            RuntimeError: If aiohttp is not installed or no credentials are found.
+        """
+        if aiohttp is None:
+            raise RuntimeError(
+                'The async engine needs aiohttp: pip install "b2-cleanup[async]"'
+            )
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        if max_in_flight is None:
+            max_in_flight = concurrency * 4
+        if max_in_flight < concurrency:
+            raise ValueError("max_in_flight must be at least the concurrency")
+        if bucket_workers < 1:
+            raise ValueError("bucket_workers must be at least 1")
+        if not 1 <= page_size <= MAX_PAGE_SIZE:
+            raise ValueError(f"page_size must be between 1 and {MAX_PAGE_SIZE}")
+        if max_retries < 0:
+            raise ValueError("max_retries cannot be negative")
+        if older_than is not None and older_than < 0:
+            raise ValueError("older_than cannot be negative")
+        self.dry_run = dry_run
+        self.concurrency = concurrency
+        self.max_in_flight = max_in_flight
+        self.page_size = page_size
+        self.bucket_workers = bucket_workers
+        self.max_retries = max_retries
+        self.prefix = prefix
+        self.older_than = older_than
+        self.exclude = tuple(exclude)
+        self.metrics_file = metrics_file
+        self.keep_results = keep_results
+        self.logger = logging.getLogger("B2Cleanup")
+        self.metrics = Metrics()
+        self.dead_letters = DeadLetterWriter(dead_letter_file) if dead_letter_file else None
+        self.client = AsyncB2Client(
+            *resolve_credentials(override_key_id, override_key, self.logger),
+            realm_url=realm_url,
+            connections=concurrency * bucket_workers,
+            on_response=self._on_response,
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """Close the HTTP session and the dead-letter file, and write the metrics."""
+        await self.client.close()
+        if self.dead_letters is not None:
+            self.dead_letters.close()
+        self.metrics.finish()
+        if self.metrics_file is not None:
+            self.metrics.write_textfile(self.metrics_file)
+
+    def _on_response(self, status: int):
+        if status in THROTTLE_STATUSES:
+            self.metrics.throttled.inc()
+
+    async def _with_retries(self, call, *args):
+        """Await ``call(*args)``, retrying transient errors with jittered backoff.
+
+        Returns:
+            A ``(result, attempts)`` tuple.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await call(*args), attempt + 1
+            except Exception as e:
+                if not is_transient(e) or attempt == self.max_retries:
+                    e.attempts = attempt + 1
+                    raise
+                delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+                if isinstance(e, B2ApiError) and e.retry_after:
+                    delay = max(delay, e.retry_after)
+                self.metrics.retries.inc()
+                self.logger.warning(
+                    "🔁 Retrying %s(%s) in %.1fs (attempt %d of %d): %s",
+                    call.__name__, args[0], delay, attempt + 2, self.max_retries + 1, e,
+                )
+                await asyncio.sleep(delay)
+
+    async def cleanup_unfinished_uploads(self, bucket_name: str) -> CleanupSummary:
+        """Find and cancel the unfinished uploads in ``bucket_name``.
+
+        Returns:
+            A CleanupSummary describing what was found and cancelled.
+        """
+        summary = CleanupSummary(bucket_name, keep_results=self.keep_results)
+        bucket_id, _ = await self._with_retries(self.client.get_bucket_id, bucket_name)
+        upload_filter = None
+        if self.older_than is not None or self.exclude:
+            upload_filter = UploadFilter(older_than=self.older_than, exclude=self.exclude)
+        queue = asyncio.Queue()
+        # Taken for each queued upload and given back once it is cancelled
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+        workers = []
+        if not self.dry_run:
+            workers = [
+                asyncio.ensure_future(self._cancel_worker(queue, in_flight, summary))
+                for _ in range(self.concurrency)
+            ]
+        try:
+            await self._list(bucket_id, upload_filter, queue, in_flight, summary)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+        if upload_filter is not None:
+            summary.skipped = upload_filter.skipped
+            self.metrics.skipped.inc(summary.skipped, bucket=bucket_name)
+        self._log_outcome(summary)
+        return summary
+
+    async def _list(self, bucket_id, upload_filter, queue, in_flight, summary):
+        cursor = None
+        while True:
+            start = time.perf_counter()
+            response, _ = await self._with_retries(
+                self.client.list_unfinished_large_files, bucket_id, cursor, self.page_size, self.prefix
+            )
+            self.metrics.list_seconds.observe(time.perf_counter() - start)
+            file_dicts = response["files"]
+            if upload_filter is not None:
+                file_dicts = filter(upload_filter, file_dicts)
+            for file_dict in file_dicts:
+                record = UploadRecord.from_file_dict(file_dict, summary.bucket_name)
+                summary.found += 1
+                self.metrics.found.inc(bucket=summary.bucket_name)
+                if self.dry_run:
+                    self._log_file(summary, "💡 Dry run: would cancel %s (%s)", record)
+                else:
+                    self._log_file(summary, "🗑️ Cancelling %s (%s)", record)
+                    await in_flight.acquire()
+                    queue.put_nowait(record)
+                self._log_progress(summary)
+            cursor = response.get("nextFileId")
+            if cursor is None:
+                return
+
+    async def _cancel_worker(self, queue, in_flight, summary: CleanupSummary):
+        while True:
+            record = await queue.get()
+            if record is None:
+                return
+            try:
+                await self._cancel_one(record, summary)
+            finally:
+                in_flight.release()
+
+    async def _cancel_one(self, record: UploadRecord, summary: CleanupSummary):
+        file_id, file_name = record.file_id, record.file_name
+        start = time.perf_counter()
+        try:
+            await self._with_retries(self.client.cancel_large_file, file_id)
+        except Exception as e:
+            self.logger.error(
+                "❌ Failed to cancel %s (%s) after %d attempt(s): %s",
+                file_id, file_name, e.attempts, e,
+                extra={"bucket": summary.bucket_name, "file_id": file_id, "file_name": file_name},
+            )
+            summary.record(file_id, file_name, e)
+            self.metrics.failed.inc(bucket=summary.bucket_name)
+            if self.dead_letters is not None:
+                self.dead_letters.write(
+                    DeadLetter(summary.bucket_name, file_id, file_name, str(e), e.attempts)
+                )
+        else:
+            summary.record(file_id, file_name)
+            self.metrics.cancelled.inc(bucket=summary.bucket_name)
+        finally:
+            self.metrics.cancel_seconds.observe(time.perf_counter() - start)
+
+    async def cleanup_buckets(self, bucket_names) -> SweepSummary:
+        """Clean up several buckets concurrently, up to ``bucket_workers`` at a time.
+
+        A bucket that cannot be cleaned up is recorded in the returned
+        summary and does not stop the others.
+        """
+        sweep = SweepSummary()
+        slots = asyncio.Semaphore(self.bucket_workers)
+
+        async def cleanup(bucket_name):
+            async with slots:
+                return await self.cleanup_unfinished_uploads(bucket_name)
+
+        results = await asyncio.gather(
+            *(cleanup(name) for name in bucket_names), return_exceptions=True
+        )
+        for bucket_name, result in zip(bucket_names, results):
+            if isinstance(result, Exception):
+                self.logger.error("❌ Processing of bucket '%s' failed: %s", bucket_name, result)
+                sweep.add_error(bucket_name, result)
+            else:
+                sweep.add(result)
+        return sweep
@@ -0,0 +1,89 @@
+"""Budgets that bound how long a run takes and how much it does."""
+
+import threading
+import time
+
+# Reasons a run stopped early, as reported in CleanupSummary.stopped
+TIME = "time"
+CANCELLATIONS = "cancellation"
+API_CALLS = "API call"
+
+
+class RunBudget:
+    """Limits on a run's wall-clock time, cancellations and API calls.
+
+    One budget is shared by every bucket of a run, so the limits apply to
+    the run as a whole; the clock starts when the budget is created. Calls
+    are taken from the budget before they are made, so a run never goes
+    over its limits, apart from the calls already in flight when time runs
+    out.
+    """
+
+    def __init__(self, max_duration: float = None, max_cancels: int = None, max_api_calls: int = None):
+        """Initialize the budget.
+
+        Args:
+            max_duration: Seconds after which no new call is started
+            max_cancels: Maximum number of uploads to cancel (or, in a dry
+                run, to report)
+            max_api_calls: Maximum number of listing and cancellation calls
+
+        Raises:
+            ValueError: If a limit is not positive.
+        """
+        for name, limit in [
+            ("max_duration", max_duration),
+            ("max_cancels", max_cancels),
+            ("max_api_calls", max_api_calls),
+        ]:
+            if limit is not None and limit <= 0:
+                raise ValueError(f"{name} must be positive")
+        self.max_duration = max_duration
+        self.max_cancels = max_cancels
+        self.max_api_calls = max_api_calls
+        self.deadline = None if max_duration is None else time.monotonic() + max_duration
+        self.cancels = 0
+        self.api_calls = 0
+        self._lock = threading.Lock()
+
+    def _calls_exhausted(self):
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return TIME
+        if self.max_api_calls is not None and self.api_calls >= self.max_api_calls:
+            return API_CALLS
+        return None
+
+    @property
+    def out_of_calls(self):
+        """The limit stopping further API calls (time or calls), or None."""
+        with self._lock:
+            return self._calls_exhausted()
+
+    @property
+    def exhausted(self):
+        """The limit that has been reached, or None while the budget lasts."""
+        with self._lock:
+            reason = self._calls_exhausted()
+            if reason is None and self.max_cancels is not None and self.cancels >= self.max_cancels:
+                reason = CANCELLATIONS
+            return reason
+
+    def take_call(self) -> bool:
+        """Take one API call from the budget; False if time or calls have run out."""
+        with self._lock:
+            if self._calls_exhausted() is not None:
+                return False
+            self.api_calls += 1
+            return True
+
+    def take_cancel(self, api_call: bool = True) -> bool:
+        """Take one cancellation (and, with ``api_call``, its call); False if out of budget."""
+        with self._lock:
+            if self._calls_exhausted() is not None:
+                return False
+            if self.max_cancels is not None and self.cancels >= self.max_cancels:
+                return False
+            self.cancels += 1
+            if api_call:
+                self.api_calls += 1
+            return True
@@ -0,0 +1,140 @@
+"""Caches with expiry, optionally persisted between runs in JSON files."""
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+from b2sdk.v2 import AbstractCache
+
+BUCKET_CACHE_FILE = "buckets.json"
+DEFAULT_BUCKET_CACHE_TTL = 3600
+
+
+class PersistedTtlCache:
+    """Entries stamped with the time they were saved, valid for ``ttl`` seconds.
+
+    Every entry is a dict with a ``"saved"`` timestamp. When a ``path`` is
+    given, entries are loaded from that JSON file, skipping expired and
+    malformed ones, and ``_save`` writes them back atomically. Subclasses
+    hold ``_lock`` while they use ``_entries``.
+    """
+
+    def __init__(self, path: str = None, ttl: float = None):
+        """Initialize the cache.
+
+        Args:
+            path: Optional JSON file to persist the cache in
+            ttl: Number of seconds an entry stays valid
+        """
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _is_fresh(self, entry, now: float = None) -> bool:
+        if now is None:
+            now = time.time()
+        return now - entry.get("saved", 0) < self.ttl
+
+    def _load(self):
+        if self.path is None:
+            return {}
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(entries, dict):
+            return {}
+        now = time.time()
+        return {
+            key: entry
+            for key, entry in entries.items()
+            if isinstance(entry, dict) and self._is_fresh(entry, now)
+        }
+
+    def _save(self) -> bool:
+        """Write the entries to the cache file, replacing it atomically.
+
+        Returns:
+            False if the file could not be written; the cache is only an
+            optimization, so this never fails a run.
+        """
+        if self.path is None:
+            return True
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".")
+            with os.fdopen(fd, "w") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+            return True
+        except OSError:
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+            return False
+
+
+class BucketIdCache(PersistedTtlCache, AbstractCache):
+    """Cache bucket name to ID lookups for a limited time.
+
+    Plugged into ``B2Api`` as its cache, this lets ``get_bucket_by_name``
+    skip the ``b2_list_buckets`` call for buckets looked up recently. Entries
+    older than ``ttl`` seconds are ignored, so a bucket that was deleted and
+    recreated under the same name is picked up again. When a ``path`` is
+    given the cache is kept in that JSON file, so later runs benefit too.
+    """
+
+    def __init__(self, path: str = None, ttl: float = DEFAULT_BUCKET_CACHE_TTL):
+        """Initialize the cache.
+
+        Args:
+            path: Optional JSON file to persist the cache in
+            ttl: Number of seconds an entry stays valid
+        """
+        super().__init__(path, ttl)
+
+    def _fresh(self):
+        now = time.time()
+        return {
+            name: entry["id"]
+            for name, entry in self._entries.items()
+            if self._is_fresh(entry, now)
+        }
+
+    def get_bucket_id_or_none_from_bucket_name(self, name):
+        with self._lock:
+            return self._fresh().get(name)
+
+    def get_bucket_name_or_none_from_allowed(self):
+        return None
+
+    def get_bucket_name_or_none_from_bucket_id(self, bucket_id):
+        with self._lock:
+            for name, id_ in self._fresh().items():
+                if id_ == bucket_id:
+                    return name
+        return None
+
+    def list_bucket_names_ids(self):
+        with self._lock:
+            return sorted(self._fresh().items())
+
+    def save_bucket(self, bucket):
+        with self._lock:
+            self._entries[bucket.name] = {"id": bucket.id_, "saved": time.time()}
+            self._save()
+
+    def set_bucket_name_cache(self, buckets):
+        now = time.time()
+        with self._lock:
+            self._entries = {
+                name: {"id": id_, "saved": now}
+                for name, id_ in self._name_id_iterator(buckets)
+            }
+            self._save()
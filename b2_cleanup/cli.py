@@ -1,52 +1,574 @@
 """Command-line interface for B2 cleanup tool."""
 
 import os
-import logging
+import signal
+import sys
+import threading
 import click
 from datetime import datetime
-from .core import B2CleanupTool
+from . import __version__
+from .defaults import (
+    DEFAULT_ASYNC_CONCURRENCY,
+    DEFAULT_BUCKET_WORKERS,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_STORAGE_PRICE,
+    DEFAULT_WORKERS,
+    MAX_PAGE_SIZE,
+    ORDERS,
+)
+from .filters import parse_duration, parse_shard
+from .logs import LOG_FORMATS, setup_logging
+
+
+def _duration(ctx, param, value):
+    if value is None:
+        return None
+    try:
+        return parse_duration(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+
+def _shard(ctx, param, value):
+    if value is None:
+        return None
+    try:
+        return parse_shard(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+
+def default_log_file():
+    """Return the default log file path, in the current directory."""
+    return os.path.join(os.getcwd(), f"b2-cleanup-{datetime.now().strftime('%Y-%m-%d')}.log")
+
+
+def _run_async(buckets, **tool_kwargs):
+    import asyncio
+
+    from .aio import AsyncB2CleanupTool
+
+    async def run():
+        async with AsyncB2CleanupTool(**tool_kwargs) as tool:
+            if len(buckets) == 1:
+                return await tool.cleanup_unfinished_uploads(buckets[0])
+            return await tool.cleanup_buckets(buckets)
+
+    try:
+        return asyncio.run(run())
+    except (RuntimeError, ValueError) as e:
+        raise click.ClickException(str(e))
+
+
+def _run_accounts(accounts_file, processes, **tool_options):
+    from .accounts import read_accounts, run_accounts
+
+    try:
+        accounts = read_accounts(accounts_file)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    return run_accounts(accounts, processes=processes, **tool_options)
 
-# Define a default log file path
-log_file = os.path.join(os.getcwd(), f"b2-cleanup-{datetime.now().strftime('%Y-%m-%d')}.log")
 
 @click.command()
-@click.argument("bucket", required=False)
+@click.version_option(__version__, prog_name="b2-cleanup")
+@click.argument("buckets", nargs=-1)
+@click.option("--all-buckets", is_flag=True, help="Clean up every accessible bucket")
 @click.option("--dry-run", is_flag=True, help="List only, don't delete anything")
 @click.option("--key-id", help="B2 application key ID (overrides env vars)")
 @click.option("--key", help="B2 application key (overrides env vars)")
 @click.option("--non-interactive", is_flag=True, help="Disable interactive prompts")
 @click.option("--log-file", help="Path to log file", default=None)
-def cli(bucket, dry_run, key_id, key, non_interactive, log_file=None):
-    """Clean up unfinished B2 large file uploads in the specified bucket.
-    
+@click.option(
+    "--log-format",
+    type=click.Choice(LOG_FORMATS),
+    default="text",
+    show_default=True,
+    help="Log lines as text, or as JSON objects (one per line)",
+)
+@click.option(
+    "--verbose",
+    is_flag=True,
+    help="Log every upload, not just the first ones of each bucket",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help=(
+        f"Number of concurrent cancellation workers "
+        f"[default: {DEFAULT_WORKERS}, or {DEFAULT_ASYNC_CONCURRENCY} with --engine async]"
+    ),
+)
+@click.option(
+    "--max-in-flight",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Maximum listed uploads awaiting cancellation [default: 4 x workers]",
+)
+@click.option(
+    "--page-size",
+    type=click.IntRange(1, MAX_PAGE_SIZE),
+    default=DEFAULT_PAGE_SIZE,
+    show_default=True,
+    help="Unfinished uploads requested per listing page",
+)
+@click.option(
+    "--bucket-workers",
+    type=click.IntRange(min=1),
+    default=DEFAULT_BUCKET_WORKERS,
+    show_default=True,
+    help="Number of buckets cleaned up concurrently",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    envvar="B2_CLEANUP_CACHE_DIR",
+    default=None,
+    help="Directory to cache the B2 authorization in between runs",
+)
+@click.option(
+    "--state-file",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Checkpoint journal; an interrupted run resumes where it left off",
+)
+@click.option(
+    "--max-retries",
+    type=click.IntRange(min=0),
+    default=DEFAULT_MAX_RETRIES,
+    show_default=True,
+    help="Retries for a cancellation that fails with a transient error",
+)
+@click.option(
+    "--dead-letter",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="JSON Lines file to write cancellations that failed for good to",
+)
+@click.option(
+    "--replay",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help="Retry the cancellations recorded in a dead-letter file",
+)
+@click.option("--prefix", default=None, help="Only clean up uploads whose name starts with this")
+@click.option(
+    "--older-than",
+    callback=_duration,
+    default=None,
+    help="Only clean up uploads started at least this long ago, e.g. 30m, 12h, 7d",
+)
+@click.option(
+    "--exclude",
+    multiple=True,
+    help="Glob pattern of file names to leave alone (repeatable)",
+)
+@click.option(
+    "--report",
+    is_flag=True,
+    help="Report the storage held by unfinished uploads and its cost, without cancelling",
+)
+@click.option(
+    "--sample",
+    type=click.IntRange(min=1),
+    default=None,
+    help="With --report, count the parts of only this many random uploads per bucket",
+)
+@click.option(
+    "--price-per-gb",
+    type=click.FloatRange(min=0),
+    default=DEFAULT_STORAGE_PRICE,
+    show_default=True,
+    help="Storage price in USD per GB-month, for --report cost estimates",
+)
+@click.option(
+    "--plan",
+    "plan_file",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Write the uploads that would be cancelled to this plan file instead of cancelling them",
+)
+@click.option(
+    "--apply",
+    "apply_file",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help="Cancel the uploads listed in a plan file, without listing buckets again",
+)
+@click.option(
+    "--shard",
+    callback=_shard,
+    default=None,
+    help="Only handle uploads whose file ID hashes into shard INDEX of COUNT, e.g. 2/4 "
+    "(auto/COUNT claims a free shard; needs --lease-dir)",
+)
+@click.option(
+    "--lease-dir",
+    type=click.Path(file_okay=False),
+    default=None,
+    help="Shared directory where shards are claimed with lease files",
+)
+@click.option(
+    "--partition",
+    "partitions",
+    multiple=True,
+    help="Name prefix to list concurrently with the other partitions (repeatable)",
+)
+@click.option(
+    "--auto-partition",
+    is_flag=True,
+    help="List each bucket's top-level folders concurrently",
+)
+@click.option(
+    "--metrics-file",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Write Prometheus metrics to this file at the end of the run (textfile collector)",
+)
+@click.option(
+    "--metrics-port",
+    type=click.IntRange(0, 65535),
+    default=None,
+    help="Serve Prometheus metrics on this local port while running",
+)
+@click.option(
+    "--engine",
+    type=click.Choice(["threads", "async"]),
+    default="threads",
+    show_default=True,
+    help="Run on b2sdk with a thread pool, or on asyncio (needs the async extra)",
+)
+@click.option(
+    "--watch",
+    callback=_duration,
+    default=None,
+    help="Keep running, cleaning up every INTERVAL, e.g. 10m",
+)
+@click.option(
+    "--rescan",
+    callback=_duration,
+    default=None,
+    help="With --watch, list the buckets only this often, e.g. 1h [default: every tick]",
+)
+@click.option(
+    "--max-duration",
+    callback=_duration,
+    default=None,
+    help="Start no new calls after this long, e.g. 45m; what is left is reported",
+)
+@click.option(
+    "--max-cancels",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Cancel at most this many uploads in this run",
+)
+@click.option(
+    "--max-api-calls",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Make at most this many listing and cancellation calls in this run",
+)
+@click.option(
+    "--order",
+    type=click.Choice(ORDERS),
+    default="listing",
+    show_default=True,
+    help="Cancel uploads as they are listed, or list each bucket and cancel the oldest first",
+)
+@click.option(
+    "--accounts",
+    "accounts_file",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help="TOML file of accounts, keys and buckets to clean up, each in its own process",
+)
+@click.option(
+    "--account-workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of accounts cleaned up concurrently [default: one per account, up to the CPU count]",
+)
+def cli(
+    buckets,
+    all_buckets,
+    dry_run,
+    key_id,
+    key,
+    non_interactive,
+    log_file=None,
+    log_format="text",
+    verbose=False,
+    workers=None,
+    max_in_flight=None,
+    page_size=DEFAULT_PAGE_SIZE,
+    bucket_workers=DEFAULT_BUCKET_WORKERS,
+    cache_dir=None,
+    state_file=None,
+    max_retries=DEFAULT_MAX_RETRIES,
+    dead_letter=None,
+    replay=None,
+    prefix=None,
+    older_than=None,
+    exclude=(),
+    report=False,
+    sample=None,
+    price_per_gb=DEFAULT_STORAGE_PRICE,
+    plan_file=None,
+    apply_file=None,
+    shard=None,
+    lease_dir=None,
+    partitions=(),
+    auto_partition=False,
+    metrics_file=None,
+    metrics_port=None,
+    engine="threads",
+    watch=None,
+    rescan=None,
+    max_duration=None,
+    max_cancels=None,
+    max_api_calls=None,
+    order="listing",
+    accounts_file=None,
+    account_workers=None,
+):
+    """Clean up unfinished B2 large file uploads in the specified buckets.
+
+    BUCKETS may be bucket names or glob patterns such as 'backup-*'. Several
+    buckets are cleaned up in parallel, sharing a single authorization.
     If no bucket is specified, you'll be prompted to select one from your available buckets.
+    With --accounts, the accounts and buckets are read from a config file instead.
     """
-    # Use the global log_file if not specified via CLI
+    if all_buckets and buckets:
+        raise click.UsageError("--all-buckets cannot be combined with bucket names")
+    if replay and (buckets or all_buckets):
+        raise click.UsageError("--replay cannot be combined with bucket names or --all-buckets")
+    if report and replay:
+        raise click.UsageError("--report cannot be combined with --replay")
+    if apply_file and (buckets or all_buckets or replay or report or plan_file):
+        raise click.UsageError(
+            "--apply cannot be combined with bucket names, --all-buckets, --replay, --report or --plan"
+        )
+    if plan_file and (replay or report):
+        raise click.UsageError("--plan cannot be combined with --replay or --report")
+    if partitions and auto_partition:
+        raise click.UsageError("--partition cannot be combined with --auto-partition")
+    if prefix and any(not partition.startswith(prefix) for partition in partitions):
+        raise click.UsageError("every --partition must start with --prefix")
+    if lease_dir and not shard:
+        raise click.UsageError("--lease-dir requires --shard")
+    if shard and shard[0] is None and not lease_dir:
+        raise click.UsageError("--shard auto/COUNT requires --lease-dir")
+    if sample is not None and not report:
+        raise click.UsageError("--sample requires --report")
+    if rescan is not None and watch is None:
+        raise click.UsageError("--rescan requires --watch")
+    if watch is not None:
+        if not watch:
+            raise click.BadParameter("must be positive", param_hint="--watch")
+        if replay or apply_file or report or plan_file or state_file:
+            raise click.UsageError(
+                "--watch cannot be combined with --replay, --apply, --report, --plan or --state-file"
+            )
+        if not buckets and not all_buckets:
+            raise click.UsageError("--watch requires bucket names or --all-buckets")
+    if max_duration is not None and not max_duration:
+        raise click.BadParameter("must be positive", param_hint="--max-duration")
+    budgeted = max_duration is not None or max_cancels is not None or max_api_calls is not None
+    if budgeted and (report or watch is not None):
+        raise click.UsageError(
+            "--max-duration, --max-cancels and --max-api-calls cannot be combined with --report or --watch"
+        )
+    if order != "listing" and (replay or apply_file or report or watch is not None):
+        raise click.UsageError(
+            "--order only applies to listed buckets, not --replay, --apply, --report or --watch"
+        )
+    if account_workers is not None and not accounts_file:
+        raise click.UsageError("--account-workers requires --accounts")
+    if accounts_file:
+        unsupported = {
+            "bucket names": buckets,
+            "--all-buckets": all_buckets,
+            "--key-id": key_id,
+            "--key": key,
+            "--state-file": state_file,
+            "--dead-letter": dead_letter,
+            "--replay": replay,
+            "--report": report,
+            "--plan": plan_file,
+            "--apply": apply_file,
+            "--lease-dir": lease_dir,
+            "--metrics-file": metrics_file,
+            "--metrics-port": metrics_port,
+            "--engine async": engine == "async",
+            "--watch": watch,
+        }
+        used = [option for option, value in unsupported.items() if value]
+        if used:
+            raise click.UsageError(f"--accounts cannot be combined with {', '.join(used)}")
+
+    if workers is None:
+        workers = DEFAULT_ASYNC_CONCURRENCY if engine == "async" else DEFAULT_WORKERS
+    if max_in_flight is not None and max_in_flight < workers:
+        raise click.BadParameter(
+            f"must be at least the number of workers ({workers})", param_hint="--max-in-flight"
+        )
+    if engine == "async":
+        unsupported = {
+            "--all-buckets": all_buckets,
+            "--cache-dir": cache_dir,
+            "--state-file": state_file,
+            "--replay": replay,
+            "--report": report,
+            "--plan": plan_file,
+            "--apply": apply_file,
+            "--shard": shard,
+            "--partition": partitions,
+            "--auto-partition": auto_partition,
+            "--metrics-port": metrics_port,
+            "--watch": watch,
+            "--max-duration": max_duration,
+            "--max-cancels": max_cancels,
+            "--max-api-calls": max_api_calls,
+            "--order": order != "listing",
+        }
+        used = [option for option, value in unsupported.items() if value]
+        if used:
+            raise click.UsageError(f"--engine async does not support {', '.join(used)}")
+
+    # b2sdk is slow to import; only load it once we actually need it
+    from .core import B2CleanupTool, is_bucket_pattern
+
+    if engine == "async" and (not buckets or any(map(is_bucket_pattern, buckets))):
+        raise click.UsageError("--engine async needs plain bucket names")
+
     if log_file is None:
-        log_file = globals()['log_file']
-        
-    logger = logging.getLogger()
-    logger.setLevel(logging.INFO)
-    if logger.hasHandlers():
-        logger.handlers.clear()
-
-    file_handler = logging.FileHandler(log_file)
-    file_handler.setFormatter(
-        logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
-    )
-    logger.addHandler(file_handler)
-
-    stream_handler = logging.StreamHandler()
-    stream_handler.setFormatter(logging.Formatter("%(message)s"))
-    logger.addHandler(stream_handler)
-
-    tool = B2CleanupTool(
-        dry_run=dry_run,
-        override_key_id=key_id,
-        override_key=key,
-    )
-    
-    tool.cleanup_unfinished_uploads(bucket, interactive=not non_interactive)
+        log_file = default_log_file()
+    listener = setup_logging(log_file, log_format, verbose=verbose)
+    try:
+        if engine == "async":
+            summary = _run_async(
+                buckets,
+                dry_run=dry_run,
+                override_key_id=key_id,
+                override_key=key,
+                concurrency=workers,
+                max_in_flight=max_in_flight,
+                page_size=page_size,
+                bucket_workers=bucket_workers,
+                max_retries=max_retries,
+                dead_letter_file=dead_letter,
+                prefix=prefix,
+                older_than=older_than,
+                exclude=exclude,
+                metrics_file=metrics_file,
+            )
+            if not summary.ok:
+                sys.exit(1)
+            return
+        if accounts_file:
+            summary = _run_accounts(
+                accounts_file,
+                account_workers,
+                dry_run=dry_run,
+                workers=workers,
+                max_in_flight=max_in_flight,
+                page_size=page_size,
+                bucket_workers=bucket_workers,
+                cache_dir=cache_dir,
+                max_retries=max_retries,
+                prefix=prefix,
+                older_than=older_than,
+                exclude=exclude,
+                shard=shard,
+                partitions=partitions,
+                auto_partition=auto_partition,
+                max_duration=max_duration,
+                max_cancels=max_cancels,
+                max_api_calls=max_api_calls,
+                order=order,
+            )
+            if not summary.ok:
+                sys.exit(1)
+            return
+        tool = B2CleanupTool(
+            dry_run=dry_run,
+            override_key_id=key_id,
+            override_key=key,
+            workers=workers,
+            max_in_flight=max_in_flight,
+            page_size=page_size,
+            bucket_workers=bucket_workers,
+            cache_dir=cache_dir,
+            state_file=state_file,
+            max_retries=max_retries,
+            dead_letter_file=dead_letter,
+            prefix=prefix,
+            older_than=older_than,
+            exclude=exclude,
+            plan_file=plan_file,
+            shard=shard,
+            lease_dir=lease_dir,
+            partitions=partitions,
+            auto_partition=auto_partition,
+            metrics_file=metrics_file,
+            metrics_port=metrics_port,
+            max_duration=max_duration,
+            max_cancels=max_cancels,
+            max_api_calls=max_api_calls,
+            order=order,
+        )
+
+        # Set once the run has finished; a failed run discards its plan file
+        ok = False
+        try:
+            if watch is not None:
+                stop = threading.Event()
+                # Let a service manager stop the watch between ticks
+                signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+                tool.watch(
+                    buckets,
+                    all_buckets=all_buckets,
+                    interval=watch,
+                    rescan_interval=rescan,
+                    stop=stop,
+                )
+                ok = True
+                return
+            if replay:
+                summary = tool.replay_dead_letters(replay)
+            elif apply_file:
+                try:
+                    summary = tool.apply_plan(apply_file)
+                except ValueError as e:
+                    raise click.ClickException(str(e))
+            # A single plain bucket name (or none) keeps the interactive single-bucket flow
+            elif not all_buckets and len(buckets) <= 1 and not any(map(is_bucket_pattern, buckets)):
+                bucket = buckets[0] if buckets else None
+                if report:
+                    summary = tool.report_reclaimable(
+                        bucket,
+                        interactive=not non_interactive,
+                        sample=sample,
+                        price_per_gb=price_per_gb,
+                    )
+                else:
+                    summary = tool.cleanup_unfinished_uploads(bucket, interactive=not non_interactive)
+            elif report:
+                summary = tool.report_buckets(
+                    buckets, all_buckets=all_buckets, sample=sample, price_per_gb=price_per_gb
+                )
+            else:
+                summary = tool.cleanup_buckets(buckets, all_buckets=all_buckets)
+            ok = True
+        finally:
+            tool.close(ok=ok)
+    finally:
+        # Flush queued log lines before exiting
+        listener.stop()
+    if not summary.ok:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -1,14 +1,305 @@
 """Core functionality for B2 cleanup tool."""
 
 import os
-import json
-import subprocess
 import logging
-import difflib  # Add this import at the top
-from b2sdk.v2 import InMemoryAccountInfo, B2Api
+import fnmatch
+import heapq
+import itertools
+import math
+import random
+import tempfile
+import threading
+import time
+from functools import cached_property
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
 
+import requests
+from b2sdk.v2 import InMemoryAccountInfo, SqliteAccountInfo, B2Api, B2HttpApiConfig
+from b2sdk.v2.exception import B2Error, MissingAccountData
 
-class B2CleanupTool:
+from .budget import RunBudget
+from .cache import BUCKET_CACHE_FILE, BucketIdCache
+from .credentials import resolve_credentials
+from .deadletter import DeadLetter, DeadLetterWriter, read_dead_letters
+from .defaults import (
+    DEFAULT_BUCKET_WORKERS,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_STORAGE_PRICE,
+    DEFAULT_WORKERS,
+    MAX_PAGE_SIZE,
+    OLDEST_FIRST_LIMIT,
+    ORDERS,
+)
+from .filters import UploadFilter, shard_of
+from .journal import CheckpointJournal
+from .lease import ShardLease
+from .listing import UnfinishedFileLister, discover_partitions, merge_pages
+from .matching import BucketNameIndex
+from .metrics import Metrics
+from .plan import PlanEntry, PlanWriter, read_plan
+from .records import UploadRecords
+from .report import (
+    PART_CACHE_FILE,
+    PartTotalCache,
+    ReclaimReport,
+    SweepReport,
+    count_part_bytes,
+    format_bytes,
+)
+from .throttle import THROTTLE_STATUSES, AdaptiveLimiter, parse_retry_after
+
+ACCOUNT_CACHE_FILE = "account_info.sqlite"
+PROGRESS_INTERVAL = 1000
+# Uploads per bucket logged one line each at INFO; the rest are logged at DEBUG
+LOGGED_FILES = 100
+# Retry backoff for transient cancellation failures, in seconds
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+
+
+def is_bucket_pattern(name: str) -> bool:
+    """Return True if ``name`` is a glob pattern rather than a bucket name."""
+    return any(c in name for c in "*?[")
+
+
+def is_transient(error: Exception) -> bool:
+    """Return True if a failed API call is worth retrying."""
+    if isinstance(error, B2Error):
+        return error.should_retry_http()
+    return isinstance(
+        error,
+        (ConnectionError, TimeoutError, requests.ConnectionError, requests.Timeout),
+    )
+
+
+def _batched(iterable, size: int):
+    """Yield lists of up to ``size`` consecutive items from ``iterable``."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class CleanupResults:
+    """The per-file outcomes of a cleanup, as ``(file_id, file_name, error)`` tuples.
+
+    Outcomes are stored column-wise, with errors kept only for the files
+    that failed, so a bucket with millions of uploads costs two list slots
+    per upload instead of a tuple each.
+    """
+
+    def __init__(self):
+        self._file_ids = []
+        self._file_names = []
+        self._errors = {}
+
+    def append(self, file_id: str, file_name: str, error: Exception = None):
+        if error is not None:
+            self._errors[len(self._file_ids)] = error
+        self._file_ids.append(file_id)
+        self._file_names.append(file_name)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self._file_ids)
+        return self._file_ids[index], self._file_names[index], self._errors.get(index)
+
+    def __len__(self):
+        return len(self._file_ids)
+
+    def __iter__(self):
+        errors = self._errors
+        for index, (file_id, file_name) in enumerate(zip(self._file_ids, self._file_names)):
+            yield file_id, file_name, errors.get(index)
+
+
+class CleanupSummary:
+    """Per-bucket outcome of a cleanup run."""
+
+    def __init__(self, bucket_name: str = None, keep_results: bool = False):
+        self.bucket_name = bucket_name
+        self.keep_results = keep_results
+        self.found = 0
+        self.skipped = 0
+        self.cancelled = 0
+        self.failed = 0
+        # Uploads found but left for a later run when the budget ran out
+        self.remaining = 0
+        self.stopped = None
+        # Failed cancellations only, unless keep_results asks for every outcome:
+        # memory then stays flat however many uploads a bucket has
+        self.results = CleanupResults()
+
+    def record(self, file_id: str, file_name: str, error: Exception = None):
+        """Record the outcome of a single cancellation."""
+        if error is not None or self.keep_results:
+            self.results.append(file_id, file_name, error)
+        if error is None:
+            self.cancelled += 1
+        else:
+            self.failed += 1
+
+    @property
+    def ok(self) -> bool:
+        """True if no cancellation failed."""
+        return self.failed == 0
+
+    def __repr__(self):
+        return (
+            f"<CleanupSummary bucket={self.bucket_name!r} found={self.found} "
+            f"cancelled={self.cancelled} failed={self.failed}>"
+        )
+
+
+class _PageProgress:
+    """Cancellations still outstanding for one listing page."""
+
+    def __init__(self, next_cursor: str = None):
+        self.next_cursor = next_cursor
+        self.pending = 0
+        self.listed = False
+
+
+class SweepSummary:
+    """Aggregated outcome of cleaning up several buckets."""
+
+    def __init__(self):
+        self.summaries = []
+        self.errors = {}
+
+    def add(self, summary: CleanupSummary):
+        """Add the summary of a bucket that was cleaned up."""
+        self.summaries.append(summary)
+
+    def add_error(self, bucket_name: str, error: Exception):
+        """Record a bucket whose cleanup did not complete."""
+        self.errors[bucket_name] = error
+
+    @property
+    def buckets(self):
+        return len(self.summaries) + len(self.errors)
+
+    @property
+    def found(self):
+        return sum(s.found for s in self.summaries)
+
+    @property
+    def cancelled(self):
+        return sum(s.cancelled for s in self.summaries)
+
+    @property
+    def remaining(self):
+        return sum(s.remaining for s in self.summaries)
+
+    @property
+    def failed(self):
+        return sum(s.failed for s in self.summaries)
+
+    @property
+    def ok(self) -> bool:
+        """True if every bucket was processed and no cancellation failed."""
+        return not self.errors and self.failed == 0
+
+    def __repr__(self):
+        return (
+            f"<SweepSummary buckets={self.buckets} found={self.found} "
+            f"cancelled={self.cancelled} failed={self.failed} "
+            f"bucket_errors={len(self.errors)}>"
+        )
+
+
+class SummaryLogging:
+    """Per-upload, progress and outcome log lines, shared by both engines.
+
+    Subclasses provide ``logger``, ``metrics`` and ``dry_run``; ``plan`` and
+    ``limiter`` are optional.
+    """
+
+    plan = None
+    limiter = None
+
+    def _log_file(self, summary: CleanupSummary, message: str, file_version):
+        """Log a line about one upload: at INFO for the first few of a bucket, then at DEBUG."""
+        if summary.found <= LOGGED_FILES:
+            level = logging.INFO
+        else:
+            level = logging.DEBUG
+            if summary.found == LOGGED_FILES + 1:
+                self.logger.info(
+                    "🔇 More than %d uploads in '%s'; logging progress every %d instead of each upload",
+                    LOGGED_FILES, summary.bucket_name, PROGRESS_INTERVAL,
+                )
+        if self.logger.isEnabledFor(level):
+            self.logger.log(
+                level,
+                message,
+                file_version.file_id,
+                file_version.file_name,
+                extra={
+                    "bucket": summary.bucket_name,
+                    "file_id": file_version.file_id,
+                    "file_name": file_version.file_name,
+                },
+            )
+
+    def _log_progress(self, summary: CleanupSummary):
+        if summary.found % PROGRESS_INTERVAL != 0:
+            return
+        if self.limiter is None:
+            self.logger.info(
+                "📈 Progress: %d found, %d cancelled so far", summary.found, summary.cancelled
+            )
+            return
+        self.metrics.observe_limiter(self.limiter)
+        self.logger.info(
+            "📈 Progress: %d found, %d cancelled so far (%.1f calls/s, concurrency %d)",
+            summary.found,
+            summary.cancelled,
+            self.limiter.rate,
+            self.limiter.limit,
+        )
+
+    def _log_outcome(self, summary: CleanupSummary):
+        if summary.stopped:
+            self.logger.warning(
+                "⏱️ Stopped '%s' at the %s budget; %d listed uploads left for a later run",
+                summary.bucket_name,
+                summary.stopped,
+                summary.remaining,
+            )
+        elif summary.remaining:
+            self.logger.info(
+                "⏳ %d uploads in '%s' left for a later run", summary.remaining, summary.bucket_name
+            )
+        if summary.skipped:
+            self.logger.info(f"⏭️ Left {summary.skipped} uploads alone (too recent or excluded)")
+        if not summary.found:
+            self.logger.info("✅ No unfinished large files found.")
+        elif self.plan is not None:
+            self.logger.info("📝 Planned %d cancellations", summary.found)
+        elif self.dry_run:
+            self.logger.info("🗃️ Found %d unfinished uploads", summary.found)
+        elif summary.failed:
+            self.logger.warning(
+                "⚠️ Cancelled %d of %d unfinished uploads, %d failed",
+                summary.cancelled, summary.found, summary.failed,
+            )
+        else:
+            self.logger.info(
+                "✅ Cancelled %d of %d unfinished uploads", summary.cancelled, summary.found
+            )
+
+
+class B2CleanupTool(SummaryLogging):
     """Tool to clean up unfinished large file uploads in B2 buckets."""
 
     def __init__(
@@ -16,6 +307,29 @@ class B2CleanupTool:
         dry_run: bool = False,
         override_key_id: str = None,
         override_key: str = None,
+        workers: int = DEFAULT_WORKERS,
+        max_in_flight: int = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        bucket_workers: int = DEFAULT_BUCKET_WORKERS,
+        cache_dir: str = None,
+        state_file: str = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        dead_letter_file: str = None,
+        prefix: str = None,
+        older_than: float = None,
+        exclude=(),
+        plan_file: str = None,
+        shard=None,
+        lease_dir: str = None,
+        partitions=(),
+        auto_partition: bool = False,
+        metrics_file: str = None,
+        metrics_port: int = None,
+        max_duration: float = None,
+        max_cancels: int = None,
+        max_api_calls: int = None,
+        order: str = "listing",
+        keep_results: bool = False,
     ):
         """Initialize the B2 cleanup tool.
 
@@ -23,54 +337,233 @@ class B2CleanupTool:
             dry_run: If True, only list uploads but don't delete them
             override_key_id: Optional B2 key ID to override env/config
             override_key: Optional B2 application key to override env/config
+            workers: Number of concurrent cancellation workers
+            max_in_flight: Maximum number of listed files waiting to be
+                cancelled at any time (defaults to four per worker)
+            page_size: Number of unfinished files requested per listing page
+            bucket_workers: Number of buckets swept concurrently by cleanup_buckets
+            cache_dir: Optional directory in which the account authorization
+                and bucket IDs are cached between runs
+            state_file: Optional checkpoint journal used to resume interrupted runs
+            max_retries: Number of times a transiently failing cancellation is retried
+            dead_letter_file: Optional JSON Lines file that failed cancellations
+                are written to, for replay_dead_letters
+            prefix: Only clean up uploads whose file name starts with this
+            older_than: Only clean up uploads started at least this many seconds ago
+            exclude: Glob patterns of file names to leave alone
+            plan_file: If set, write the uploads that would be cancelled to
+                this plan file instead of cancelling them, for apply_plan
+            shard: Optional ``(index, count)`` tuple, numbered from 1: only
+                handle uploads whose file ID hashes into that shard. With a
+                ``lease_dir``, the index may be None to claim any free shard.
+            lease_dir: Optional directory on shared storage where shards are
+                claimed with lease files, so no shard runs twice
+            partitions: Name prefixes to list concurrently, merged into one
+                cancellation stream; only uploads under them are handled
+            auto_partition: If True, discover each bucket's top-level folders
+                and list them concurrently
+            metrics_file: Optional file the run's Prometheus metrics are
+                written to on close, for node_exporter's textfile collector
+            metrics_port: Optional local port to serve Prometheus metrics on
+                while the tool is open
+            max_duration: Stop starting new calls this many seconds after the
+                tool is created
+            max_cancels: Cancel at most this many uploads over all buckets
+            max_api_calls: Make at most this many listing and cancellation calls
+            order: ``"listing"`` to cancel uploads as they are listed, or
+                ``"oldest"`` to list each bucket first and cancel its oldest
+                uploads first
+            keep_results: If True, summaries list every cancelled upload in
+                ``results``, not just the failed ones
         """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if max_in_flight is None:
+            max_in_flight = workers * 4
+        if max_in_flight < workers:
+            raise ValueError("max_in_flight must be at least the number of workers")
+        if not 1 <= page_size <= MAX_PAGE_SIZE:
+            raise ValueError(f"page_size must be between 1 and {MAX_PAGE_SIZE}")
+        if bucket_workers < 1:
+            raise ValueError("bucket_workers must be at least 1")
+        if max_retries < 0:
+            raise ValueError("max_retries cannot be negative")
+        if older_than is not None and older_than < 0:
+            raise ValueError("older_than cannot be negative")
+        if order not in ORDERS:
+            raise ValueError(f"order must be one of {', '.join(ORDERS)}")
+        if partitions and auto_partition:
+            raise ValueError("partitions and auto_partition are mutually exclusive")
+        if prefix and any(not p.startswith(prefix) for p in partitions):
+            raise ValueError("every partition must start with prefix")
+        if lease_dir is not None and shard is None:
+            raise ValueError("lease_dir requires shard")
+        if shard is not None:
+            index, count = shard
+            if count < 1 or (index is not None and not 1 <= index <= count):
+                raise ValueError("shard must satisfy 1 <= index <= count")
+            if index is None and lease_dir is None:
+                raise ValueError("a shard without an index requires lease_dir")
         self.dry_run = dry_run
+        self.workers = workers
+        self.max_in_flight = max_in_flight
+        self.page_size = page_size
+        self.bucket_workers = bucket_workers
+        self.cache_dir = cache_dir
+        self.max_retries = max_retries
+        self.prefix = prefix
+        self.older_than = older_than
+        self.exclude = tuple(exclude)
+        self.partitions = tuple(partitions)
+        self.auto_partition = auto_partition
+        self.order = order
+        self.keep_results = keep_results
+        self.budget = None
+        if max_duration is not None or max_cancels is not None or max_api_calls is not None:
+            self.budget = RunBudget(max_duration, max_cancels, max_api_calls)
         self.logger = logging.getLogger("B2Cleanup")
+        self.metrics = Metrics()
+        self.metrics_file = metrics_file
+        # Shared by all buckets: B2 rate limits apply to the whole account.
+        # Sized to the threads that actually call B2, so a backoff bites at once;
+        # _sweep widens it while several buckets are processed at a time.
+        self.limiter = AdaptiveLimiter(maximum=workers)
         self.api = self._authorize(override_key_id, override_key)
-        self.available_buckets = self._fetch_available_buckets()
+        self.shard = shard
+        self.lease = None
+        if lease_dir is not None:
+            self.lease = ShardLease(lease_dir, shard[1])
+            self.shard = (self.lease.acquire(shard[0]), shard[1])
+        if self.shard is not None:
+            self.logger.info(f"🧩 Handling shard {self.shard[0]}/{self.shard[1]}")
+        self.journal = CheckpointJournal(state_file) if state_file else None
+        self.dead_letters = DeadLetterWriter(dead_letter_file) if dead_letter_file else None
+        self.plan = PlanWriter(plan_file) if plan_file else None
+        self._watch = None
+        if metrics_port is not None:
+            port = self.metrics.serve(metrics_port)
+            self.logger.info(f"📊 Serving metrics on http://127.0.0.1:{port}/metrics")
 
-    def _authorize(self, override_key_id=None, override_key=None):
-        info = InMemoryAccountInfo()
-        api = B2Api(info)
+    def close(self, ok: bool = True):
+        """Release resources held by the tool, such as the checkpoint journal.
 
-        if override_key_id and override_key:
-            self.logger.info("🔐 Using credentials from CLI override.")
-            api.authorize_account("production", override_key_id, override_key)
-            return api
+        Args:
+            ok: False if the run raised; a plan file being written is then
+                discarded rather than moved into place
+        """
+        self._export_metrics()
+        self.metrics.stop()
+        if self.journal is not None:
+            self.journal.close()
+        if self.dead_letters is not None:
+            self.dead_letters.close()
+        if self.plan is not None:
+            self.plan.close(discard=not ok)
+        if self.lease is not None:
+            self.lease.release()
 
-        key_id = os.getenv("B2_APPLICATION_KEY_ID")
-        app_key = os.getenv("B2_APPLICATION_KEY")
+    def _export_metrics(self):
+        self.metrics.observe_limiter(self.limiter)
+        self.metrics.finish()
+        if self.metrics_file is not None:
+            self.metrics.write_textfile(self.metrics_file)
 
-        if key_id and app_key:
-            self.logger.info("🔐 Using credentials from environment variables.")
-            api.authorize_account("production", key_id, app_key)
-            return api
+    @cached_property
+    def available_buckets(self):
+        """Names of all accessible buckets, fetched on first use."""
+        return self._fetch_available_buckets()
 
-        try:
-            self.logger.info("🔍 Trying to load credentials via `b2 account get`...")
-            try:
-                result = subprocess.run(
-                    ["b2", "account", "get"],
-                    check=True,
-                    capture_output=True,
-                    text=True,
+    @cached_property
+    def bucket_index(self):
+        """Fuzzy index of ``available_buckets``, for suggesting mistyped names."""
+        return BucketNameIndex(self.available_buckets)
+
+    @cached_property
+    def part_cache(self):
+        """Part totals of unfinished uploads, persisted if a cache dir is set."""
+        if self.cache_dir is None:
+            return PartTotalCache()
+        os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+        return PartTotalCache(os.path.join(self.cache_dir, PART_CACHE_FILE))
+
+    def _http_session(self):
+        """Create an HTTP session whose connection pool fits all workers."""
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_maxsize=self.workers * self.bucket_workers
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.hooks["response"].append(self._on_response)
+        return session
+
+    def _on_response(self, response, *args, **kwargs):
+        """Report throttling responses to the rate controller.
+
+        This sees every response, including the ones b2sdk retries by itself,
+        so the whole pool backs off rather than each call on its own.
+        """
+        if response.status_code in THROTTLE_STATUSES:
+            self.metrics.throttled.inc()
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if self.limiter.on_throttle(retry_after):
+                self.metrics.observe_limiter(self.limiter)
+                self.logger.warning(
+                    "🐢 B2 is throttling requests (HTTP %d); concurrency lowered to %d%s",
+                    response.status_code,
+                    self.limiter.limit,
+                    f", pausing {retry_after:.0f}s" if retry_after else "",
                 )
-            except FileNotFoundError:
-                self.logger.error("❌ Command 'b2' not found. Please install the B2 CLI or provide credentials.")
-                raise RuntimeError("B2 CLI not found. Please install it or provide credentials manually.")
-                
-            creds = json.loads(result.stdout)
-            key_id = creds["applicationKeyId"]
-            app_key = creds["applicationKey"]
-            api.authorize_account("production", key_id, app_key)
-            self.logger.info("✅ Authorized with B2 CLI credentials.")
-            return api
 
-        except (subprocess.CalledProcessError, KeyError, json.JSONDecodeError) as e:
-            self.logger.error(
-                "❌ Failed to get B2 credentials from CLI or environment: %s", e
-            )
-            raise RuntimeError("Could not authorize with Backblaze B2.")
+    def _account_info(self):
+        """Create the account info store, persisted on disk if a cache dir is set."""
+        if self.cache_dir is None:
+            return InMemoryAccountInfo()
+        os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+        return SqliteAccountInfo(file_name=os.path.join(self.cache_dir, ACCOUNT_CACHE_FILE))
+
+    def _bucket_cache(self):
+        """Create the bucket name to ID cache, persisted if a cache dir is set."""
+        if self.cache_dir is None:
+            return BucketIdCache()
+        return BucketIdCache(os.path.join(self.cache_dir, BUCKET_CACHE_FILE))
+
+    def _authorize_account(self, api, key_id, app_key):
+        """Authorize ``api``, reusing a cached authorization for the same key.
+
+        A cached token that has since expired is renewed by b2sdk on first use,
+        using the application key stored alongside it.
+        """
+        info = api.account_info
+        if self.cache_dir is not None:
+            try:
+                cached = (info.get_application_key_id(), info.get_application_key())
+                info.get_account_auth_token()
+            except MissingAccountData:
+                cached = None
+            if cached == (key_id, app_key):
+                self.logger.info("♻️ Using cached B2 authorization.")
+                return
+        api.authorize_account("production", key_id, app_key)
+
+    def _authorize(self, override_key_id=None, override_key=None):
+        info = self._account_info()
+        # All workers share this API object, and with it one pooled HTTP
+        # session. decode_content=True keeps b2sdk from replacing our adapter;
+        # we never download file contents, so decoding is irrelevant here.
+        api = B2Api(
+            info,
+            cache=self._bucket_cache(),
+            api_config=B2HttpApiConfig(
+                http_session_factory=self._http_session,
+                decode_content=True,
+            ),
+        )
+
+        self._authorize_account(
+            api, *resolve_credentials(override_key_id, override_key, self.logger)
+        )
+        return api
 
     def _fetch_available_buckets(self):
         """Fetch a list of available bucket names.
@@ -88,12 +581,11 @@ class B2CleanupTool:
             self.logger.warning(f"⚠️ Could not fetch bucket list: {e}")
             return []
 
-    def cleanup_unfinished_uploads(self, bucket_name: str = None, interactive: bool = True):
-        """Find and clean up unfinished uploads in the specified bucket.
+    def _open_bucket(self, bucket_name: str = None, interactive: bool = True):
+        """Look up a bucket, selecting or correcting its name interactively.
 
-        Args:
-            bucket_name: Name of the B2 bucket to clean up (or None to select interactively)
-            interactive: If True, allow interactive correction/selection of bucket names
+        Returns:
+            A ``(bucket_name, bucket)`` tuple for the bucket actually chosen.
         """
         # If no bucket_name is provided, prompt user to select from available buckets
         if bucket_name is None:
@@ -131,8 +623,7 @@ class B2CleanupTool:
             
             # Only generate suggestions in interactive mode
             if interactive and self.available_buckets:
-                # Find close matches using difflib
-                close_matches = difflib.get_close_matches(bucket_name, self.available_buckets, n=3, cutoff=0.6)
+                close_matches = self.bucket_index.suggest(bucket_name, n=3, cutoff=0.6)
                 
                 if close_matches:
                     if len(close_matches) == 1:
@@ -141,7 +632,7 @@ class B2CleanupTool:
                         response = input(f"Use '{close_matches[0]}' instead? [y/N]: ").strip().lower()
                         if response == 'y' or response == 'yes':
                             self.logger.info(f"✅ Using bucket '{close_matches[0]}' instead")
-                            return self.cleanup_unfinished_uploads(close_matches[0], interactive=False)
+                            return self._open_bucket(close_matches[0], interactive=False)
                     else:
                         suggestions = "', '".join(close_matches)
                         suggestion_msg = f" Did you mean one of these: '{suggestions}'?"
@@ -156,7 +647,7 @@ class B2CleanupTool:
                             if 0 <= idx < len(close_matches):
                                 suggested = close_matches[idx]
                                 self.logger.info(f"✅ Using bucket '{suggested}' instead")
-                                return self.cleanup_unfinished_uploads(suggested, interactive=False)
+                                return self._open_bucket(suggested, interactive=False)
                         except ValueError:
                             pass  # Non-numeric input, just fall through to error
             
@@ -169,17 +660,844 @@ class B2CleanupTool:
                 self.logger.error(f"❌ Bucket '{bucket_name}' not found or not accessible: {e}")
                 raise RuntimeError(f"Cannot access bucket '{bucket_name}'. Please check the name and your permissions.")
 
-        unfinished = list(bucket.list_unfinished_large_files())
-        if not unfinished:
-            self.logger.info("✅ No unfinished large files found.")
+        return bucket_name, bucket
+
+    def _listing(self, bucket, start_file_id=None):
+        """List the uploads of ``bucket``, partitioned if so configured.
+
+        Returns:
+            A ``(pages, listers)`` tuple: the ``(files, next_cursor)`` pages
+            to process, and the listers producing them.
+        """
+        partitions = list(self.partitions)
+        if self.auto_partition:
+            partitions = discover_partitions(
+                self.api, bucket.id_, prefix=self.prefix or "", limiter=self.limiter,
+                budget=self.budget,
+            )
+            if self.budget is not None and self.budget.out_of_calls:
+                # Discovery was cut short; a plain lister stops at once and reports why
+                partitions = []
+            elif partitions is None:
+                self.logger.warning(
+                    f"⚠️ Too many top-level names in '{bucket.name}' to partition; listing it as a whole"
+                )
+                partitions = []
+            elif not partitions:
+                return iter(()), []
+        if len(partitions) < 2:
+            lister = self._lister(bucket, start_file_id, prefix=partitions[0] if partitions else None)
+            return lister.pages(), [lister]
+        if start_file_id is not None:
+            self.logger.info("⏩ Partitioned listings restart from the beginning; cancelled uploads are skipped")
+        self.logger.info(f"🔀 Listing '{bucket.name}' in {len(partitions)} partitions")
+        listers = [self._lister(bucket, prefix=p, prefetch=False) for p in partitions]
+        return merge_pages(listers, workers=min(len(listers), self.workers)), listers
+
+    def _lister(self, bucket, start_file_id=None, prefix=None, prefetch=True):
+        """Create a lister for the uploads in ``bucket`` selected by the filters."""
+        upload_filter = None
+        if self.older_than is not None or self.exclude or self.shard is not None:
+            upload_filter = UploadFilter(
+                older_than=self.older_than,
+                exclude=self.exclude,
+                shard=self.shard,
+                keep_recent=self._watch is not None,
+            )
+        return UnfinishedFileLister(
+            self.api,
+            bucket.id_,
+            page_size=self.page_size,
+            start_file_id=start_file_id,
+            prefetch=prefetch,
+            limiter=self.limiter,
+            prefix=prefix or self.prefix,
+            upload_filter=upload_filter,
+            metrics=self.metrics,
+            bucket_name=bucket.name,
+            budget=self.budget,
+        )
+
+    def cleanup_unfinished_uploads(self, bucket_name: str = None, interactive: bool = True):
+        """Find and clean up unfinished uploads in the specified bucket.
+
+        Args:
+            bucket_name: Name of the B2 bucket to clean up (or None to select interactively)
+            interactive: If True, allow interactive correction/selection of bucket names
+
+        Returns:
+            A CleanupSummary describing what was found and cancelled.
+        """
+        if bucket_name is not None and self.budget is not None and self.budget.exhausted:
+            # Buckets a sweep reaches after the budget is spent are not even listed
+            summary = CleanupSummary(bucket_name, keep_results=self.keep_results)
+            summary.stopped = self.budget.exhausted
+            self.logger.warning(
+                "⏱️ Skipped '%s': the %s budget is spent; its uploads are left for a later run",
+                bucket_name, summary.stopped,
+            )
+            return summary
+        bucket_name, bucket = self._open_bucket(bucket_name, interactive)
+        summary = CleanupSummary(bucket_name, keep_results=self.keep_results)
+        start_file_id = None
+        # Oldest-first runs have to see the whole bucket, so they never resume mid-listing
+        if self.journal is not None and self.order == "listing":
+            start_file_id = self.journal.cursor(bucket_name)
+        if start_file_id is not None:
+            self.logger.info(f"⏩ Resuming '{bucket_name}' from checkpoint {start_file_id}")
+        pages, listers = self._listing(bucket, start_file_id)
+        if self.order == "oldest":
+            after = None
+            pass_pages = pages
+            while True:
+                oldest, left_out = self._oldest_first(pass_pages, summary, after)
+                if oldest:
+                    after = (-(oldest[-1].upload_timestamp or 0), oldest[-1].file_id)
+                stopped = any(lister.stopped for lister in listers)
+                if stopped:
+                    summary.stopped = self.budget.exhausted
+                    self.logger.warning("⏱️ Listing of '%s' stopped early", bucket_name)
+                batches = ((batch, None) for batch in _batched(oldest, self.page_size))
+                self._process_unfinished(batches, summary, journal=self.journal)
+                if not left_out or stopped or (self.budget is not None and self.budget.exhausted):
+                    break
+                # More uploads than one pass holds: list again for the next oldest ones
+                self.logger.info(
+                    "🔁 Listing '%s' again for the next %d oldest uploads", bucket_name, left_out
+                )
+                pass_pages, listers = self._listing(bucket)
+            summary.found += left_out
+            summary.remaining += left_out
+            self.metrics.found.inc(left_out, bucket=bucket_name)
+            if left_out and self.budget is not None:
+                summary.stopped = summary.stopped or self.budget.exhausted
+        else:
+            self._process_unfinished(pages, summary, journal=self.journal)
+            if any(lister.stopped for lister in listers):
+                summary.stopped = summary.stopped or self.budget.exhausted
+                self.logger.warning("⏱️ Listing of '%s' stopped early", bucket_name)
+        filters = [lister.upload_filter for lister in listers if lister.upload_filter is not None]
+        summary.skipped = sum(f.skipped for f in filters)
+        self.metrics.skipped.inc(summary.skipped, bucket=bucket_name)
+        if self._watch is not None:
+            for upload_filter in filters:
+                self._watch.remember(bucket_name, upload_filter.recent)
+        if self.shard is not None:
+            self.logger.info(
+                f"🧩 Left {sum(f.other_shards for f in filters)} uploads in '{bucket_name}' to other shards"
+            )
+        self._log_outcome(summary)
+        return summary
+
+    def _oldest_first(self, pages, summary: CleanupSummary, after=None):
+        """Select the oldest uploads of a listing, holding no more than the run can cancel.
+
+        A heap keeps the ``limit`` oldest uploads seen so far, where the
+        limit is ``max_cancels`` (or ``max_api_calls``) if set, and at most
+        OLDEST_FIRST_LIMIT. Larger buckets take several passes: ``after`` is
+        the ``(-upload_timestamp, file_id)`` key of the last upload handled
+        by the previous pass, and only uploads after it are selected.
+
+        Returns:
+            A ``(records, left_out)`` tuple: the selected uploads, oldest
+            first, and how many newer ones were listed but not selected.
+        """
+        limit = OLDEST_FIRST_LIMIT
+        if self.budget is not None:
+            for budget_limit in (self.budget.max_cancels, self.budget.max_api_calls):
+                if budget_limit is not None:
+                    limit = min(limit, budget_limit)
+        # Newest selected upload on top: (-upload_timestamp, file_id, record)
+        heap = []
+        listed = 0
+        for files, _ in pages:
+            for record in files:
+                if self.journal and self.journal.is_cancelled(summary.bucket_name, record.file_id):
+                    continue
+                item = (-(record.upload_timestamp or 0), record.file_id, record)
+                if after is not None and item[:2] >= after:
+                    continue
+                listed += 1
+                if len(heap) < limit:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+        heap.sort(reverse=True)
+        if listed > len(heap):
+            self.logger.info(
+                "⏳ Cancelling the oldest %d of %d uploads in '%s' first",
+                len(heap), listed, summary.bucket_name,
+            )
+        return [record for _, _, record in heap], listed - len(heap)
+
+    def replay_dead_letters(self, path: str):
+        """Retry the cancellations recorded in a dead-letter file.
+
+        The whole file is read before anything is retried. Entries that fail
+        again are written to this tool's dead-letter file, if it has one; when
+        that is the same file, they go to a temporary file that replaces it
+        once the replay has finished, so an interrupted replay loses nothing.
+
+        Args:
+            path: Dead-letter file written by an earlier run
+
+        Returns:
+            A SweepSummary with one CleanupSummary per bucket.
+        """
+        by_bucket = {}
+        for dead_letter in read_dead_letters(path):
+            by_bucket.setdefault(dead_letter.bucket_name, {})[dead_letter.file_id] = dead_letter
+        rewrite = self.dead_letters is not None and (
+            os.path.abspath(self.dead_letters.path) == os.path.abspath(path)
+        )
+        if not rewrite:
+            return self._replay(by_bucket)
+
+        writer = self.dead_letters
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+        os.close(fd)
+        self.dead_letters = DeadLetterWriter(tmp_path)
+        try:
+            sweep = self._replay(by_bucket)
+            self.dead_letters.close()
+            os.replace(tmp_path, path)
+        except BaseException:
+            self.dead_letters.close()
+            os.unlink(tmp_path)
+            raise
+        finally:
+            self.dead_letters = writer
+        return sweep
+
+    def _replay(self, by_bucket):
+        sweep = SweepSummary()
+        for bucket_name, dead_letters in by_bucket.items():
+            self.logger.info(f"🔁 Replaying {len(dead_letters)} failed cancellations in '{bucket_name}'")
+            summary = CleanupSummary(bucket_name, keep_results=self.keep_results)
+            self._process_unfinished([(list(dead_letters.values()), None)], summary)
+            self._log_outcome(summary)
+            sweep.add(summary)
+        return sweep
+
+    def apply_plan(self, path: str):
+        """Cancel the uploads listed in a plan file, without listing any bucket.
+
+        The plan is read twice, streaming: once to validate every line before
+        anything is cancelled, then to feed the entries to the worker pool.
+        Memory use does not depend on the size of the plan. Consecutive
+        entries of the same bucket are reported together. With a ``shard``,
+        only the entries of that shard are applied, so several hosts can
+        share one plan.
+
+        Args:
+            path: Plan file written by a run with ``plan_file``
+
+        Returns:
+            A SweepSummary with one CleanupSummary per bucket.
+
+        Raises:
+            ValueError: If the plan file contains an invalid line.
+        """
+        total = sum(1 for _ in read_plan(path))
+        self.logger.info(f"📋 Applying plan '{path}' with {total} uploads")
+        entries = read_plan(path)
+        if self.shard is not None:
+            index, count = self.shard
+            entries = (e for e in entries if shard_of(e.file_id, count) == index)
+        sweep = SweepSummary()
+        for bucket_name, entries in itertools.groupby(entries, key=lambda entry: entry.bucket_name):
+            summary = CleanupSummary(bucket_name, keep_results=self.keep_results)
+            pages = ((batch, None) for batch in _batched(entries, self.page_size))
+            self._process_unfinished(pages, summary, journal=self.journal)
+            self._log_outcome(summary)
+            sweep.add(summary)
+        return sweep
+
+    def resolve_bucket_names(self, patterns):
+        """Expand bucket names and glob patterns into a list of bucket names.
+
+        Patterns containing glob characters are matched against the available
+        buckets; plain names are kept as given. Duplicates are removed while
+        preserving order.
+
+        Args:
+            patterns: Bucket names and/or glob patterns such as ``backup-*``
+
+        Returns:
+            A list of bucket names.
+        """
+        names = []
+        for pattern in patterns:
+            if is_bucket_pattern(pattern):
+                matches = fnmatch.filter(self.available_buckets, pattern)
+                if not matches:
+                    self.logger.warning(f"⚠️ No buckets match '{pattern}'")
+                names.extend(matches)
+            else:
+                names.append(pattern)
+        return list(dict.fromkeys(names))
+
+    def cleanup_buckets(self, patterns=None, all_buckets: bool = False):
+        """Clean up unfinished uploads in several buckets in parallel.
+
+        Up to ``bucket_workers`` buckets are swept at the same time, all
+        sharing this tool's authorized API. A bucket that cannot be cleaned
+        up is recorded in the returned summary and does not stop the others.
+
+        Args:
+            patterns: Bucket names and/or glob patterns to sweep
+            all_buckets: If True, sweep every available bucket
+
+        Returns:
+            A SweepSummary aggregating the per-bucket results.
+        """
+        sweep = SweepSummary()
+        self._sweep(patterns, all_buckets, self.cleanup_unfinished_uploads, sweep)
+        self.logger.info(
+            "✅ Swept %d buckets: %d found, %d cancelled, %d buckets failed",
+            sweep.buckets, sweep.found, sweep.cancelled, len(sweep.errors),
+        )
+        if sweep.remaining:
+            self.logger.info("⏳ %d listed uploads left for a later run", sweep.remaining)
+        return sweep
+
+    def _sweep(self, patterns, all_buckets, run, sweep):
+        """Call ``run(bucket_name, interactive=False)`` for many buckets in parallel.
+
+        Results are added to ``sweep``; a bucket whose run raises is recorded
+        with ``sweep.add_error`` and does not stop the others.
+        """
+        if all_buckets:
+            bucket_names = list(self.available_buckets)
+        else:
+            bucket_names = self.resolve_bucket_names(patterns or [])
+
+        if not bucket_names:
+            self.logger.warning("⚠️ No buckets to process")
+            return
+
+        self.logger.info(f"🧹 Sweeping {len(bucket_names)} buckets")
+        bucket_workers = min(self.bucket_workers, len(bucket_names))
+        self.limiter.resize(self.workers * bucket_workers)
+        try:
+            with ThreadPoolExecutor(max_workers=bucket_workers) as executor:
+                futures = {
+                    executor.submit(run, name, interactive=False): name
+                    for name in bucket_names
+                }
+                for future in as_completed(futures):
+                    bucket_name = futures[future]
+                    try:
+                        sweep.add(future.result())
+                    except Exception as e:
+                        self.logger.error(f"❌ Processing of bucket '{bucket_name}' failed: {e}")
+                        sweep.add_error(bucket_name, e)
+        finally:
+            self.limiter.resize(self.workers)
+
+    def watch(
+        self,
+        patterns=None,
+        all_buckets: bool = False,
+        interval: float = 600.0,
+        rescan_interval: float = None,
+        ticks: int = None,
+        stop: threading.Event = None,
+    ):
+        """Clean up buckets every ``interval`` seconds, reusing this tool's authorization.
+
+        Every ``rescan_interval`` seconds (by default, every tick) the
+        buckets are listed and cleaned up as by ``cleanup_buckets``. Uploads
+        left alone only because they are more recent than ``older_than`` are
+        remembered with the time they become old enough. The ticks in between
+        cancel just those, without listing anything, so a long
+        ``rescan_interval`` makes quiet ticks free. b2sdk renews the
+        authorization token when it expires.
+
+        Args:
+            patterns: Bucket names and/or glob patterns to watch; patterns
+                are expanded again on every rescan
+            all_buckets: If True, watch every available bucket
+            interval: Seconds between the starts of consecutive ticks
+            rescan_interval: Seconds between full listings, rounded to a
+                whole number of ticks
+            ticks: Stop after this many ticks (defaults to running until ``stop``)
+            stop: Optional event that ends the watch after the current tick
+
+        Raises:
+            ValueError: If the tool has a checkpoint journal or a plan file.
+        """
+        if self.journal is not None or self.plan is not None:
+            raise ValueError("watch cannot be combined with a state file or a plan file")
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        rescan_every = 1 if rescan_interval is None else max(1, round(rescan_interval / interval))
+        stop = stop or threading.Event()
+        self.logger.info(
+            "👀 Watching every %.0fs, listing every %d tick(s)", interval, rescan_every
+        )
+        self._watch = _WatchState(self.older_than)
+        next_tick = time.monotonic()
+        try:
+            for tick in itertools.count():
+                if tick % rescan_every == 0:
+                    self._watch.clear()
+                    # Pick up buckets created since the last rescan
+                    self.__dict__.pop("available_buckets", None)
+                    self.__dict__.pop("bucket_index", None)
+                    self.cleanup_buckets(patterns, all_buckets)
+                else:
+                    self._cancel_due()
+                self._export_metrics()
+                if ticks is not None and tick + 1 >= ticks:
+                    return
+                next_tick = max(next_tick + interval, time.monotonic())
+                if stop.wait(next_tick - time.monotonic()):
+                    return
+        finally:
+            self._watch = None
+
+    def _cancel_due(self):
+        """Cancel the remembered uploads that have become old enough."""
+        for bucket_name, entries in self._watch.pop_due().items():
+            self.logger.info(
+                "⏰ %d uploads in '%s' are now old enough to cancel", len(entries), bucket_name
+            )
+            summary = CleanupSummary(bucket_name, keep_results=self.keep_results)
+            pages = ((batch, None) for batch in _batched(entries, self.page_size))
+            self._process_unfinished(pages, summary)
+            self._log_outcome(summary)
+
+    def report_reclaimable(
+        self,
+        bucket_name: str = None,
+        interactive: bool = True,
+        sample: int = None,
+        price_per_gb: float = DEFAULT_STORAGE_PRICE,
+    ):
+        """Report how much storage the unfinished uploads in a bucket hold.
+
+        Nothing is cancelled. The parts of each upload are listed by up to
+        ``workers`` threads at once, skipping uploads whose total is cached.
+        With ``sample``, all uploads are listed (which is cheap) but only a
+        uniform random sample of that many has its parts counted, and the
+        total is estimated from it.
+
+        Args:
+            bucket_name: Name of the B2 bucket (or None to select interactively)
+            interactive: If True, allow interactive correction/selection of bucket names
+            sample: Optional number of uploads to count the parts of
+            price_per_gb: Storage price in USD per GB-month, for the cost estimate
+
+        Returns:
+            A ReclaimReport.
+        """
+        if sample is not None and sample < 1:
+            raise ValueError("sample must be at least 1")
+        bucket_name, bucket = self._open_bucket(bucket_name, interactive)
+        report = ReclaimReport(bucket_name)
+        pages, _ = self._listing(bucket)
+        files = self._count_listed(
+            (file_version for files, _ in pages for file_version in files), report
+        )
+        if sample is not None:
+            files = self._reservoir(files, sample)
+        try:
+            self._scan_parts(files, report)
+        finally:
+            self.part_cache.save()
+        self._log_report(report, price_per_gb)
+        return report
+
+    def report_buckets(
+        self,
+        patterns=None,
+        all_buckets: bool = False,
+        sample: int = None,
+        price_per_gb: float = DEFAULT_STORAGE_PRICE,
+    ):
+        """Report reclaimable storage for several buckets in parallel.
+
+        Args:
+            patterns: Bucket names and/or glob patterns to report on
+            all_buckets: If True, report on every available bucket
+            sample: Optional number of uploads per bucket to count the parts of
+            price_per_gb: Storage price in USD per GB-month, for the cost estimate
+
+        Returns:
+            A SweepReport aggregating the per-bucket reports.
+        """
+        sweep = SweepReport()
+
+        def run(bucket_name, interactive):
+            return self.report_reclaimable(
+                bucket_name, interactive=interactive, sample=sample, price_per_gb=price_per_gb
+            )
+
+        self._sweep(patterns, all_buckets, run, sweep)
+        self.logger.info(
+            "💰 %d buckets, %d unfinished uploads: %s, about $%.2f/month",
+            sweep.buckets,
+            sweep.uploads,
+            self._format_estimate(sweep),
+            sweep.monthly_cost(price_per_gb),
+        )
+        return sweep
+
+    @staticmethod
+    def _count_listed(files, report: ReclaimReport):
+        for file_version in files:
+            report.uploads += 1
+            yield file_version
+
+    def _reservoir(self, files, size: int):
+        """Draw a uniform random sample of ``size`` files (Algorithm R)."""
+        sample = UploadRecords()
+        for i, file_version in enumerate(files):
+            if i < size:
+                sample.append(file_version)
+            else:
+                j = random.randrange(i + 1)
+                if j < size:
+                    sample[j] = file_version
+        return sample
+
+    def _count_parts(self, file_version):
+        total = self.part_cache.get(file_version.file_id)
+        if total is None:
+            total = count_part_bytes(self.api, file_version.file_id, limiter=self.limiter)
+            self.part_cache.put(file_version.file_id, total)
+        return total
+
+    def _scan_parts(self, files, report: ReclaimReport):
+        """Count the parts of ``files`` concurrently into ``report``.
+
+        ``files`` is consumed lazily with at most ``max_in_flight`` uploads
+        pending at a time. An upload whose parts cannot be listed is counted
+        as failed and left out of the estimate.
+        """
+        def collect(done):
+            for future in done:
+                try:
+                    report.add(future.result())
+                except Exception as e:
+                    self.logger.error("❌ Could not list parts of %s: %s", futures[future], e)
+                    report.add_failure()
+                del futures[future]
+
+        futures = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for file_version in files:
+                if len(futures) >= self.max_in_flight:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    collect(done)
+                futures[executor.submit(self._count_parts, file_version)] = file_version.file_id
+            collect(list(futures))
+
+    @staticmethod
+    def _format_estimate(report) -> str:
+        if report.margin == 0:
+            return format_bytes(report.estimated_bytes)
+        if math.isinf(report.margin):
+            return f"at least {format_bytes(report.bytes_low)}"
+        return (
+            f"~{format_bytes(report.estimated_bytes)} "
+            f"(95% CI {format_bytes(report.bytes_low)}–{format_bytes(report.bytes_high)})"
+        )
+
+    def _log_report(self, report: ReclaimReport, price_per_gb: float):
+        if not report.uploads:
+            self.logger.info(f"✅ No unfinished large files in '{report.bucket_name}'.")
+            return
+        if not report.exact:
+            self.logger.info(
+                f"🎲 Counted the parts of {report.scanned} of {report.uploads} uploads"
+                f"{f', {report.failed} failed' if report.failed else ''}"
+            )
+        self.logger.info(
+            "💰 '%s': %d unfinished uploads holding %s, about $%.2f/month",
+            report.bucket_name,
+            report.uploads,
+            self._format_estimate(report),
+            report.monthly_cost(price_per_gb),
+        )
+
+    def _cancel_one(self, file_version):
+        with self.limiter:
+            start = time.perf_counter()
+            try:
+                self.api.cancel_large_file(file_version.file_id)
+            finally:
+                self.metrics.cancel_seconds.observe(time.perf_counter() - start)
+        self.limiter.on_success()
+        return file_version
+
+    def _count_cancelled(self, bucket_name: str, file_version):
+        self.metrics.cancelled.inc(bucket=bucket_name)
+        # Bytes are known only for uploads a recent report counted the parts of
+        total = self.part_cache.get(file_version.file_id)
+        if total is not None:
+            self.metrics.reclaimed_bytes.inc(total, bucket=bucket_name)
+
+    def _process_unfinished(self, pages, summary: CleanupSummary, journal=None):
+        """Cancel unfinished files while they are still being listed.
+
+        ``pages`` yields ``(files, next_cursor)`` tuples and is consumed
+        lazily. At most ``max_in_flight`` files are held between listing and
+        cancellation (including those waiting to be retried), so memory stays
+        bounded regardless of how many unfinished uploads the bucket contains.
+        Results are recorded in ``summary`` in completion order.
+
+        A failed cancellation never stops the run. Transient errors are put
+        on a retry queue with jittered exponential backoff, up to
+        ``max_retries`` times. Files that still fail, or fail permanently,
+        are recorded as failed and written to the dead-letter file.
+
+        With a checkpoint ``journal``, every cancelled file is journaled, and
+        the cursor of a page is journaled once every file listed before it
+        has been handled. Files the journal already has as cancelled are
+        skipped.
+        """
+        if self.plan is not None:
+            with self.plan.section(summary.bucket_name) as section:
+                for files, _ in pages:
+                    for i, file_version in enumerate(files):
+                        if journal and journal.is_cancelled(summary.bucket_name, file_version.file_id):
+                            continue
+                        if not self._within_budget(summary, api_call=False):
+                            self._leave(summary, files[i:], journal)
+                            break
+                        section.write(file_version)
+                        summary.found += 1
+                        self.metrics.found.inc(bucket=summary.bucket_name)
+                        self._log_progress(summary)
+                    if summary.stopped:
+                        break
             return
 
-        self.logger.info("🗃️ Found %d unfinished uploads", len(unfinished))
-        for file_version in unfinished:
-            file_id = file_version.file_id
-            file_name = file_version.file_name
-            if self.dry_run:
-                self.logger.info(f"💡 Dry run: would cancel {file_id} ({file_name})")
+        if self.dry_run:
+            for files, _ in pages:
+                for i, file_version in enumerate(files):
+                    if journal and journal.is_cancelled(summary.bucket_name, file_version.file_id):
+                        continue
+                    if not self._within_budget(summary, api_call=False):
+                        self._leave(summary, files[i:], journal)
+                        break
+                    summary.found += 1
+                    self.metrics.found.inc(bucket=summary.bucket_name)
+                    self._log_file(summary, "💡 Dry run: would cancel %s (%s)", file_version)
+                    self._log_progress(summary)
+                if summary.stopped:
+                    break
+            return
+
+        run = _CancelRun(self, summary, journal)
+        next_cursor = None
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            run.executor = executor
+            try:
+                for files, next_cursor in pages:
+                    page = _PageProgress(next_cursor)
+                    run.pages.append(page)
+                    for i, file_version in enumerate(files):
+                        if journal and journal.is_cancelled(summary.bucket_name, file_version.file_id):
+                            continue
+                        run.submit_due_retries()
+                        while run.waiting >= self.max_in_flight:
+                            run.collect(FIRST_COMPLETED, timeout=run.next_retry_in())
+                            run.submit_due_retries()
+                        if not self._within_budget(summary):
+                            self._leave(summary, files[i:], journal)
+                            break
+                        run.submit(file_version, page)
+                        summary.found += 1
+                        self.metrics.found.inc(bucket=summary.bucket_name)
+                        self._log_file(summary, "🗑️ Cancelling %s (%s)", file_version)
+                        self._log_progress(summary)
+                    if summary.stopped:
+                        break
+                    page.listed = True
+                    run.checkpoint()
+                while run.waiting:
+                    run.submit_due_retries()
+                    if run.in_flight:
+                        run.collect(FIRST_COMPLETED, timeout=run.next_retry_in())
+                    elif run.retries:
+                        time.sleep(run.next_retry_in())
+            except BaseException:
+                for future in run.in_flight:
+                    future.cancel()
+                raise
+        # An unfinished listing ends on an empty page that still has a cursor
+        if journal is not None and not summary.stopped and next_cursor is None:
+            journal.record_complete(summary.bucket_name)
+
+    def _within_budget(self, summary: CleanupSummary, api_call: bool = True) -> bool:
+        """Take one cancellation from the run's budget; when it has run out, stop ``summary``."""
+        if self.budget is None or self.budget.take_cancel(api_call):
+            return True
+        summary.stopped = self.budget.exhausted
+        return False
+
+    def _leave(self, summary: CleanupSummary, files, journal=None):
+        """Count listed ``files`` that the budget leaves for a later run."""
+        left = sum(
+            1 for file_version in files
+            if not (journal and journal.is_cancelled(summary.bucket_name, file_version.file_id))
+        )
+        summary.found += left
+        summary.remaining += left
+        self.metrics.found.inc(left, bucket=summary.bucket_name)
+
+    def _dead_letter(self, summary: CleanupSummary, file_version, error: Exception, attempts: int):
+        self.logger.error(
+            "❌ Failed to cancel %s (%s) after %d attempt(s): %s",
+            file_version.file_id,
+            file_version.file_name,
+            attempts,
+            error,
+            extra={
+                "bucket": summary.bucket_name,
+                "file_id": file_version.file_id,
+                "file_name": file_version.file_name,
+            },
+        )
+        summary.record(file_version.file_id, file_version.file_name, error)
+        self.metrics.failed.inc(bucket=summary.bucket_name)
+        if self.dead_letters is not None:
+            self.dead_letters.write(
+                DeadLetter(
+                    summary.bucket_name,
+                    file_version.file_id,
+                    file_version.file_name,
+                    str(error),
+                    attempts,
+                )
+            )
+
+
+class _WatchState:
+    """Uploads a watch has seen that were too recent to cancel, by when they are due."""
+
+    def __init__(self, older_than: float = None):
+        self.older_than = older_than
+        # heap of (due_at, bucket_name, file_id, file_name)
+        self._due = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._due)
+
+    def clear(self):
+        with self._lock:
+            self._due = []
+
+    def remember(self, bucket_name: str, recent):
+        """Add the ``(upload_timestamp, file_id, file_name)`` tuples of a bucket."""
+        if not recent or self.older_than is None:
+            return
+        with self._lock:
+            self._due.extend(
+                (timestamp / 1000 + self.older_than, bucket_name, file_id, file_name)
+                for timestamp, file_id, file_name in recent
+            )
+            heapq.heapify(self._due)
+
+    def pop_due(self, now: float = None):
+        """Remove and return the uploads due by ``now``, as PlanEntry lists by bucket."""
+        now = time.time() if now is None else now
+        due = {}
+        with self._lock:
+            while self._due and self._due[0][0] <= now:
+                _, bucket_name, file_id, file_name = heapq.heappop(self._due)
+                due.setdefault(bucket_name, []).append(PlanEntry(bucket_name, file_id, file_name))
+        return due
+
+
+class _CancelRun:
+    """Bookkeeping for one bucket's concurrent cancellation run."""
+
+    def __init__(self, tool: B2CleanupTool, summary: CleanupSummary, journal):
+        self.tool = tool
+        self.summary = summary
+        self.journal = journal
+        self.executor = None
+        # future -> (file_version, page, attempt)
+        self.in_flight = {}
+        # heap of (ready_at, seq, attempt, file_version, page)
+        self.retries = []
+        self.pages = deque()
+        self._seq = itertools.count()
+
+    @property
+    def waiting(self) -> int:
+        """Files listed but not yet handled, including those awaiting a retry."""
+        return len(self.in_flight) + len(self.retries)
+
+    def submit(self, file_version, page: _PageProgress, attempt: int = 0):
+        future = self.executor.submit(self.tool._cancel_one, file_version)
+        self.in_flight[future] = (file_version, page, attempt)
+        if attempt == 0:
+            page.pending += 1
+
+    def next_retry_in(self):
+        """Seconds until the next retry is due, or None if none is queued."""
+        if not self.retries:
+            return None
+        return max(0.0, self.retries[0][0] - time.monotonic())
+
+    def submit_due_retries(self):
+        budget = self.tool.budget
+        if budget is not None and self.retries and budget.out_of_calls:
+            # No call left to retry with: leave them all for a later run
+            self.summary.stopped = self.summary.stopped or budget.out_of_calls
+            self.summary.remaining += len(self.retries)
+            self.retries = []
+            return
+        now = time.monotonic()
+        while self.retries and self.retries[0][0] <= now:
+            _, _, attempt, file_version, page = heapq.heappop(self.retries)
+            if budget is not None and not budget.take_call():
+                self.summary.stopped = self.summary.stopped or budget.exhausted
+                self.summary.remaining += 1
+                continue
+            self.submit(file_version, page, attempt)
+
+    def collect(self, return_when, timeout=None):
+        done, _ = wait(self.in_flight, timeout=timeout, return_when=return_when)
+        for future in done:
+            file_version, page, attempt = self.in_flight.pop(future)
+            error = future.exception()
+            if error is None:
+                self.summary.record(file_version.file_id, file_version.file_name)
+                self.tool._count_cancelled(self.summary.bucket_name, file_version)
+                if self.journal is not None:
+                    self.journal.record_cancelled(self.summary.bucket_name, file_version.file_id)
+            elif is_transient(error) and attempt < self.tool.max_retries:
+                delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+                self.tool.metrics.retries.inc()
+                self.tool.logger.warning(
+                    "🔁 Retrying %s in %.1fs (attempt %d of %d): %s",
+                    file_version.file_id,
+                    delay,
+                    attempt + 2,
+                    self.tool.max_retries + 1,
+                    error,
+                )
+                heapq.heappush(
+                    self.retries,
+                    (time.monotonic() + delay, next(self._seq), attempt + 1, file_version, page),
+                )
+                continue
             else:
-                self.logger.info(f"🗑️ Cancelling {file_id} ({file_name})")
-                self.api.cancel_large_file(file_id)
\ No newline at end of file
+                self.tool._dead_letter(self.summary, file_version, error, attempt + 1)
+            page.pending -= 1
+        self.checkpoint()
+
+    def checkpoint(self):
+        """Drop fully handled pages and journal the cursor that follows them."""
+        cursor = None
+        while self.pages and self.pages[0].listed and self.pages[0].pending == 0:
+            cursor = self.pages.popleft().next_cursor
+        if cursor is not None and self.journal is not None:
+            self.journal.record_cursor(self.summary.bucket_name, cursor)
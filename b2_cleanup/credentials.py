@@ -0,0 +1,123 @@
+"""Find B2 credentials, including those stored by the b2 command-line tool."""
+
+import json
+import logging
+import os
+import sqlite3
+import subprocess
+import sys
+
+B2_ACCOUNT_INFO_ENV_VAR = "B2_ACCOUNT_INFO"
+B2_ACCOUNT_INFO_DEFAULT_FILE = "~/.b2_account_info"
+
+
+def b2_cli_account_info_path():
+    """Locate the account-info database of the b2 CLI.
+
+    Follows the same order as the b2 CLI: ``$B2_ACCOUNT_INFO``, then the
+    legacy ``~/.b2_account_info``, then ``$XDG_CONFIG_HOME/b2/account_info``
+    (``~/.config`` when unset) on XDG-compatible systems. Unlike b2sdk's own
+    resolver, nothing is created on disk.
+
+    Returns:
+        The path of the database, or None if the b2 CLI has none.
+    """
+    if B2_ACCOUNT_INFO_ENV_VAR in os.environ:
+        return os.path.expanduser(os.environ[B2_ACCOUNT_INFO_ENV_VAR])
+
+    default_file = os.path.expanduser(B2_ACCOUNT_INFO_DEFAULT_FILE)
+    if os.path.exists(default_file):
+        return default_file
+
+    xdg_config_home = os.getenv("XDG_CONFIG_HOME")
+    if xdg_config_home or sys.platform not in ("win32", "darwin"):
+        config_dir = xdg_config_home or os.path.expanduser("~/.config")
+        xdg_file = os.path.join(config_dir, "b2", "account_info")
+        if os.path.exists(xdg_file):
+            return xdg_file
+    return None
+
+
+def read_b2_cli_credentials(path: str = None):
+    """Read the application key the b2 CLI was authorized with.
+
+    The database is opened read-only, so a missing or foreign file is never
+    created or modified.
+
+    Args:
+        path: Database to read (defaults to the b2 CLI's own location)
+
+    Returns:
+        A ``(key_id, application_key)`` tuple, or None if no credentials are stored.
+    """
+    path = path or b2_cli_account_info_path()
+    if not path or not os.path.isfile(path):
+        return None
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            row = conn.execute(
+                "SELECT COALESCE(account_id_or_app_key_id, account_id), application_key "
+                "FROM account;"
+            ).fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+    if not row or not all(row):
+        return None
+    return row[0], row[1]
+
+
+def resolve_credentials(override_key_id: str = None, override_key: str = None, logger=None):
+    """Find the B2 application key to use, as both engines do.
+
+    Tries, in order: the override, the ``B2_APPLICATION_KEY_ID`` and
+    ``B2_APPLICATION_KEY`` environment variables, the b2 CLI's account info
+    database, and finally ``b2 account get``.
+
+    Args:
+        override_key_id: Optional B2 key ID to override env/config
+        override_key: Optional B2 application key to override env/config
+        logger: Logger that the source of the credentials is reported to
+
+    Returns:
+        A ``(key_id, application_key)`` tuple.
+
+    Raises:
+        RuntimeError: If no credentials can be found.
+    """
+    logger = logger or logging.getLogger("B2Cleanup")
+    if override_key_id and override_key:
+        logger.info("🔐 Using credentials from CLI override.")
+        return override_key_id, override_key
+
+    key_id = os.getenv("B2_APPLICATION_KEY_ID")
+    app_key = os.getenv("B2_APPLICATION_KEY")
+    if key_id and app_key:
+        logger.info("🔐 Using credentials from environment variables.")
+        return key_id, app_key
+
+    creds = read_b2_cli_credentials()
+    if creds:
+        logger.info("🔐 Using credentials from the b2 CLI account info.")
+        return creds
+
+    # Last resort: ask the b2 CLI itself, e.g. for a custom profile setup
+    logger.info("🔍 Trying to load credentials via `b2 account get`...")
+    try:
+        try:
+            result = subprocess.run(
+                ["b2", "account", "get"],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+        except FileNotFoundError:
+            logger.error("❌ Command 'b2' not found. Please install the B2 CLI or provide credentials.")
+            raise RuntimeError("B2 CLI not found. Please install it or provide credentials manually.")
+        creds = json.loads(result.stdout)
+        return creds["applicationKeyId"], creds["applicationKey"]
+    except (subprocess.CalledProcessError, KeyError, TypeError, json.JSONDecodeError) as e:
+        logger.error("❌ Failed to get B2 credentials from CLI or environment: %s", e)
+        raise RuntimeError("Could not authorize with Backblaze B2.")
@@ -0,0 +1,85 @@
+"""Dead-letter output for uploads that could not be cancelled."""
+
+import json
+import threading
+
+
+class DeadLetter:
+    """An upload whose cancellation failed for good."""
+
+    __slots__ = ("bucket_name", "file_id", "file_name", "error", "attempts")
+
+    def __init__(self, bucket_name, file_id, file_name, error="", attempts=1):
+        self.bucket_name = bucket_name
+        self.file_id = file_id
+        self.file_name = file_name
+        self.error = error
+        self.attempts = attempts
+
+    def to_dict(self):
+        return {
+            "bucket": self.bucket_name,
+            "fileId": self.file_id,
+            "fileName": self.file_name,
+            "error": self.error,
+            "attempts": self.attempts,
+        }
+
+    @classmethod
+    def from_dict(cls, record):
+        return cls(
+            record["bucket"],
+            record["fileId"],
+            record.get("fileName"),
+            record.get("error", ""),
+            record.get("attempts", 1),
+        )
+
+
+class DeadLetterWriter:
+    """Append failed cancellations to a JSON Lines file.
+
+    The file is opened on the first failure, so a clean run leaves no file
+    behind. Each record is flushed as it is written.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.written = 0
+        self._file = None
+        self._lock = threading.Lock()
+
+    def write(self, dead_letter: DeadLetter):
+        """Append one failed cancellation."""
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a")
+            self._file.write(json.dumps(dead_letter.to_dict()) + "\n")
+            self._file.flush()
+            self.written += 1
+
+    def close(self):
+        """Close the file, if it was opened."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def read_dead_letters(path: str):
+    """Read the failed cancellations recorded in a dead-letter file.
+
+    Lines that cannot be parsed (for example a line torn by a crash) are
+    skipped.
+
+    Returns:
+        A list of DeadLetter entries, in file order.
+    """
+    dead_letters = []
+    with open(path) as f:
+        for line in f:
+            try:
+                dead_letters.append(DeadLetter.from_dict(json.loads(line)))
+            except (ValueError, KeyError, TypeError):
+                continue
+    return dead_letters
@@ -0,0 +1,23 @@
+"""Default settings shared by the library and the CLI.
+
+This module must stay free of heavy imports: the CLI reads it at startup.
+"""
+
+DEFAULT_WORKERS = 10
+DEFAULT_BUCKET_WORKERS = 4
+DEFAULT_MAX_RETRIES = 3
+# Cancellations in flight with the async engine; each holds one pooled connection
+DEFAULT_ASYNC_CONCURRENCY = 100
+
+# b2_list_unfinished_large_files returns at most 100 entries per call.
+MAX_PAGE_SIZE = 100
+DEFAULT_PAGE_SIZE = MAX_PAGE_SIZE
+
+# B2 storage price in USD per GB-month (decimal GB), used for cost estimates.
+DEFAULT_STORAGE_PRICE = 0.006
+
+# Orders in which listed uploads are cancelled. "oldest" holds at most this
+# many of a bucket's oldest uploads at a time (or --max-cancels, if lower);
+# larger buckets are listed again for the next batch.
+ORDERS = ("listing", "oldest")
+OLDEST_FIRST_LIMIT = 100_000
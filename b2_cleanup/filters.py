@@ -0,0 +1,124 @@
+"""Selection of which unfinished uploads to clean up.
+
+Kept free of b2sdk imports so the CLI can use it to validate options.
+"""
+
+import fnmatch
+import re
+import time
+import zlib
+
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)([smhdw]?)")
+
+
+def parse_duration(value: str) -> float:
+    """Parse a duration such as ``90s``, ``30m``, ``12h``, ``7d`` or ``2w``.
+
+    Compound durations (``1d12h``) are allowed. A bare number is in seconds.
+
+    Returns:
+        The duration in seconds.
+
+    Raises:
+        ValueError: If the value is not a valid duration.
+    """
+    value = value.strip().lower()
+    pos = 0
+    total = 0.0
+    for match in _DURATION_RE.finditer(value):
+        if match.start() != pos:
+            break
+        total += float(match.group(1)) * _DURATION_UNITS[match.group(2) or "s"]
+        pos = match.end()
+    if not value or pos != len(value):
+        raise ValueError(f"invalid duration: {value!r}")
+    return total
+
+
+def parse_shard(value: str):
+    """Parse a shard specification such as ``2/4`` or ``auto/4``.
+
+    Shards are numbered from 1. ``auto`` leaves the shard to be claimed
+    through a lease file.
+
+    Returns:
+        An ``(index, count)`` tuple; ``index`` is None for ``auto``.
+
+    Raises:
+        ValueError: If the value is not a valid shard specification.
+    """
+    index, sep, count = value.strip().lower().partition("/")
+    try:
+        count = int(count)
+        index = None if index == "auto" else int(index)
+    except ValueError:
+        raise ValueError(f"invalid shard: {value!r}, expected INDEX/COUNT or auto/COUNT")
+    if not sep or count < 1 or (index is not None and not 1 <= index <= count):
+        raise ValueError(f"invalid shard: {value!r}, expected 1 <= INDEX <= COUNT")
+    return index, count
+
+
+def shard_of(file_id: str, count: int) -> int:
+    """Return the shard (1 to ``count``) that ``file_id`` belongs to.
+
+    The hash is stable across processes and hosts, unlike ``hash()``.
+    """
+    return zlib.crc32(file_id.encode()) % count + 1
+
+
+class UploadFilter:
+    """Decide from the raw listing entry whether an upload should be cleaned up.
+
+    Entries are tested before any file object is built for them, so uploads
+    that are filtered out cost nothing beyond the listing response itself.
+    """
+
+    def __init__(
+        self,
+        older_than: float = None,
+        exclude=(),
+        now: float = None,
+        shard=None,
+        keep_recent: bool = False,
+    ):
+        """Initialize the filter.
+
+        Args:
+            older_than: Only select uploads started at least this many seconds ago
+            exclude: Glob patterns of file names to leave alone
+            now: Reference time in seconds since the epoch (defaults to now)
+            shard: Optional ``(index, count)``; only select uploads in that shard
+            keep_recent: If True, collect the uploads rejected only for being
+                too recent in ``recent``, as ``(upload_timestamp, file_id,
+                file_name)`` tuples
+        """
+        self.older_than = older_than
+        self.exclude = tuple(exclude)
+        self.shard = shard
+        self.skipped = 0
+        self.other_shards = 0
+        self.recent = [] if keep_recent else None
+        if older_than is None:
+            self._cutoff_ms = None
+        else:
+            self._cutoff_ms = ((time.time() if now is None else now) - older_than) * 1000
+
+    def __call__(self, file_dict: dict) -> bool:
+        """Return True if the upload described by ``file_dict`` is selected."""
+        if self.shard is not None:
+            index, count = self.shard
+            if shard_of(file_dict["fileId"], count) != index:
+                self.other_shards += 1
+                return False
+        if any(fnmatch.fnmatchcase(file_dict["fileName"], pattern) for pattern in self.exclude):
+            self.skipped += 1
+            return False
+        if self._cutoff_ms is not None and file_dict["uploadTimestamp"] > self._cutoff_ms:
+            self.skipped += 1
+            if self.recent is not None:
+                self.recent.append(
+                    (file_dict["uploadTimestamp"], file_dict["fileId"], file_dict["fileName"])
+                )
+            return False
+        return True
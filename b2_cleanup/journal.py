@@ -0,0 +1,105 @@
+"""Append-only checkpoint journal for resumable cleanup runs."""
+
+import json
+import os
+import tempfile
+import threading
+
+
+class BucketCheckpoint:
+    """Progress recorded for one bucket."""
+
+    def __init__(self):
+        self.cursor = None
+        self.cancelled = set()
+
+
+class CheckpointJournal:
+    """Record cleanup progress so an interrupted run can be resumed.
+
+    The journal is a JSON Lines file with one record per line:
+
+    - ``{"bucket": ..., "cursor": ...}``: every upload listed before this
+      cursor (the start file ID of the next page) has been handled
+    - ``{"bucket": ..., "cancelled": ...}``: an upload that was cancelled
+    - ``{"bucket": ..., "complete": true}``: the bucket was fully processed,
+      so the next run starts it from scratch
+
+    Records are appended and flushed one at a time, so at most the line being
+    written is lost if the process dies. On open, the file is rewritten with
+    only the state that is still relevant, which keeps it from growing across
+    runs.
+    """
+
+    def __init__(self, path: str):
+        """Open (or create) the journal at ``path``."""
+        self.path = path
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._load()
+        self._compact()
+        self._file = open(self.path, "a")
+
+    def _load(self):
+        try:
+            f = open(self.path)
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    bucket_name = record["bucket"]
+                except (ValueError, KeyError, TypeError):
+                    # A torn last line from a crash; everything before it is valid
+                    continue
+                if record.get("complete"):
+                    self._buckets.pop(bucket_name, None)
+                    continue
+                checkpoint = self._buckets.setdefault(bucket_name, BucketCheckpoint())
+                if "cursor" in record:
+                    checkpoint.cursor = record["cursor"]
+                if "cancelled" in record:
+                    checkpoint.cancelled.add(record["cancelled"])
+
+    def _compact(self):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)))
+        with os.fdopen(fd, "w") as f:
+            for bucket_name, checkpoint in self._buckets.items():
+                if checkpoint.cursor is not None:
+                    f.write(json.dumps({"bucket": bucket_name, "cursor": checkpoint.cursor}) + "\n")
+                for file_id in sorted(checkpoint.cancelled):
+                    f.write(json.dumps({"bucket": bucket_name, "cancelled": file_id}) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def _append(self, record: dict):
+        with self._lock:
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+
+    def cursor(self, bucket_name: str):
+        """Return the file ID to resume listing ``bucket_name`` from, or None."""
+        checkpoint = self._buckets.get(bucket_name)
+        return checkpoint.cursor if checkpoint else None
+
+    def is_cancelled(self, bucket_name: str, file_id: str) -> bool:
+        """Return True if ``file_id`` was cancelled by an earlier run."""
+        checkpoint = self._buckets.get(bucket_name)
+        return checkpoint is not None and file_id in checkpoint.cancelled
+
+    def record_cursor(self, bucket_name: str, cursor: str):
+        """Record that everything listed before ``cursor`` has been handled."""
+        self._append({"bucket": bucket_name, "cursor": cursor})
+
+    def record_cancelled(self, bucket_name: str, file_id: str):
+        """Record that ``file_id`` was cancelled."""
+        self._append({"bucket": bucket_name, "cancelled": file_id})
+
+    def record_complete(self, bucket_name: str):
+        """Record that ``bucket_name`` was fully processed."""
+        self._append({"bucket": bucket_name, "complete": True})
+
+    def close(self):
+        """Close the journal file."""
+        with self._lock:
+            self._file.close()
@@ -0,0 +1,101 @@
+"""Shard leases: lock files on shared storage that keep shards from running twice."""
+
+import json
+import os
+import socket
+import threading
+import time
+
+DEFAULT_LEASE_TTL = 60.0
+
+
+class ShardLease:
+    """Claim one of ``count`` shards through a lease file in a shared directory.
+
+    Each shard has a lease file, ``shard-<index>-of-<count>.lease``, created
+    exclusively by the process that runs the shard. While the shard runs, a
+    background thread touches the file every ``ttl / 3`` seconds. A lease
+    that has not been touched for ``ttl`` seconds belongs to a process that
+    died and may be taken over. Taking over a stale lease is not atomic, so
+    ``ttl`` should be well above any pause a live process might have.
+    """
+
+    def __init__(self, directory: str, count: int, ttl: float = DEFAULT_LEASE_TTL):
+        """Initialize the lease; nothing is claimed until ``acquire``.
+
+        Args:
+            directory: Directory on storage shared by all participating hosts
+            count: Total number of shards
+            ttl: Seconds after which an untouched lease is considered stale
+        """
+        self.directory = directory
+        self.count = count
+        self.ttl = ttl
+        self.index = None
+        self._stop = threading.Event()
+        self._heartbeat = None
+
+    def path(self, index: int) -> str:
+        return os.path.join(self.directory, f"shard-{index}-of-{self.count}.lease")
+
+    def _try_claim(self, index: int) -> bool:
+        path = self.path(index)
+        try:
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            pass
+        else:
+            if time.time() - mtime < self.ttl:
+                return False
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w") as f:
+            json.dump({"host": socket.gethostname(), "pid": os.getpid()}, f)
+        return True
+
+    def acquire(self, index: int = None) -> int:
+        """Claim shard ``index``, or the first free shard if it is None.
+
+        Returns:
+            The index of the claimed shard, from 1 to ``count``.
+
+        Raises:
+            RuntimeError: If the shard (or every shard) is already held.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        candidates = [index] if index is not None else range(1, self.count + 1)
+        for candidate in candidates:
+            if self._try_claim(candidate):
+                self.index = candidate
+                self._heartbeat = threading.Thread(target=self._renew, daemon=True)
+                self._heartbeat.start()
+                return candidate
+        if index is not None:
+            raise RuntimeError(f"Shard {index}/{self.count} is already held ({self.path(index)})")
+        raise RuntimeError(f"All {self.count} shards are already held in {self.directory}")
+
+    def _renew(self):
+        while not self._stop.wait(self.ttl / 3):
+            try:
+                os.utime(self.path(self.index))
+            except OSError:
+                # Shared storage hiccup; the next heartbeat will try again
+                pass
+
+    def release(self):
+        """Stop renewing the lease and remove its file."""
+        if self.index is None:
+            return
+        self._stop.set()
+        self._heartbeat.join()
+        try:
+            os.remove(self.path(self.index))
+        except FileNotFoundError:
+            pass
+        self.index = None
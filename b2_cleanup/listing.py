@@ -0,0 +1,239 @@
+"""Paginated listing of unfinished large files."""
+
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .defaults import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from .records import UploadRecord
+
+# Discovery makes one call per partition found; past this, list unpartitioned
+MAX_DISCOVERED_PARTITIONS = 1000
+
+
+class UnfinishedFileLister:
+    """Iterate over the unfinished large files of a bucket, page by page.
+
+    Pages are requested directly through the B2 session so that the page
+    size and the cursor (the ``nextFileId`` of each page) are under our
+    control. While the caller is processing one page, the next one is
+    already being fetched in a background thread, so listing costs roughly
+    one round trip per page and overlaps with the caller's work. Entries are
+    yielded as compact UploadRecord objects.
+    """
+
+    def __init__(
+        self,
+        api,
+        bucket_id: str,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        start_file_id: str = None,
+        prefetch: bool = True,
+        limiter=None,
+        prefix: str = None,
+        upload_filter=None,
+        metrics=None,
+        bucket_name: str = None,
+        budget=None,
+    ):
+        """Initialize the lister.
+
+        Args:
+            api: An authorized B2Api instance
+            bucket_id: ID of the bucket to list
+            page_size: Number of entries requested per page (1-100)
+            start_file_id: Optional file ID to start listing from
+            prefetch: If True, fetch the next page while the current one is processed
+            limiter: Optional AdaptiveLimiter that page requests are subject to
+            prefix: Only list uploads whose name starts with this (filtered server-side)
+            upload_filter: Optional predicate on the raw file dicts of a page;
+                entries it rejects are dropped before any file object is built
+            metrics: Optional Metrics that page request latencies are recorded in
+            bucket_name: Name of the bucket, recorded in every UploadRecord
+            budget: Optional RunBudget each page request is taken from; once
+                any of its limits is reached (cancellations included, as
+                nothing listed after that could be cancelled), the listing
+                ends early and ``stopped`` is set
+        """
+        if not 1 <= page_size <= MAX_PAGE_SIZE:
+            raise ValueError(f"page_size must be between 1 and {MAX_PAGE_SIZE}")
+        self.api = api
+        self.bucket_id = bucket_id
+        self.page_size = page_size
+        self.start_file_id = start_file_id
+        self.prefetch = prefetch
+        self.limiter = limiter
+        self.prefix = prefix
+        self.upload_filter = upload_filter
+        self.metrics = metrics
+        self.bucket_name = bucket_name
+        self.budget = budget
+        self.stopped = False
+        self.pages_fetched = 0
+
+    def _fetch_page(self, start_file_id):
+        if self.budget is not None and (self.budget.exhausted or not self.budget.take_call()):
+            # An empty page whose cursor is where listing stopped, for the journal
+            self.stopped = True
+            return [], start_file_id
+        if self.limiter is None:
+            response = self._request_page(start_file_id)
+        else:
+            with self.limiter:
+                response = self._request_page(start_file_id)
+            self.limiter.on_success()
+        self.pages_fetched += 1
+        file_dicts = response["files"]
+        if self.upload_filter is not None:
+            file_dicts = filter(self.upload_filter, file_dicts)
+        bucket_name = self.bucket_name
+        files = [UploadRecord.from_file_dict(file_dict, bucket_name) for file_dict in file_dicts]
+        return files, response.get("nextFileId")
+
+    def _request_page(self, start_file_id):
+        args = (self.bucket_id, start_file_id, self.page_size)
+        if self.prefix:
+            args += (self.prefix,)
+        if self.metrics is None:
+            return self.api.session.list_unfinished_large_files(*args)
+        start = time.perf_counter()
+        response = self.api.session.list_unfinished_large_files(*args)
+        self.metrics.list_seconds.observe(time.perf_counter() - start)
+        return response
+
+    def pages(self):
+        """Yield ``(files, next_file_id)`` tuples, one per listing page.
+
+        ``next_file_id`` is the cursor to resume listing after this page, or
+        None on the last page. If the budget runs out, the last page is
+        empty and its cursor is not None.
+        """
+        if not self.prefetch:
+            start_file_id = self.start_file_id
+            while True:
+                files, start_file_id = self._fetch_page(start_file_id)
+                yield files, start_file_id
+                if start_file_id is None or self.stopped:
+                    return
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(self._fetch_page, self.start_file_id)
+            while future is not None:
+                files, next_file_id = future.result()
+                future = None
+                if next_file_id is not None and not self.stopped:
+                    future = executor.submit(self._fetch_page, next_file_id)
+                yield files, next_file_id
+
+    def __iter__(self):
+        for files, _ in self.pages():
+            yield from files
+
+
+def _after(prefix: str) -> str:
+    """Return the smallest string that sorts after every name starting with ``prefix``."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def discover_partitions(
+    api,
+    bucket_id: str,
+    prefix: str = "",
+    delimiter: str = "/",
+    limit: int = MAX_DISCOVERED_PARTITIONS,
+    limiter=None,
+    budget=None,
+):
+    """Split the names under ``prefix`` into top-level "folders" and loose files.
+
+    ``b2_list_file_versions`` is sorted by name and includes unfinished
+    uploads, so this skip-scans it: each call fetches one name, records its
+    top-level folder (or the name itself, for a file outside any folder) as
+    a partition, and restarts after everything that partition covers. The
+    partitions are disjoint and cover every name that existed at the time.
+    With a RunBudget, each call is taken from it, and discovery stops when
+    it runs out; the partitions found so far then cover only part of the
+    names, so callers should check the budget before using them.
+
+    Returns:
+        A list of prefixes in name order, or None if there are more than
+        ``limit`` of them.
+    """
+    partitions = []
+    start_file_name = prefix or None
+    while True:
+        if budget is not None and not budget.take_call():
+            return partitions
+        args = (bucket_id, start_file_name, None, 1, prefix or None)
+        if limiter is None:
+            response = api.session.list_file_versions(*args)
+        else:
+            with limiter:
+                response = api.session.list_file_versions(*args)
+            limiter.on_success()
+        if not response["files"]:
+            return partitions
+        name = response["files"][0]["fileName"]
+        head, sep, _ = name[len(prefix):].partition(delimiter)
+        partition = prefix + head + sep if sep else name
+        if len(partitions) == limit:
+            return None
+        partitions.append(partition)
+        start_file_name = _after(partition)
+
+
+def merge_pages(listers, workers: int = None):
+    """List several partitions concurrently and yield their pages as one stream.
+
+    Pages are yielded as ``(files, None)`` in arrival order: there is no
+    single cursor to resume a merged listing from. At most a couple of pages
+    per worker are buffered. An error in any partition stops the others and
+    is raised to the caller.
+
+    Args:
+        listers: UnfinishedFileLister objects for disjoint partitions
+        workers: Number of partitions listed at once (defaults to all)
+    """
+    workers = workers or len(listers)
+    pages = queue.Queue(maxsize=2 * workers)
+    stop = threading.Event()
+    done = object()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def produce(lister):
+        try:
+            if stop.is_set():
+                return
+            for files, _ in lister.pages():
+                if stop.is_set():
+                    return
+                if files:
+                    put((files, None))
+        except Exception as e:
+            put(e)
+        finally:
+            put(done)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for lister in listers:
+            executor.submit(produce, lister)
+        try:
+            remaining = len(listers)
+            while remaining:
+                item = pages.get()
+                if item is done:
+                    remaining -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            stop.set()
@@ -0,0 +1,98 @@
+"""Logging setup for the CLI: log lines are formatted and written off the calling thread."""
+
+import copy
+import json
+import logging
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMATS = ("text", "json")
+# Attributes every LogRecord has; anything else was passed with ``extra``
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Format each record as one JSON object, including any ``extra`` fields."""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            # Rendered before the record was queued; see _TracebackQueueHandler
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _TracebackQueueHandler(QueueHandler):
+    """Queue records with their traceback kept apart from the message.
+
+    QueueHandler.prepare formats the whole line in the calling thread, folds
+    the traceback into the message and drops ``exc_info``, so JSON lines
+    would lose their ``"exception"`` field. This merges only the message
+    arguments, and keeps the traceback as text in ``exc_text``, which every
+    formatter outputs.
+    """
+
+    def prepare(self, record):
+        message = record.getMessage()
+        exc_text = record.exc_text
+        if record.exc_info and not exc_text:
+            exc_text = logging.Formatter().formatException(record.exc_info)
+        record = copy.copy(record)
+        record.message = record.msg = message
+        record.args = None
+        record.exc_info = None
+        record.exc_text = exc_text
+        return record
+
+
+def setup_logging(log_file: str, log_format: str = "text", verbose: bool = False):
+    """Log to ``log_file`` and stderr through a queue drained by a background thread.
+
+    The root logger only gets a QueueHandler, so logging a line costs the
+    caller merging the message arguments (and rendering the traceback, if
+    any) and a queue put. Formatting the line and I/O are done by the
+    returned QueueListener, which must be stopped to flush the queue before
+    exit.
+
+    Args:
+        log_file: Path of the log file
+        log_format: "text", or "json" for one JSON object per line
+        verbose: If True, also log the tool's debug lines, such as one per
+            upload past the first few of each bucket
+
+    Returns:
+        The started QueueListener.
+    """
+    if log_format == "json":
+        file_formatter = stream_formatter = JsonFormatter()
+    else:
+        file_formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
+        stream_formatter = logging.Formatter("%(message)s")
+
+    file_handler = logging.FileHandler(log_file)
+    file_handler.setFormatter(file_formatter)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(stream_formatter)
+
+    records = queue.SimpleQueue()
+    logger = logging.getLogger()
+    logger.setLevel(logging.INFO)
+    if logger.hasHandlers():
+        logger.handlers.clear()
+    logger.addHandler(_TracebackQueueHandler(records))
+    logging.getLogger("B2Cleanup").setLevel(logging.DEBUG if verbose else logging.NOTSET)
+
+    listener = QueueListener(records, file_handler, stream_handler)
+    listener.start()
+    return listener
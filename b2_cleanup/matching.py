@@ -0,0 +1,82 @@
+"""Suggestions for mistyped bucket names, from a trigram index."""
+
+import heapq
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+
+# Names scored with SequenceMatcher per lookup, at least; smaller indexes score every name
+MIN_CANDIDATES = 24
+
+
+def trigrams(name: str) -> set:
+    """The lowercase three-character substrings of ``name``, padded at both ends."""
+    padded = f"  {name.lower()} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class BucketNameIndex:
+    """Suggest the bucket names closest to a name that was not found.
+
+    Suggestions are ranked like ``difflib.get_close_matches``, by
+    ``SequenceMatcher`` ratio, but only a few candidates are scored: an
+    inverted index from trigrams to names picks those sharing the most
+    distinctive trigrams with the query. Trigrams found in a large share of
+    the names (``-backups``, a company prefix) say little about which one
+    was meant and are skipped while there are rarer ones. Lookups take under
+    a millisecond for thousands of buckets, where scoring every name
+    takes tens of milliseconds.
+    """
+
+    def __init__(self, names):
+        self.names = list(names)
+        self._postings = defaultdict(list)
+        self._sizes = []
+        for index, name in enumerate(self.names):
+            grams = trigrams(name)
+            self._sizes.append(len(grams))
+            for gram in grams:
+                self._postings[gram].append(index)
+        self._common = max(MIN_CANDIDATES, len(self.names) // 8)
+
+    def __len__(self):
+        return len(self.names)
+
+    def _candidates(self, name: str, count: int):
+        """Return the indexes of up to ``count`` names most similar by trigrams."""
+        grams = trigrams(name)
+        postings = [self._postings.get(gram, ()) for gram in grams]
+        rare = [p for p in postings if len(p) <= self._common] or postings
+        shared = Counter()
+        for posting in rare:
+            shared.update(posting)
+        sizes = self._sizes
+        query_size = len(grams)
+        best = heapq.nlargest(
+            count, shared.items(), key=lambda item: item[1] / (sizes[item[0]] + query_size)
+        )
+        return [index for index, _ in best]
+
+    def suggest(self, name: str, n: int = 3, cutoff: float = 0.6):
+        """Return up to ``n`` bucket names similar to ``name``, best first.
+
+        Args:
+            name: The bucket name that was not found
+            n: Maximum number of suggestions
+            cutoff: Minimum ``SequenceMatcher`` ratio, between 0 and 1
+        """
+        count = max(MIN_CANDIDATES, 8 * n)
+        if len(self.names) <= count:
+            candidates = range(len(self.names))
+        else:
+            candidates = self._candidates(name, count)
+        matcher = SequenceMatcher()
+        matcher.set_seq2(name)
+        scored = []
+        for index in candidates:
+            matcher.set_seq1(self.names[index])
+            if matcher.real_quick_ratio() < cutoff or matcher.quick_ratio() < cutoff:
+                continue
+            ratio = matcher.ratio()
+            if ratio >= cutoff:
+                scored.append((ratio, self.names[index]))
+        return [match for _, match in heapq.nlargest(n, scored)]
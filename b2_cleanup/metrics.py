@@ -0,0 +1,243 @@
+"""Prometheus metrics for cleanup runs, without a client library dependency.
+
+Metrics are kept in memory and rendered in the Prometheus text exposition
+format, either to a file for node_exporter's textfile collector or over
+HTTP from a small background server.
+"""
+
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Latency buckets in seconds, the Prometheus client defaults
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(sorted(labels.items()))
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            lines.extend(self._render_value(labels, value))
+        return lines
+
+    def _render_value(self, labels, value):
+        return [f"{self.name}{_format_labels(labels)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    """A count that only goes up."""
+
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """A value that is set."""
+
+    type = "gauge"
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels))
+
+
+class Histogram(_Metric):
+    """A distribution of observed values, such as call latencies."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, buckets=LATENCY_BUCKETS):
+        super().__init__(name, help)
+        self.buckets = tuple(buckets) + (float("inf"),)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            counts, _ = self._values.get(self._key(labels), ([0], 0.0))
+        return counts[-1]
+
+    def _render_value(self, labels, value):
+        counts, total = value
+        lines = [
+            f"{self.name}_bucket{_format_labels(labels + (('le', _format_value(bound)),))} {count}"
+            for bound, count in zip(self.buckets, counts)
+        ]
+        lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+        lines.append(f"{self.name}_count{_format_labels(labels)} {counts[-1]}")
+        return lines
+
+
+class Metrics:
+    """The metrics of one B2CleanupTool.
+
+    Call latencies, per-bucket upload counters, retries and throttling are
+    recorded as the run goes. ``render`` returns them in the Prometheus text
+    format; ``write_textfile`` and ``serve`` export them.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.list_seconds = Histogram(
+            "b2_cleanup_list_page_seconds", "Latency of b2_list_unfinished_large_files calls."
+        )
+        self.cancel_seconds = Histogram(
+            "b2_cleanup_cancel_seconds", "Latency of b2_cancel_large_file calls."
+        )
+        self.found = Counter("b2_cleanup_uploads_found_total", "Unfinished uploads found.")
+        self.cancelled = Counter("b2_cleanup_uploads_cancelled_total", "Unfinished uploads cancelled.")
+        self.failed = Counter(
+            "b2_cleanup_uploads_failed_total", "Unfinished uploads that could not be cancelled."
+        )
+        self.skipped = Counter(
+            "b2_cleanup_uploads_skipped_total", "Unfinished uploads left alone by the filters."
+        )
+        self.reclaimed_bytes = Counter(
+            "b2_cleanup_reclaimed_bytes_total",
+            "Bytes held by cancelled uploads whose part total was known.",
+        )
+        self.retries = Counter("b2_cleanup_retries_total", "Cancellations retried after a transient error.")
+        self.throttled = Counter(
+            "b2_cleanup_throttled_total", "Throttling responses (HTTP 429/503) from B2."
+        )
+        self.last_run = Gauge(
+            "b2_cleanup_last_run_timestamp_seconds", "When the last run finished, in Unix time."
+        )
+        self.run_duration = Gauge("b2_cleanup_run_duration_seconds", "Duration of the last run.")
+        self.concurrency_limit = Gauge(
+            "b2_cleanup_concurrency_limit", "Calls the adaptive rate controller lets run at once."
+        )
+        self.call_rate = Gauge(
+            "b2_cleanup_call_rate", "API calls completed per second, over the last few seconds."
+        )
+        self._server = None
+
+    @property
+    def all(self):
+        return (
+            self.list_seconds,
+            self.cancel_seconds,
+            self.found,
+            self.cancelled,
+            self.failed,
+            self.skipped,
+            self.reclaimed_bytes,
+            self.retries,
+            self.throttled,
+            self.last_run,
+            self.run_duration,
+            self.concurrency_limit,
+            self.call_rate,
+        )
+
+    def observe_limiter(self, limiter):
+        """Record the current limit and call rate of an AdaptiveLimiter."""
+        self.concurrency_limit.set(limiter.limit)
+        self.call_rate.set(round(limiter.rate, 3))
+
+    def finish(self):
+        """Record the end of the run."""
+        now = time.time()
+        self.last_run.set(now)
+        self.run_duration.set(now - self.started)
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self.all:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str):
+        """Write the metrics to ``path`` atomically, for the textfile collector."""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(self.render())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+
+    def serve(self, port: int, host: str = "127.0.0.1"):
+        """Serve the metrics on ``http://host:port/metrics`` from a background thread.
+
+        Returns:
+            The port actually bound, useful when ``port`` is 0.
+        """
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server.server_address[1]
+
+    def stop(self):
+        """Stop the HTTP server, if one is running."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,109 @@
+"""Plan files: the uploads a run would cancel, written for review and applied later."""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+from .records import UploadRecord
+
+
+# A plan entry is the record the listing produces, so plans need no conversion
+PlanEntry = UploadRecord
+
+
+class PlanSection:
+    """The entries of one bucket, spooled to a temporary file until complete."""
+
+    def __init__(self, writer, bucket_name: str):
+        self.writer = writer
+        self.bucket_name = bucket_name
+        self.written = 0
+        self._file = tempfile.TemporaryFile("w+", dir=writer.directory)
+
+    def write(self, record):
+        """Add an upload to the plan."""
+        entry = PlanEntry(
+            self.bucket_name, record.file_id, record.file_name, record.upload_timestamp
+        )
+        self._file.write(json.dumps(entry.to_dict(), separators=(",", ":")) + "\n")
+        self.written += 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.writer._append(self)
+        finally:
+            self._file.close()
+        return False
+
+
+class PlanWriter:
+    """Write a plan file in JSON Lines format, one upload per line.
+
+    Buckets are planned in parallel, so each one is written to its own
+    ``section`` and only appended to the plan once it has been listed in
+    full; a bucket whose listing fails is left out entirely. The plan is
+    built in a temporary file and moved into place by ``close``, so a plan
+    file on disk is never half-written.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.directory = os.path.dirname(os.path.abspath(path))
+        self.written = 0
+        self._lock = threading.Lock()
+        fd, self._tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        self._file = os.fdopen(fd, "w")
+
+    def section(self, bucket_name: str) -> PlanSection:
+        """Start the entries of ``bucket_name``; use as a context manager."""
+        return PlanSection(self, bucket_name)
+
+    def _append(self, section: PlanSection):
+        section._file.seek(0)
+        with self._lock:
+            shutil.copyfileobj(section._file, self._file)
+            self.written += section.written
+
+    def close(self, discard: bool = False):
+        """Move the finished plan into place, or with ``discard`` throw it away.
+
+        A run that failed should discard its plan: an incomplete plan would
+        otherwise look like a complete one to ``apply_plan``.
+        """
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.close()
+            if discard:
+                os.unlink(self._tmp_path)
+            else:
+                os.replace(self._tmp_path, self.path)
+
+
+def read_plan(path: str):
+    """Stream the entries of a plan file.
+
+    Blank lines and lines starting with ``#`` are ignored, so a plan can be
+    annotated or trimmed during review.
+
+    Yields:
+        PlanEntry objects, in file order.
+
+    Raises:
+        ValueError: If a line is not a valid plan entry.
+    """
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                yield PlanEntry.from_dict(json.loads(line))
+            except (ValueError, KeyError, TypeError):
+                raise ValueError(f"{path}:{line_number}: invalid plan entry")
@@ -0,0 +1,119 @@
+"""Compact records of unfinished uploads.
+
+A listing entry is turned into an UploadRecord as soon as it arrives: the
+cleanup only ever needs the file ID, the name, when the upload started and
+the bucket, so the rest of the entry (file info, content type, retention
+settings, ...) is dropped straight away. Where many uploads have to be held
+at once, UploadRecords stores the same fields column-wise instead of as one
+object per upload.
+"""
+
+from array import array
+
+# Stored in the timestamp column for records without an upload timestamp
+_NO_TIMESTAMP = -1
+
+
+class UploadRecord:
+    """One unfinished upload: its bucket, file ID, file name and start time."""
+
+    __slots__ = ("bucket_name", "file_id", "file_name", "upload_timestamp")
+
+    def __init__(self, bucket_name, file_id, file_name, upload_timestamp=None):
+        self.bucket_name = bucket_name
+        self.file_id = file_id
+        self.file_name = file_name
+        self.upload_timestamp = upload_timestamp
+
+    @classmethod
+    def from_file_dict(cls, file_dict, bucket_name=None):
+        """Build a record from a raw ``b2_list_unfinished_large_files`` entry."""
+        return cls(
+            bucket_name,
+            file_dict["fileId"],
+            file_dict["fileName"],
+            file_dict.get("uploadTimestamp"),
+        )
+
+    def to_dict(self):
+        return {
+            "bucket": self.bucket_name,
+            "fileId": self.file_id,
+            "fileName": self.file_name,
+            "uploadTimestamp": self.upload_timestamp,
+        }
+
+    @classmethod
+    def from_dict(cls, record):
+        return cls(
+            record["bucket"],
+            record["fileId"],
+            record.get("fileName"),
+            record.get("uploadTimestamp"),
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, UploadRecord):
+            return NotImplemented
+        return (
+            self.bucket_name == other.bucket_name
+            and self.file_id == other.file_id
+            and self.file_name == other.file_name
+            and self.upload_timestamp == other.upload_timestamp
+        )
+
+    def __hash__(self):
+        return hash((self.bucket_name, self.file_id))
+
+    def __repr__(self):
+        return f"<UploadRecord {self.bucket_name!r} {self.file_id!r} {self.file_name!r}>"
+
+
+class UploadRecords:
+    """A list of the uploads of one bucket, stored column by column.
+
+    Each upload costs two list slots (the ID and name strings are shared
+    with the listing, not copied) and eight bytes of timestamp, rather than
+    a Python object of its own. Indexing and iteration build UploadRecord
+    objects on the fly.
+    """
+
+    def __init__(self, bucket_name: str = None, records=()):
+        self.bucket_name = bucket_name
+        self._file_ids = []
+        self._file_names = []
+        self._timestamps = array("q")
+        for record in records:
+            self.append(record)
+
+    @staticmethod
+    def _timestamp(record):
+        timestamp = record.upload_timestamp
+        return _NO_TIMESTAMP if timestamp is None else timestamp
+
+    def append(self, record):
+        """Add ``record`` (any object with ``file_id``, ``file_name`` and ``upload_timestamp``)."""
+        self._file_ids.append(record.file_id)
+        self._file_names.append(record.file_name)
+        self._timestamps.append(self._timestamp(record))
+
+    def __setitem__(self, index, record):
+        self._file_ids[index] = record.file_id
+        self._file_names[index] = record.file_name
+        self._timestamps[index] = self._timestamp(record)
+
+    def __getitem__(self, index):
+        timestamp = self._timestamps[index]
+        return UploadRecord(
+            self.bucket_name,
+            self._file_ids[index],
+            self._file_names[index],
+            None if timestamp == _NO_TIMESTAMP else timestamp,
+        )
+
+    def __len__(self):
+        return len(self._file_ids)
+
+    def __iter__(self):
+        for index in range(len(self._file_ids)):
+            yield self[index]
@@ -0,0 +1,215 @@
+"""Reclaimable storage reports for unfinished uploads.
+
+The parts of an unfinished large file are billed as stored data until the
+upload is cancelled. Counting them takes at least one ``b2_list_parts`` call
+per upload, so totals are cached by file ID and large buckets can be
+estimated from a random sample instead of scanned exhaustively.
+"""
+
+import math
+import threading
+import time
+
+from .cache import PersistedTtlCache
+
+PART_CACHE_FILE = "parts.json"
+# Parts of an abandoned upload never change, but one that is still in
+# progress can gain parts, so cached totals are eventually refreshed.
+DEFAULT_PART_CACHE_TTL = 7 * 86400
+# b2_list_parts returns at most 1000 parts per call.
+MAX_PARTS_PAGE_SIZE = 1000
+# z-score of the two-sided 95% confidence interval
+CONFIDENCE_Z = 1.96
+
+
+def count_part_bytes(api, file_id: str, limiter=None) -> int:
+    """Return the total size of the parts uploaded so far for ``file_id``.
+
+    Args:
+        api: Authorized B2Api
+        file_id: ID of the unfinished large file
+        limiter: Optional AdaptiveLimiter every listing call is made under
+    """
+    total = 0
+    start_part_number = None
+    while True:
+        if limiter is None:
+            response = api.session.list_parts(file_id, start_part_number, MAX_PARTS_PAGE_SIZE)
+        else:
+            with limiter:
+                response = api.session.list_parts(file_id, start_part_number, MAX_PARTS_PAGE_SIZE)
+            limiter.on_success()
+        total += sum(part["contentLength"] for part in response["parts"])
+        start_part_number = response.get("nextPartNumber")
+        if start_part_number is None:
+            return total
+
+
+def format_bytes(count: float) -> str:
+    """Format a byte count with a decimal unit, as B2 bills storage."""
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if abs(count) < 1000 or unit == "TB":
+            break
+        count /= 1000
+    return f"{count:.0f} {unit}" if unit == "B" else f"{count:.2f} {unit}"
+
+
+class PartTotalCache(PersistedTtlCache):
+    """Cache the total part size of unfinished uploads by file ID.
+
+    Entries expire after ``ttl`` seconds. When a ``path`` is given the cache
+    is loaded from that JSON file and written back by ``save``, so repeated
+    reports only list the parts of uploads they have not seen recently.
+    """
+
+    def __init__(self, path: str = None, ttl: float = DEFAULT_PART_CACHE_TTL):
+        """Initialize the cache.
+
+        Args:
+            path: Optional JSON file to persist the cache in
+            ttl: Number of seconds an entry stays valid
+        """
+        super().__init__(path, ttl)
+        self._dirty = False
+
+    def get(self, file_id: str):
+        """Return the cached total for ``file_id``, or None."""
+        with self._lock:
+            entry = self._entries.get(file_id)
+        if entry is None or not self._is_fresh(entry):
+            return None
+        return entry["bytes"]
+
+    def put(self, file_id: str, total: int):
+        """Cache the total for ``file_id``."""
+        with self._lock:
+            self._entries[file_id] = {"bytes": total, "saved": time.time()}
+            self._dirty = True
+
+    def save(self):
+        """Write the cache to its file, if it has one and anything changed."""
+        with self._lock:
+            if self._dirty and self._save():
+                self._dirty = False
+
+
+class ReclaimReport:
+    """Storage held by the unfinished uploads of one bucket.
+
+    ``uploads`` is the number of unfinished uploads listed and ``scanned``
+    the number whose parts were counted. When not every upload was scanned
+    (sampling, or part listings that failed), the total is estimated from
+    the scanned uploads, with a 95% confidence interval that includes the
+    finite population correction.
+    """
+
+    def __init__(self, bucket_name: str = None):
+        self.bucket_name = bucket_name
+        self.uploads = 0
+        self.scanned = 0
+        self.failed = 0
+        self.scanned_bytes = 0
+        self._sum_squares = 0
+        self._lock = threading.Lock()
+
+    def add(self, total: int):
+        """Record the part total of one scanned upload."""
+        with self._lock:
+            self.scanned += 1
+            self.scanned_bytes += total
+            self._sum_squares += total * total
+
+    def add_failure(self):
+        """Record an upload whose parts could not be listed."""
+        with self._lock:
+            self.failed += 1
+
+    @property
+    def exact(self) -> bool:
+        return self.scanned >= self.uploads
+
+    @property
+    def estimated_bytes(self) -> float:
+        if self.exact:
+            return float(self.scanned_bytes)
+        if not self.scanned:
+            return math.nan
+        return self.scanned_bytes / self.scanned * self.uploads
+
+    @property
+    def margin(self) -> float:
+        """Half-width of the 95% confidence interval of ``estimated_bytes``."""
+        if self.exact:
+            return 0.0
+        if self.scanned < 2:
+            return math.inf
+        n, total = self.scanned, self.uploads
+        mean = self.scanned_bytes / n
+        variance = max(0.0, (self._sum_squares - n * mean * mean) / (n - 1))
+        return CONFIDENCE_Z * total * math.sqrt(variance / n * (1 - n / total))
+
+    @property
+    def bytes_low(self) -> float:
+        # Never below what was actually counted
+        return max(float(self.scanned_bytes), self.estimated_bytes - self.margin)
+
+    @property
+    def bytes_high(self) -> float:
+        return self.estimated_bytes + self.margin
+
+    def monthly_cost(self, price_per_gb: float) -> float:
+        """Estimated monthly storage cost, at ``price_per_gb`` per GB-month."""
+        return self.estimated_bytes / 1e9 * price_per_gb
+
+    @property
+    def ok(self) -> bool:
+        return self.failed == 0
+
+
+class SweepReport:
+    """Aggregated reports across several buckets."""
+
+    def __init__(self):
+        self.reports = []
+        self.errors = {}
+
+    def add(self, report: ReclaimReport):
+        self.reports.append(report)
+
+    def add_error(self, bucket_name: str, error: Exception):
+        self.errors[bucket_name] = error
+
+    @property
+    def buckets(self) -> int:
+        return len(self.reports)
+
+    @property
+    def uploads(self) -> int:
+        return sum(r.uploads for r in self.reports)
+
+    @property
+    def estimated_bytes(self) -> float:
+        return sum(r.estimated_bytes for r in self.reports)
+
+    @property
+    def margin(self) -> float:
+        # Buckets are sampled independently, so their variances add up
+        return math.sqrt(sum(r.margin ** 2 for r in self.reports))
+
+    @property
+    def bytes_low(self) -> float:
+        return max(
+            float(sum(r.scanned_bytes for r in self.reports)),
+            self.estimated_bytes - self.margin,
+        )
+
+    @property
+    def bytes_high(self) -> float:
+        return self.estimated_bytes + self.margin
+
+    def monthly_cost(self, price_per_gb: float) -> float:
+        return self.estimated_bytes / 1e9 * price_per_gb
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors and all(r.ok for r in self.reports)
@@ -0,0 +1,171 @@
+"""Adaptive concurrency control for B2 API calls."""
+
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+# HTTP statuses B2 uses to ask clients to slow down
+THROTTLE_STATUSES = (429, 503)
+RATE_WINDOW = 10.0
+
+
+def parse_retry_after(value):
+    """Parse a Retry-After header into a number of seconds.
+
+    Args:
+        value: Header value, either delay-seconds or an HTTP date
+
+    Returns:
+        The delay in seconds, or None if the value is missing or invalid.
+    """
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveLimiter:
+    """Bound concurrent API calls with additive-increase/multiplicative-decrease.
+
+    Every call holds a slot while it runs (``with limiter: ...``). Each
+    success raises the limit by ``increase / limit``, i.e. by roughly
+    ``increase`` per round of calls, up to ``maximum``. A throttling response
+    multiplies the limit by ``decrease``, at most once per ``cooldown``
+    seconds so that one burst of 429s counts as a single signal, and a
+    ``Retry-After`` delay holds back new calls until it has passed.
+    """
+
+    def __init__(
+        self,
+        maximum: int,
+        initial: int = None,
+        minimum: int = 1,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        cooldown: float = 1.0,
+    ):
+        """Initialize the limiter.
+
+        Args:
+            maximum: Highest number of concurrent calls allowed
+            initial: Starting limit (defaults to ``maximum``)
+            minimum: Lowest limit throttling can reduce to
+            increase: Additive increase per round of successful calls
+            decrease: Factor applied to the limit on throttling
+            cooldown: Minimum number of seconds between two decreases
+        """
+        if not 1 <= minimum <= maximum:
+            raise ValueError("limits must satisfy 1 <= minimum <= maximum")
+        self.maximum = maximum
+        self.minimum = minimum
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self._limit = float(initial if initial is not None else maximum)
+        self._active = 0
+        self._resume_at = 0.0
+        self._last_decrease = float("-inf")
+        self._completions = deque()
+        self._throttled = 0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """Current number of calls allowed to run at once."""
+        return int(self._limit)
+
+    @property
+    def throttled(self) -> int:
+        """Number of throttling responses seen so far."""
+        return self._throttled
+
+    @property
+    def rate(self) -> float:
+        """Successful calls per second over the last few seconds."""
+        with self._cond:
+            self._expire_completions(time.monotonic())
+            return len(self._completions) / RATE_WINDOW
+
+    def resize(self, maximum: int):
+        """Change the maximum, scaling the current limit by the same factor.
+
+        A limit lowered by throttling stays proportionally lowered, so
+        resizing does not undo a backoff.
+
+        Args:
+            maximum: New highest number of concurrent calls allowed
+        """
+        if maximum < self.minimum:
+            raise ValueError("maximum cannot be below minimum")
+        with self._cond:
+            scaled = self._limit * maximum / self.maximum
+            self.maximum = maximum
+            self._limit = min(maximum, max(self.minimum, scaled))
+            self._cond.notify_all()
+
+    def _expire_completions(self, now):
+        while self._completions and now - self._completions[0] > RATE_WINDOW:
+            self._completions.popleft()
+
+    def acquire(self):
+        """Wait for a free slot and any Retry-After pause, then take the slot."""
+        with self._cond:
+            while True:
+                pause = self._resume_at - time.monotonic()
+                if pause > 0:
+                    self._cond.wait(pause)
+                elif self._active >= int(self._limit):
+                    self._cond.wait()
+                else:
+                    break
+            self._active += 1
+
+    def release(self):
+        """Give a slot back."""
+        with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
+
+    def on_success(self):
+        """Record a successful call and raise the limit additively."""
+        with self._cond:
+            now = time.monotonic()
+            self._completions.append(now)
+            self._expire_completions(now)
+            self._limit = min(self.maximum, self._limit + self.increase / self._limit)
+            self._cond.notify_all()
+
+    def on_throttle(self, retry_after: float = None) -> bool:
+        """Record a throttling response.
+
+        Args:
+            retry_after: Seconds the server asked us to wait, if any
+
+        Returns:
+            True if the limit was decreased, False if still cooling down.
+        """
+        with self._cond:
+            now = time.monotonic()
+            self._throttled += 1
+            if retry_after:
+                self._resume_at = max(self._resume_at, now + retry_after)
+            if now - self._last_decrease < self.cooldown:
+                return False
+            self._last_decrease = now
+            self._limit = max(self.minimum, self._limit * self.decrease)
+            return True
@@ -0,0 +1 @@
+"""Benchmarks for b2-cleanup against a simulated B2 backend."""
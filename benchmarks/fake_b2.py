@@ -0,0 +1,227 @@
+"""An in-process stand-in for the B2 API, for benchmarking B2CleanupTool.
+
+It implements just the calls the tool makes, generates its unfinished
+uploads on the fly (a million of them cost no memory until cancelled), and
+can add per-call latency and inject transient errors into cancellations.
+Nothing goes over the
+network, so benchmarks run offline and measure the tool's own overhead plus
+whatever latency is configured.
+
+``fake_b2_app`` serves the same fake over HTTP on the B2 native API, for
+the async engine, which does not go through b2sdk.
+"""
+
+import random
+import threading
+import time
+from collections import Counter
+
+from b2sdk.v2.exception import ServiceError
+
+ACCOUNT_ID = "benchmark-account"
+BUCKET_ID = "benchmark-bucket-id"
+
+
+class FakeBucket:
+    def __init__(self, name):
+        self.name = name
+        self.id_ = BUCKET_ID
+
+
+class FakeSession:
+    """The subset of ``B2Session`` used by the tool."""
+
+    def __init__(self, file_count, parts_per_file=1, part_size=100_000_000, latency=0.0,
+                 error_rate=0.0, seed=0):
+        self.file_count = file_count
+        self.parts_per_file = parts_per_file
+        self.part_size = part_size
+        self.latency = latency
+        self.error_rate = error_rate
+        self.calls = Counter()
+        self.errors = 0
+        # One byte per upload rather than a set of IDs, so the fake's own
+        # memory barely shows in the benchmark's peak RSS
+        self._cancelled = bytearray(file_count)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def file_id(index):
+        return f"4_z{BUCKET_ID}_f{index:012d}"
+
+    @staticmethod
+    def file_index(file_id):
+        return int(file_id.rsplit("_f", 1)[1])
+
+    @property
+    def cancelled(self):
+        return self._cancelled.count(1)
+
+    def _call(self, name, may_fail=False):
+        with self._lock:
+            self.calls[name] += 1
+            fail = may_fail and self.error_rate and self._random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if fail:
+            raise ServiceError(f"injected error in {name}")
+
+    def _folder(self, index):
+        # Uploads are spread over 100 folders in file ID order
+        return index * 100 // self.file_count
+
+    def _file_dict(self, index):
+        return {
+            "fileId": self.file_id(index),
+            "fileName": f"{self._folder(index):02d}/upload-{index}.bin",
+            "accountId": ACCOUNT_ID,
+            "bucketId": BUCKET_ID,
+            "contentType": "application/octet-stream",
+            "fileInfo": {},
+            "fileRetention": {"isClientAuthorizedToRead": False, "value": None},
+            "legalHold": {"isClientAuthorizedToRead": False, "value": None},
+            "action": "start",
+            "uploadTimestamp": 1_600_000_000_000 + index,
+        }
+
+    def _index_range(self, prefix):
+        """Return the range of upload indexes whose names may start with ``prefix``."""
+        if prefix is None or len(prefix) < 3 or not prefix[:2].isdigit():
+            return 0, self.file_count
+        folder = int(prefix[:2])
+        start = -(-folder * self.file_count // 100)
+        end = -(-(folder + 1) * self.file_count // 100)
+        return start, end
+
+    def list_unfinished_large_files(self, bucket_id, start_file_id=None, max_file_count=100,
+                                    prefix=None):
+        self._call("list_unfinished_large_files")
+        first, end = self._index_range(prefix)
+        index = max(first, self.file_index(start_file_id)) if start_file_id else first
+        files = []
+        while index < end and len(files) < max_file_count:
+            if not self._cancelled[index]:
+                file_dict = self._file_dict(index)
+                if prefix is None or file_dict["fileName"].startswith(prefix):
+                    files.append(file_dict)
+            index += 1
+        next_file_id = self.file_id(index) if index < end else None
+        return {"files": files, "nextFileId": next_file_id}
+
+    def list_file_versions(self, bucket_id, start_file_name=None, start_file_id=None,
+                           max_file_count=None, prefix=None):
+        self._call("list_file_versions")
+        if self.file_count >= 100:
+            folders = range(100)
+        else:
+            folders = sorted({self._folder(i) for i in range(self.file_count)})
+        names = [f"{folder:02d}/upload" for folder in folders]
+        names = [n for n in names if n >= (start_file_name or "") and n.startswith(prefix or "")]
+        return {"files": [{"fileName": n} for n in names[:max_file_count or 1000]]}
+
+    def list_parts(self, file_id, start_part_number, max_part_count):
+        self._call("list_parts")
+        start = start_part_number or 1
+        end = min(self.parts_per_file + 1, start + max_part_count)
+        parts = [{"partNumber": n, "contentLength": self.part_size} for n in range(start, end)]
+        return {"parts": parts, "nextPartNumber": end if end <= self.parts_per_file else None}
+
+    def cancel_large_file(self, file_id):
+        # b2sdk retries listing calls itself; cancellations are retried by the
+        # tool, so that is where errors are injected
+        self._call("cancel_large_file", may_fail=True)
+        self._cancelled[self.file_index(file_id)] = 1
+
+
+class FakeB2Api:
+    """The subset of ``B2Api`` used by the tool, backed by a FakeSession."""
+
+    def __init__(self, session):
+        self.session = session
+        self.account_info = None
+
+    def authorize_account(self, realm, key_id, app_key):
+        pass
+
+    def get_bucket_by_name(self, name):
+        return FakeBucket(name)
+
+    def list_buckets(self):
+        return [FakeBucket("benchmark")]
+
+    def cancel_large_file(self, file_id):
+        self.session.cancel_large_file(file_id)
+
+
+def fake_b2_app(session, latency=0.0, token_lifetime=None):
+    """Build an aiohttp web application serving ``session`` over the B2 native API (v2).
+
+    It answers the calls AsyncB2CleanupTool makes. Latency is simulated
+    with ``asyncio.sleep``, so one server can hold thousands of calls in
+    flight. Authorization tokens expire after ``token_lifetime`` API calls,
+    to exercise re-authorization. Needs aiohttp.
+    """
+    import asyncio
+
+    from aiohttp import web
+
+    state = {"token": None, "tokens": 0, "uses": 0}
+
+    def error(status, code, message):
+        return web.json_response({"status": status, "code": code, "message": message}, status=status)
+
+    async def authorize(request):
+        if request.headers.get("Authorization", "").split(" ")[0] != "Basic":
+            return error(401, "bad_auth_token", "missing credentials")
+        session._call("authorize_account")
+        state["tokens"] += 1
+        state["token"] = f"token-{state['tokens']}"
+        state["uses"] = 0
+        return web.json_response({
+            "accountId": ACCOUNT_ID,
+            "authorizationToken": state["token"],
+            "apiUrl": str(request.url.origin()),
+        })
+
+    def api_call(handler):
+        async def wrapped(request):
+            if request.headers.get("Authorization") != state["token"]:
+                return error(401, "bad_auth_token", "invalid token")
+            if token_lifetime is not None and state["uses"] >= token_lifetime:
+                return error(401, "expired_auth_token", "token expired")
+            state["uses"] += 1
+            if latency:
+                await asyncio.sleep(latency)
+            try:
+                return web.json_response(handler(await request.json()))
+            except ServiceError as e:
+                return error(503, "service_unavailable", str(e))
+        return wrapped
+
+    def list_buckets(body):
+        session._call("list_buckets")
+        name = body.get("bucketName")
+        buckets = [] if name not in (None, "benchmark") else [
+            {"bucketId": BUCKET_ID, "bucketName": "benchmark", "accountId": ACCOUNT_ID}
+        ]
+        return {"buckets": buckets}
+
+    def list_unfinished(body):
+        return session.list_unfinished_large_files(
+            body["bucketId"], body.get("startFileId"), body.get("maxFileCount", 100),
+            body.get("namePrefix"),
+        )
+
+    def cancel(body):
+        session.cancel_large_file(body["fileId"])
+        return {"fileId": body["fileId"], "bucketId": BUCKET_ID}
+
+    app = web.Application()
+    app.router.add_get("/b2api/v2/b2_authorize_account", authorize)
+    app.router.add_post("/b2api/v2/b2_list_buckets", api_call(list_buckets))
+    app.router.add_post("/b2api/v2/b2_list_unfinished_large_files", api_call(list_unfinished))
+    app.router.add_post("/b2api/v2/b2_cancel_large_file", api_call(cancel))
+    return app
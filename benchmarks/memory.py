@@ -0,0 +1,99 @@
+"""Measure the memory it takes to hold listed uploads, per upload.
+
+Compares b2sdk's ``UnfinishedLargeFile`` (what the listing used to build),
+a list of ``UploadRecord`` objects and the column-wise ``UploadRecords``,
+and the per-file results of a cleanup summary. "Overhead" leaves out the
+file ID and name strings, which every representation has to keep.
+
+Usage::
+
+    python -m benchmarks.memory                  # 1M uploads
+    python -m benchmarks.memory --files 100000
+"""
+
+import argparse
+import gc
+import sys
+import tracemalloc
+
+from b2sdk.v2 import UnfinishedLargeFile
+
+from b2_cleanup.core import CleanupResults
+from b2_cleanup.records import UploadRecord, UploadRecords
+
+from .fake_b2 import FakeSession
+
+DEFAULT_FILES = 1_000_000
+BUCKET_NAME = "benchmark"
+
+
+def hold_file_versions(file_dicts):
+    return [UnfinishedLargeFile(file_dict) for file_dict in file_dicts]
+
+
+def hold_records(file_dicts):
+    return [UploadRecord.from_file_dict(file_dict, BUCKET_NAME) for file_dict in file_dicts]
+
+
+def hold_columns(file_dicts):
+    records = UploadRecords(BUCKET_NAME)
+    for file_dict in file_dicts:
+        records.append(UploadRecord.from_file_dict(file_dict, BUCKET_NAME))
+    return records
+
+
+def hold_result_tuples(file_dicts):
+    return [(file_dict["fileId"], file_dict["fileName"], None) for file_dict in file_dicts]
+
+
+def hold_results(file_dicts):
+    results = CleanupResults()
+    for file_dict in file_dicts:
+        results.append(file_dict["fileId"], file_dict["fileName"])
+    return results
+
+
+LAYOUTS = {
+    "b2sdk UnfinishedLargeFile": hold_file_versions,
+    "UploadRecord list": hold_records,
+    "UploadRecords": hold_columns,
+    "result tuples": hold_result_tuples,
+    "CleanupResults": hold_results,
+}
+
+
+def measure(hold, files: int):
+    """Return ``(retained, overhead)`` bytes per upload held by ``hold``."""
+    session = FakeSession(files)
+    file_dicts = (session._file_dict(index) for index in range(files))
+    gc.collect()
+    tracemalloc.start()
+    try:
+        held = hold(file_dicts)
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    strings = sum(
+        sys.getsizeof(session.file_id(index)) + sys.getsizeof(session._file_dict(index)["fileName"])
+        for index in range(files)
+    )
+    del held
+    return retained / files, (retained - strings) / files
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--files", type=int, default=DEFAULT_FILES,
+                        help=f"Number of uploads to hold (default: {DEFAULT_FILES:,})")
+    args = parser.parse_args(argv)
+
+    print(f"{'layout':>26} {'bytes/upload':>13} {'overhead':>9}")
+    for name, hold in LAYOUTS.items():
+        retained, overhead = measure(hold, args.files)
+        print(f"{name:>26} {retained:>13,.0f} {overhead:>9,.0f}", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
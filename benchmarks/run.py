@@ -0,0 +1,327 @@
+"""Benchmark B2CleanupTool against the in-process fake B2 backend.
+
+Each scenario runs in a fresh interpreter so that its peak RSS is its own.
+
+Usage::
+
+    python -m benchmarks.run                            # 10k, 100k and 1M uploads
+    python -m benchmarks.run --files 10000 --latency 0.005 --error-rate 0.001
+    python -m benchmarks.run --mode dry-run --mode report --files 100000
+    python -m benchmarks.run --mode async --files 100000 --latency 0.05 --workers 1000
+    python -m benchmarks.run --shards 4 --files 100000 --latency 0.005   # 4 processes
+    python -m benchmarks.run --output baseline.json     # save results
+    python -m benchmarks.run --baseline baseline.json   # exit 1 on a regression
+"""
+
+import argparse
+import json
+import logging
+import subprocess
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+
+DEFAULT_FILE_COUNTS = (10_000, 100_000, 1_000_000)
+MODES = ("cleanup", "dry-run", "report", "async")
+# A scenario regresses if its throughput drops by more than this fraction
+DEFAULT_TOLERANCE = 0.15
+SCENARIO_KEYS = ("mode", "files", "workers", "latency", "error_rate", "auto_partition", "shards")
+# Values of scenario keys missing from results saved by older versions
+SCENARIO_DEFAULTS = {"shards": 1}
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None if unknown."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def serve_in_thread(app):
+    """Serve an aiohttp ``app`` on a local port from a background thread.
+
+    Returns:
+        A ``(base_url, stop)`` tuple; ``stop()`` shuts the server down.
+    """
+    import asyncio
+    import threading
+
+    from aiohttp import web
+
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(app)
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    loop.run_until_complete(site.start())
+    port = runner.addresses[0][1]
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    def stop():
+        asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    return f"http://127.0.0.1:{port}", stop
+
+
+def run_async_cleanup(scenario, session):
+    """Clean up the fake bucket with AsyncB2CleanupTool over HTTP; return the seconds taken."""
+    import asyncio
+
+    from b2_cleanup.aio import AsyncB2CleanupTool
+
+    from .fake_b2 import fake_b2_app
+
+    # The server sleeps instead of the session, so latency does not block its loop
+    latency, session.latency = session.latency, 0.0
+    base_url, stop = serve_in_thread(fake_b2_app(session, latency=latency))
+
+    async def run():
+        async with AsyncB2CleanupTool(
+            override_key_id="benchmark",
+            override_key="benchmark",
+            concurrency=scenario["workers"],
+            realm_url=base_url,
+        ) as tool:
+            start = time.perf_counter()
+            await tool.cleanup_unfinished_uploads("benchmark")
+            return time.perf_counter() - start
+
+    try:
+        with patch("b2_cleanup.aio.RETRY_BASE_DELAY", scenario["retry_delay"]):
+            return asyncio.run(run())
+    finally:
+        stop()
+
+
+def run_scenario(scenario):
+    """Run one scenario in this process and return its measurements."""
+    from .fake_b2 import FakeSession
+
+    if scenario.get("shards", 1) > 1:
+        return run_sharded(scenario)
+
+    session = FakeSession(
+        scenario["files"], latency=scenario["latency"], error_rate=scenario["error_rate"]
+    )
+    logger = logging.getLogger("B2Cleanup")
+    level = logger.level
+    # Measure the cleanup itself, not writing a log line per upload
+    logger.setLevel(logging.CRITICAL)
+    try:
+        if scenario["mode"] == "async":
+            seconds = run_async_cleanup(scenario, session)
+        else:
+            seconds = run_sync(scenario, session)
+    finally:
+        logger.setLevel(level)
+
+    return dict(
+        scenario,
+        seconds=round(seconds, 3),
+        files_per_second=round(scenario["files"] / seconds, 1),
+        peak_rss_mb=peak_rss_mb(),
+        calls=dict(session.calls),
+        injected_errors=session.errors,
+    )
+
+
+def run_shard(scenario, index):
+    """Clean up shard ``index`` of the fake bucket; runs in a worker process.
+
+    Every shard has its own copy of the fake bucket, as every host of a
+    sharded run lists the whole bucket.
+
+    Returns:
+        A ``(start, end, calls, injected_errors, peak_rss_mb)`` tuple, with
+        wall-clock start and end times.
+    """
+    from .fake_b2 import FakeSession
+
+    session = FakeSession(
+        scenario["files"], latency=scenario["latency"], error_rate=scenario["error_rate"]
+    )
+    logging.getLogger("B2Cleanup").setLevel(logging.CRITICAL)
+    start = time.time()
+    run_sync(scenario, session, shard=(index, scenario["shards"]))
+    return start, time.time(), dict(session.calls), session.errors, peak_rss_mb()
+
+
+def run_sharded(scenario):
+    """Run a scenario split over ``shards`` processes, like hosts sharing one bucket."""
+    shards = scenario["shards"]
+    with ProcessPoolExecutor(max_workers=shards) as executor:
+        futures = [executor.submit(run_shard, scenario, index) for index in range(1, shards + 1)]
+        outcomes = [future.result() for future in futures]
+    # From the first shard starting to the last one finishing
+    seconds = max(end for _, end, _, _, _ in outcomes) - min(start for start, _, _, _, _ in outcomes)
+    calls = Counter()
+    for _, _, shard_calls, _, _ in outcomes:
+        calls.update(shard_calls)
+    peaks = [peak for _, _, _, _, peak in outcomes if peak is not None]
+    return dict(
+        scenario,
+        seconds=round(seconds, 3),
+        files_per_second=round(scenario["files"] / seconds, 1),
+        peak_rss_mb=max(peaks) if peaks else None,
+        calls=dict(calls),
+        injected_errors=sum(errors for _, _, _, errors, _ in outcomes),
+    )
+
+
+def run_sync(scenario, session, shard=None):
+    """Clean up the fake bucket with B2CleanupTool; return the seconds taken."""
+    from b2_cleanup.core import B2CleanupTool
+
+    from .fake_b2 import FakeB2Api
+
+    with patch("b2_cleanup.core.B2Api", return_value=FakeB2Api(session)), \
+            patch("b2_cleanup.core.RETRY_BASE_DELAY", scenario["retry_delay"]):
+        tool = B2CleanupTool(
+            dry_run=scenario["mode"] == "dry-run",
+            override_key_id="benchmark",
+            override_key="benchmark",
+            workers=scenario["workers"],
+            auto_partition=scenario["auto_partition"],
+            shard=shard,
+        )
+        start = time.perf_counter()
+        if scenario["mode"] == "report":
+            tool.report_reclaimable("benchmark", interactive=False)
+        else:
+            tool.cleanup_unfinished_uploads("benchmark", interactive=False)
+        seconds = time.perf_counter() - start
+        tool.close()
+    return seconds
+
+
+def run_in_child(scenario):
+    """Run one scenario in a fresh interpreter and return its measurements."""
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.run", "--child", json.dumps(scenario)],
+        check=True,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    return json.loads(result.stdout)
+
+
+def scenario_key(result):
+    return tuple(result.get(key, SCENARIO_DEFAULTS.get(key)) for key in SCENARIO_KEYS)
+
+
+def scenario_label(result):
+    """The mode of a result, with its number of shards if it has several."""
+    shards = result.get("shards", 1)
+    return result["mode"] if shards == 1 else f"{result['mode']}/{shards}"
+
+
+def compare(results, baseline, tolerance):
+    """Print throughput changes against ``baseline``; return the regressed scenarios."""
+    previous = {scenario_key(r): r for r in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get(scenario_key(result))
+        if before is None:
+            continue
+        change = result["files_per_second"] / before["files_per_second"] - 1
+        flag = ""
+        if change < -tolerance:
+            flag = "  REGRESSION"
+            regressions.append(result)
+        print(
+            f"{scenario_label(result):>10} {result['files']:>9,} files: "
+            f"{before['files_per_second']:>10,.0f} -> {result['files_per_second']:>10,.0f} "
+            f"files/s ({change:+.1%}){flag}"
+        )
+    return regressions
+
+
+def print_header():
+    print(
+        f"{'mode':>10} {'files':>9} {'seconds':>8} {'files/s':>10} {'RSS MB':>7} "
+        f"{'list':>7} {'cancel':>9} {'parts':>9} {'errors':>6}"
+    )
+
+
+def print_result(r):
+    calls = r["calls"]
+    rss = f"{r['peak_rss_mb']:.0f}" if r["peak_rss_mb"] is not None else "?"
+    print(
+        f"{scenario_label(r):>10} {r['files']:>9,} {r['seconds']:>8.2f} {r['files_per_second']:>10,.0f} "
+        f"{rss:>7} {calls.get('list_unfinished_large_files', 0):>7,} "
+        f"{calls.get('cancel_large_file', 0):>9,} {calls.get('list_parts', 0):>9,} "
+        f"{r['injected_errors']:>6,}",
+        flush=True,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--files", type=int, action="append",
+                        help="Number of unfinished uploads (repeatable; default: 10k, 100k, 1M)")
+    parser.add_argument("--mode", choices=MODES, action="append",
+                        help="What to run (repeatable; default: cleanup)")
+    parser.add_argument("--workers", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Simulated seconds per API call")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of cancel calls that fail with a transient error")
+    parser.add_argument("--retry-delay", type=float, default=0.01,
+                        help="Base retry backoff in seconds while benchmarking")
+    parser.add_argument("--auto-partition", action="store_true",
+                        help="List the fake bucket's 100 folders concurrently")
+    parser.add_argument("--shards", type=int, default=1,
+                        help="Split each cleanup over this many processes with --shard")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against results saved with --output")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed throughput drop against the baseline")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.shards < 1:
+        parser.error("--shards must be at least 1")
+    if args.shards > 1 and set(args.mode or ["cleanup"]) - {"cleanup", "dry-run"}:
+        parser.error("--shards only applies to the cleanup and dry-run modes")
+
+    if args.child:
+        print(json.dumps(run_scenario(json.loads(args.child))))
+        return 0
+
+    results = []
+    print_header()
+    for mode in args.mode or ["cleanup"]:
+        for files in args.files or DEFAULT_FILE_COUNTS:
+            results.append(run_in_child({
+                "mode": mode,
+                "files": files,
+                "workers": args.workers,
+                "latency": args.latency,
+                "error_rate": args.error_rate,
+                "retry_delay": args.retry_delay,
+                "auto_partition": args.auto_partition,
+                "shards": args.shards,
+            }))
+            print_result(results[-1])
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""Tests for cleaning up several accounts."""
+
+import logging
+import multiprocessing
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from b2_cleanup.accounts import Account, AccountSummary, _run_account, read_accounts, run_accounts
+from b2_cleanup.core import CleanupSummary, SweepSummary
+
+CONFIG = """
+[[accounts]]
+name = "production"
+key_id = "prod-id"
+key_env = "TEST_PROD_KEY"
+buckets = ["backup-*", "logs"]
+
+[[accounts]]
+name = "archive"
+key_id = "archive-id"
+key = "archive-key"
+all_buckets = true
+"""
+
+
+def write_config(tmp_path, text):
+    path = tmp_path / "accounts.toml"
+    path.write_text(text)
+    return str(path)
+
+
+def fake_tool(override_key_id, override_key, **options):
+    """Stand-in for B2CleanupTool that sweeps one bucket per account, or fails for 'bad-id'."""
+    if override_key_id == "bad-id":
+        raise RuntimeError("unauthorized")
+    tool = MagicMock()
+    summary = CleanupSummary(f"{override_key_id}-bucket")
+    summary.found = 3
+    summary.cancelled = 2
+    summary.failed = 1 if override_key_id == "flaky-id" else 0
+    sweep = SweepSummary()
+    sweep.add(summary)
+    if override_key_id == "flaky-id":
+        sweep.add_error("gone", LookupError("bucket deleted"))
+    tool.cleanup_buckets.return_value = sweep
+    return tool
+
+
+class TestReadAccounts:
+    """Test reading the accounts config file."""
+
+    def test_read(self, tmp_path, monkeypatch):
+        """Test accounts are read in order, with keys from the file or the environment."""
+        monkeypatch.setenv("TEST_PROD_KEY", "prod-key")
+
+        production, archive = read_accounts(write_config(tmp_path, CONFIG))
+
+        assert (production.name, production.key_id, production.key) == ("production", "prod-id", "prod-key")
+        assert production.buckets == ["backup-*", "logs"]
+        assert not production.all_buckets
+        assert (archive.key, archive.buckets, archive.all_buckets) == ("archive-key", [], True)
+        assert "prod-key" not in repr(production)
+
+    @pytest.mark.parametrize(
+        "text, message",
+        [
+            ("accounts = 1", "no \\[\\[accounts\\]\\] tables"),
+            ("[[accounts]\n", "accounts.toml"),
+            ('[[accounts]]\nname = "a b"', "'name' must be"),
+            ('accounts = ["prod"]', "account 1: must be an \\[\\[accounts\\]\\] table"),
+            (
+                '[[accounts]]\nname = "a"\nkey_id = "i"\nkey = "k"\nall_buckets = "no"',
+                "account 'a': 'all_buckets' must be true or false",
+            ),
+            (
+                '[[accounts]]\nname = "a"\nkey_id = "i"\nkey = "k"\nbuckets = ["b"]\n'
+                '[[accounts]]\nname = "a"\nkey_id = "i"\nkey = "k"\nbuckets = ["b"]',
+                "duplicate name 'a'",
+            ),
+            ('[[accounts]]\nname = "a"\nkey_id = "i"\nkey = "k"', "either 'buckets' or 'all_buckets"),
+            (
+                '[[accounts]]\nname = "a"\nkey_id = "i"\nkey = "k"\nbuckets = ["b"]\nall_buckets = true',
+                "either 'buckets' or 'all_buckets",
+            ),
+            ('[[accounts]]\nname = "a"\nkey_id = "i"\nbuckets = ["b"]', "exactly one of 'key' and 'key_env'"),
+            (
+                '[[accounts]]\nname = "a"\nkey_id = "i"\nkey_env = "TEST_UNSET_KEY"\nbuckets = ["b"]',
+                "TEST_UNSET_KEY is not set",
+            ),
+            (
+                '[[accounts]]\nname = "a"\nkey_id = "i"\nkey = "k"\nbuckets = ["b"]\nprefix = "x"',
+                "unknown settings prefix",
+            ),
+        ],
+    )
+    def test_invalid(self, tmp_path, monkeypatch, text, message):
+        """Test invalid config files are rejected with the offending account."""
+        monkeypatch.delenv("TEST_UNSET_KEY", raising=False)
+
+        with pytest.raises(ValueError, match=message):
+            read_accounts(write_config(tmp_path, text))
+
+
+class TestRunAccounts:
+    """Test cleaning up accounts in worker processes."""
+
+    @patch("b2_cleanup.accounts.B2CleanupTool", side_effect=fake_tool)
+    def test_run_account(self, mock_tool_class, tmp_path):
+        """Test one account is swept with its own keys and cache directory."""
+        account = Account("production", "prod-id", "prod-key", ["backup-*"])
+
+        summary = _run_account(account, {"dry_run": True, "cache_dir": str(tmp_path)})
+
+        mock_tool_class.assert_called_once_with(
+            override_key_id="prod-id",
+            override_key="prod-key",
+            dry_run=True,
+            cache_dir=str(tmp_path / "production"),
+        )
+        assert (summary.buckets, summary.found, summary.cancelled, summary.failed) == (1, 3, 2, 0)
+        assert summary.ok
+
+    @patch("b2_cleanup.accounts.B2CleanupTool", side_effect=fake_tool)
+    def test_run_account_error(self, mock_tool_class):
+        """Test an account that cannot be processed is reported, not raised."""
+        summary = _run_account(Account("broken", "bad-id", "key", all_buckets=True), {})
+
+        assert summary.error == "unauthorized"
+        assert not summary.ok
+
+    @patch("b2_cleanup.accounts.B2CleanupTool", side_effect=fake_tool)
+    def test_run_accounts(self, mock_tool_class, caplog):
+        """Test accounts run in worker processes and their results are aggregated."""
+        accounts = [
+            Account("production", "prod-id", "key", ["logs"]),
+            Account("flaky", "flaky-id", "key", ["*"]),
+            Account("broken", "bad-id", "key", all_buckets=True),
+        ]
+
+        with caplog.at_level(logging.INFO, logger="B2Cleanup"):
+            summary = run_accounts(
+                accounts, processes=2, mp_context=multiprocessing.get_context("fork"), dry_run=True
+            )
+
+        assert [a.name for a in summary.accounts] == ["production", "flaky", "broken"]
+        assert (summary.buckets, summary.found, summary.cancelled, summary.failed) == (3, 6, 4, 1)
+        assert summary.errors == {"broken": "unauthorized"}
+        assert summary.accounts[1].bucket_errors == {"gone": "bucket deleted"}
+        assert not summary.ok
+        # Log lines of the workers reach the parent, tagged with their account
+        assert "[broken] ❌ Account 'broken' failed: unauthorized" in caplog.messages
+
+    def test_summary_ok(self):
+        """Test an account summary is only ok without errors or failed cancellations."""
+        summary = AccountSummary("a")
+        assert summary.ok
+
+        summary.failed = 1
+        assert not summary.ok
+
+    def test_no_accounts(self):
+        """Test an empty account list is rejected."""
+        with pytest.raises(ValueError):
+            run_accounts([])
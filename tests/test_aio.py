@@ -0,0 +1,215 @@
+"""Tests for the asyncio engine, against the fake B2 HTTP server."""
+
+import asyncio
+import json
+import time
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("aiohttp")
+from aiohttp import web  # noqa: E402
+
+from b2_cleanup.aio import AsyncB2CleanupTool  # noqa: E402
+from benchmarks.fake_b2 import FakeSession, fake_b2_app  # noqa: E402
+
+
+def run_against_fake(session, run, app_kwargs=None, **tool_kwargs):
+    """Serve ``session`` on a local port and return ``await run(tool)``."""
+
+    async def main():
+        runner = web.AppRunner(fake_b2_app(session, **(app_kwargs or {})))
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        try:
+            async with AsyncB2CleanupTool(
+                override_key_id="key_id",
+                override_key="key",
+                realm_url=f"http://127.0.0.1:{port}",
+                **tool_kwargs,
+            ) as tool:
+                return tool, await run(tool)
+        finally:
+            await runner.cleanup()
+
+    return asyncio.run(main())
+
+
+class TestAsyncB2CleanupTool:
+    """Test the AsyncB2CleanupTool class."""
+
+    def test_cleanup(self):
+        """Test that every unfinished upload is listed and cancelled."""
+        session = FakeSession(1050)
+
+        tool, summary = run_against_fake(
+            session, lambda tool: tool.cleanup_unfinished_uploads("benchmark"), concurrency=50
+        )
+
+        assert summary.found == summary.cancelled == 1050
+        assert session.cancelled == 1050
+        assert session.calls["list_unfinished_large_files"] == 11
+        assert tool.client.authorizations == 1
+        assert tool.metrics.cancel_seconds.count() == 1050
+
+    def test_dry_run(self):
+        """Test that a dry run cancels nothing."""
+        session = FakeSession(250)
+
+        _, summary = run_against_fake(
+            session, lambda tool: tool.cleanup_unfinished_uploads("benchmark"), dry_run=True
+        )
+
+        assert summary.found == 250
+        assert summary.cancelled == 0
+        assert session.calls["cancel_large_file"] == 0
+
+    def test_expired_token_renewed(self):
+        """Test that an expired token is renewed once and the calls repeated."""
+        session = FakeSession(300)
+
+        tool, summary = run_against_fake(
+            session,
+            lambda tool: tool.cleanup_unfinished_uploads("benchmark"),
+            app_kwargs={"token_lifetime": 100},
+            concurrency=20,
+        )
+
+        assert summary.cancelled == 300
+        assert summary.failed == 0
+        assert 2 <= tool.client.authorizations <= 5
+
+    @patch("b2_cleanup.aio.RETRY_BASE_DELAY", 0.001)
+    def test_transient_errors_retried(self, tmp_path):
+        """Test that 503 responses are retried and permanent failures dead-lettered."""
+        session = FakeSession(500, error_rate=0.2)
+        dead_letter_file = tmp_path / "dead.jsonl"
+
+        tool, summary = run_against_fake(
+            session,
+            lambda tool: tool.cleanup_unfinished_uploads("benchmark"),
+            max_retries=1,
+            dead_letter_file=str(dead_letter_file),
+        )
+
+        assert summary.found == 500
+        assert summary.cancelled + summary.failed == 500
+        assert 0 < summary.failed < 100
+        assert summary.cancelled == session.cancelled
+        assert tool.metrics.retries.value() > 0
+        assert tool.metrics.throttled.value() > 0
+        dead_letters = [json.loads(line) for line in dead_letter_file.read_text().splitlines()]
+        assert len(dead_letters) == summary.failed
+        assert all(d["attempts"] == 2 for d in dead_letters)
+
+    def test_many_cancellations_in_flight(self):
+        """Test that slow calls overlap instead of running one after another."""
+        session = FakeSession(2000)
+        start = time.monotonic()
+
+        _, summary = run_against_fake(
+            session,
+            lambda tool: tool.cleanup_unfinished_uploads("benchmark"),
+            app_kwargs={"latency": 0.05},
+            concurrency=300,
+        )
+
+        assert summary.cancelled == 2000
+        # 2,000 cancellations of 50 ms each take 100 s one at a time
+        assert time.monotonic() - start < 10
+
+    def test_cleanup_buckets_isolates_failures(self):
+        """Test that a missing bucket is recorded without stopping the others."""
+        session = FakeSession(10)
+
+        _, sweep = run_against_fake(
+            session, lambda tool: tool.cleanup_buckets(["benchmark", "missing"])
+        )
+
+        assert sweep.cancelled == 10
+        assert list(sweep.errors) == ["missing"]
+
+    def test_requires_aiohttp(self):
+        """Test that the engine explains how to install its dependency."""
+        with patch("b2_cleanup.aio.aiohttp", None):
+            with pytest.raises(RuntimeError, match=r"b2-cleanup\[async\]"):
+                AsyncB2CleanupTool(override_key_id="key_id", override_key="key")
+
+    @patch("b2_cleanup.credentials.subprocess.run")
+    def test_credentials_from_b2_cli_command(self, mock_run, tmp_path, monkeypatch):
+        """Test that credentials resolve as in the threaded engine, down to `b2 account get`."""
+        monkeypatch.delenv("B2_APPLICATION_KEY_ID", raising=False)
+        monkeypatch.delenv("B2_APPLICATION_KEY", raising=False)
+        monkeypatch.setenv("B2_ACCOUNT_INFO", str(tmp_path / "missing_account_info"))
+        mock_run.return_value.stdout = json.dumps(
+            {"applicationKeyId": "cli_key_id", "applicationKey": "cli_key"}
+        )
+
+        tool = AsyncB2CleanupTool()
+
+        assert (tool.client.key_id, tool.client.key) == ("cli_key_id", "cli_key")
+
+    @patch("b2_cleanup.core.LOGGED_FILES", 2)
+    def test_per_file_lines_demoted(self, caplog):
+        """Test that the per-upload lines quieten down as in the threaded engine."""
+        session = FakeSession(5)
+
+        with caplog.at_level("INFO", logger="B2Cleanup"):
+            run_against_fake(
+                session, lambda tool: tool.cleanup_unfinished_uploads("benchmark"), dry_run=True
+            )
+
+        assert sum("would cancel" in r.getMessage() for r in caplog.records) == 2
+        assert any("More than 2 uploads" in r.getMessage() for r in caplog.records)
+
+    def test_max_in_flight_bounds_listing(self):
+        """Test that listing waits while max_in_flight uploads await cancellation."""
+        session = FakeSession(50)
+        done = [0]
+        peak = [0]
+
+        async def run(tool):
+            cancel_one = tool._cancel_one
+
+            async def counted(record, summary):
+                peak[0] = max(peak[0], summary.found - done[0])
+                await cancel_one(record, summary)
+                done[0] += 1
+
+            tool._cancel_one = counted
+            return await tool.cleanup_unfinished_uploads("benchmark")
+
+        _, summary = run_against_fake(
+            session, run, app_kwargs={"latency": 0.005}, concurrency=2, max_in_flight=3
+        )
+
+        assert summary.cancelled == 50
+        # The three held, plus the one just listed and waiting for a slot
+        assert peak[0] <= 4
+
+    def test_bucket_workers_bound_sweep(self):
+        """Test that a sweep cleans up at most bucket_workers buckets at once."""
+        session = FakeSession(10)
+        active = [0]
+        peak = [0]
+
+        async def run(tool):
+            cleanup = tool.cleanup_unfinished_uploads
+
+            async def counted(bucket_name):
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+                try:
+                    return await cleanup(bucket_name)
+                finally:
+                    active[0] -= 1
+
+            tool.cleanup_unfinished_uploads = counted
+            return await tool.cleanup_buckets(["benchmark", "benchmark", "benchmark"])
+
+        _, sweep = run_against_fake(session, run, bucket_workers=2)
+
+        assert peak[0] == 2
+        assert sweep.buckets == 3
@@ -0,0 +1,85 @@
+"""Smoke tests for the benchmark suite, so it keeps working as the tool changes."""
+
+import pytest
+
+from benchmarks.fake_b2 import FakeSession
+from benchmarks.memory import hold_columns, hold_file_versions, measure
+from benchmarks.run import compare, run_scenario
+
+
+def scenario(**overrides):
+    """A small benchmark scenario."""
+    values = dict(
+        mode="cleanup",
+        files=2000,
+        workers=4,
+        latency=0.0,
+        error_rate=0.0,
+        retry_delay=0.001,
+        auto_partition=False,
+    )
+    values.update(overrides)
+    return values
+
+
+class TestBenchmarks:
+    """Test the benchmark harness against the fake backend."""
+
+    @pytest.mark.parametrize(
+        "mode, call, count",
+        [("cleanup", "cancel_large_file", 2000), ("report", "list_parts", 2000), ("dry-run", "cancel_large_file", 0)],
+    )
+    def test_run_scenario(self, mode, call, count):
+        """Test that each mode makes the expected API calls."""
+        result = run_scenario(scenario(mode=mode))
+
+        assert result["calls"].get(call, 0) == count
+        assert result["calls"]["list_unfinished_large_files"] == 20
+        assert result["files_per_second"] > 0
+
+    def test_injected_errors_are_retried(self):
+        """Test that transient errors injected into cancellations are retried."""
+        result = run_scenario(scenario(error_rate=0.05, auto_partition=True))
+
+        assert result["injected_errors"] > 0
+        assert result["calls"]["cancel_large_file"] == 2000 + result["injected_errors"]
+
+    def test_sharded_scenario(self):
+        """Test that shards in separate processes cancel every upload exactly once."""
+        result = run_scenario(scenario(shards=2))
+
+        assert result["calls"]["cancel_large_file"] == 2000
+        # Every shard lists the whole bucket
+        assert result["calls"]["list_unfinished_large_files"] == 2 * 20
+        assert result["files_per_second"] > 0
+
+    def test_compare_reads_baselines_without_shards(self):
+        """Test that results saved before sharded scenarios still match."""
+        before = dict(scenario(), files_per_second=1000.0)
+        after = dict(scenario(shards=1), files_per_second=700.0)
+
+        assert compare([after], [before], tolerance=0.15) == [after]
+
+    def test_fake_listing_skips_cancelled(self):
+        """Test that the fake backend no longer lists cancelled uploads."""
+        session = FakeSession(3)
+        session.cancel_large_file(session.file_id(1))
+
+        files = session.list_unfinished_large_files("bucket_id")["files"]
+
+        assert [f["fileId"] for f in files] == [session.file_id(0), session.file_id(2)]
+
+    def test_compare_flags_regression(self):
+        """Test that a throughput drop beyond the tolerance is reported."""
+        before = dict(scenario(), files_per_second=1000.0)
+        after = dict(scenario(), files_per_second=800.0)
+
+        assert compare([after], [before], tolerance=0.15) == [after]
+        assert compare([after], [before], tolerance=0.25) == []
+
+    def test_columns_cut_overhead_tenfold(self):
+        """Test that UploadRecords holds uploads for a tenth of b2sdk's overhead."""
+        _, file_versions = measure(hold_file_versions, 5000)
+        _, columns = measure(hold_columns, 5000)
+
+        assert columns * 10 < file_versions
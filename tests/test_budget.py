@@ -0,0 +1,52 @@
+"""Tests for run budgets."""
+
+import time
+
+import pytest
+
+from b2_cleanup.budget import API_CALLS, CANCELLATIONS, TIME, RunBudget
+
+
+class TestRunBudget:
+    """Test the RunBudget class."""
+
+    def test_cancellations(self):
+        """Test that cancellations stop at the limit while calls go on."""
+        budget = RunBudget(max_cancels=2)
+
+        assert budget.take_cancel()
+        assert budget.take_cancel()
+        assert not budget.take_cancel()
+        assert budget.exhausted == CANCELLATIONS
+        assert budget.out_of_calls is None
+        assert budget.take_call()
+
+    def test_api_calls(self):
+        """Test that listing calls and cancellations share the call limit."""
+        budget = RunBudget(max_api_calls=3)
+
+        assert budget.take_call()
+        assert budget.take_cancel()
+        assert budget.take_cancel(api_call=False)
+        assert budget.take_call()
+        assert not budget.take_call()
+        assert not budget.take_cancel()
+        assert budget.exhausted == API_CALLS
+        assert (budget.api_calls, budget.cancels) == (3, 2)
+
+    def test_duration(self):
+        """Test that nothing is taken once the time is up."""
+        budget = RunBudget(max_duration=0.01)
+        assert budget.exhausted is None
+
+        time.sleep(0.02)
+
+        assert budget.out_of_calls == TIME
+        assert not budget.take_call()
+        assert not budget.take_cancel(api_call=False)
+
+    @pytest.mark.parametrize("limit", ["max_duration", "max_cancels", "max_api_calls"])
+    def test_limits_must_be_positive(self, limit):
+        """Test that a zero limit is rejected."""
+        with pytest.raises(ValueError, match=limit):
+            RunBudget(**{limit: 0})
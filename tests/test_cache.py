@@ -0,0 +1,83 @@
+"""Tests for the bucket name to ID cache."""
+
+import json
+import time
+from unittest.mock import MagicMock, patch
+
+from b2_cleanup.cache import BucketIdCache
+
+
+def bucket(name, id_):
+    """Build a mock bucket with the given name and ID."""
+    b = MagicMock()
+    b.name = name
+    b.id_ = id_
+    return b
+
+
+class TestBucketIdCache:
+    """Test the BucketIdCache class."""
+
+    def test_save_and_lookup(self):
+        """Test that saved buckets can be looked up by name and ID."""
+        cache = BucketIdCache()
+        cache.save_bucket(bucket("my-bucket", "id1"))
+
+        assert cache.get_bucket_id_or_none_from_bucket_name("my-bucket") == "id1"
+        assert cache.get_bucket_name_or_none_from_bucket_id("id1") == "my-bucket"
+        assert cache.get_bucket_id_or_none_from_bucket_name("other") is None
+
+    def test_set_bucket_name_cache_replaces_entries(self):
+        """Test that a full bucket listing replaces the cache."""
+        cache = BucketIdCache()
+        cache.save_bucket(bucket("old", "id0"))
+        cache.set_bucket_name_cache([bucket("a", "id1"), bucket("b", "id2")])
+
+        assert cache.list_bucket_names_ids() == [("a", "id1"), ("b", "id2")]
+
+    def test_entries_expire(self):
+        """Test that entries older than the TTL are ignored."""
+        cache = BucketIdCache(ttl=60)
+        with patch("b2_cleanup.cache.time.time", return_value=1000):
+            cache.save_bucket(bucket("my-bucket", "id1"))
+
+        with patch("b2_cleanup.cache.time.time", return_value=1059):
+            assert cache.get_bucket_id_or_none_from_bucket_name("my-bucket") == "id1"
+        with patch("b2_cleanup.cache.time.time", return_value=1061):
+            assert cache.get_bucket_id_or_none_from_bucket_name("my-bucket") is None
+
+    def test_persisted_between_instances(self, tmp_path):
+        """Test that a cache file is shared with later instances."""
+        path = str(tmp_path / "buckets.json")
+        BucketIdCache(path).save_bucket(bucket("my-bucket", "id1"))
+
+        assert BucketIdCache(path).get_bucket_id_or_none_from_bucket_name("my-bucket") == "id1"
+
+    def test_corrupt_file_ignored(self, tmp_path):
+        """Test that an unreadable cache file is treated as empty."""
+        path = tmp_path / "buckets.json"
+        path.write_text("not json")
+
+        cache = BucketIdCache(str(path))
+
+        assert cache.list_bucket_names_ids() == []
+        cache.save_bucket(bucket("my-bucket", "id1"))
+        assert BucketIdCache(str(path)).list_bucket_names_ids() == [("my-bucket", "id1")]
+
+    def test_malformed_entries_ignored(self, tmp_path):
+        """Test that entries of the wrong shape in the cache file are dropped."""
+        path = tmp_path / "buckets.json"
+        path.write_text(json.dumps({"junk": "id0", "my-bucket": {"id": "id1", "saved": time.time()}}))
+
+        assert BucketIdCache(str(path)).list_bucket_names_ids() == [("my-bucket", "id1")]
+
+    def test_failed_write_leaves_no_temp_file(self, tmp_path):
+        """Test that a cache file that cannot be replaced leaves nothing behind."""
+        path = tmp_path / "buckets.json"
+        cache = BucketIdCache(str(path))
+
+        with patch("b2_cleanup.cache.os.replace", side_effect=OSError("read-only")):
+            cache.save_bucket(bucket("my-bucket", "id1"))
+
+        assert list(tmp_path.iterdir()) == []
+        assert cache.get_bucket_id_or_none_from_bucket_name("my-bucket") == "id1"
@@ -1,20 +1,73 @@
 """Tests for the CLI interface."""
 
-from unittest.mock import patch, MagicMock
+from unittest.mock import ANY, AsyncMock, patch, MagicMock
 import pytest
 from click.testing import CliRunner
 
+from b2_cleanup import __version__
 from b2_cleanup.cli import cli
+from b2_cleanup.defaults import (
+    DEFAULT_BUCKET_WORKERS,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_STORAGE_PRICE,
+    DEFAULT_WORKERS,
+)
+
+
+def tool_kwargs(**overrides):
+    """Expected B2CleanupTool keyword arguments for a CLI invocation."""
+    kwargs = dict(
+        dry_run=False,
+        override_key_id=None,
+        override_key=None,
+        workers=DEFAULT_WORKERS,
+        max_in_flight=None,
+        page_size=DEFAULT_PAGE_SIZE,
+        bucket_workers=DEFAULT_BUCKET_WORKERS,
+        cache_dir=None,
+        state_file=None,
+        max_retries=DEFAULT_MAX_RETRIES,
+        dead_letter_file=None,
+        prefix=None,
+        older_than=None,
+        exclude=(),
+        plan_file=None,
+        shard=None,
+        lease_dir=None,
+        partitions=(),
+        auto_partition=False,
+        metrics_file=None,
+        metrics_port=None,
+        max_duration=None,
+        max_cancels=None,
+        max_api_calls=None,
+        order="listing",
+    )
+    kwargs.update(overrides)
+    return kwargs
+
+
+def make_tool(ok=True):
+    """Build a mock B2CleanupTool whose runs report ``ok``."""
+    tool = MagicMock()
+    tool.cleanup_unfinished_uploads.return_value.ok = ok
+    tool.cleanup_buckets.return_value.ok = ok
+    tool.report_reclaimable.return_value.ok = ok
+    tool.report_buckets.return_value.ok = ok
+    tool.replay_dead_letters.return_value.ok = ok
+    tool.apply_plan.return_value.ok = ok
+    return tool
 
 
 class TestCLI:
     """Test the CLI interface."""
 
-    @patch("b2_cleanup.cli.logging")
-    @patch("b2_cleanup.cli.B2CleanupTool")
-    def test_cli_basic(self, mock_tool_class, mock_logging):
+    @patch("b2_cleanup.cli.setup_logging")
+    @patch("b2_cleanup.core.B2CleanupTool")
+    def test_cli_basic(self, mock_tool_class, mock_setup_logging):
         """Test basic CLI functionality."""
-        mock_tool = MagicMock()
+        mock_tool = make_tool()
         mock_tool_class.return_value = mock_tool
 
         runner = CliRunner()
@@ -23,34 +76,30 @@ class TestCLI:
             result = runner.invoke(cli, ["test-bucket", "--log-file", "test.log"])
 
         assert result.exit_code == 0
-        mock_tool_class.assert_called_once_with(
-            dry_run=False, override_key_id=None, override_key=None
-        )
+        mock_tool_class.assert_called_once_with(**tool_kwargs())
         mock_tool.cleanup_unfinished_uploads.assert_called_once_with(
             "test-bucket", interactive=True
         )
 
-    @patch("b2_cleanup.cli.B2CleanupTool")
+    @patch("b2_cleanup.core.B2CleanupTool")
     def test_cli_dry_run(self, mock_tool_class):
         """Test CLI with dry run flag."""
-        mock_tool = MagicMock()
+        mock_tool = make_tool()
         mock_tool_class.return_value = mock_tool
 
         runner = CliRunner()
         result = runner.invoke(cli, ["test-bucket", "--dry-run"])
 
         assert result.exit_code == 0
-        mock_tool_class.assert_called_once_with(
-            dry_run=True, override_key_id=None, override_key=None
-        )
+        mock_tool_class.assert_called_once_with(**tool_kwargs(dry_run=True))
         mock_tool.cleanup_unfinished_uploads.assert_called_once_with(
             "test-bucket", interactive=True
         )
 
-    @patch("b2_cleanup.cli.B2CleanupTool")
+    @patch("b2_cleanup.core.B2CleanupTool")
     def test_cli_with_credentials(self, mock_tool_class):
         """Test CLI with credential overrides."""
-        mock_tool = MagicMock()
+        mock_tool = make_tool()
         mock_tool_class.return_value = mock_tool
 
         runner = CliRunner()
@@ -60,29 +109,600 @@ class TestCLI:
 
         assert result.exit_code == 0
         mock_tool_class.assert_called_once_with(
-            dry_run=False, override_key_id="test-key-id", override_key="test-key"
+            **tool_kwargs(override_key_id="test-key-id", override_key="test-key")
         )
         mock_tool.cleanup_unfinished_uploads.assert_called_once_with(
             "test-bucket", interactive=True
         )
 
-    @patch("b2_cleanup.cli.B2CleanupTool")
+    @patch("b2_cleanup.core.B2CleanupTool")
     def test_cli_non_interactive(self, mock_tool_class):
         """Test CLI with non-interactive flag."""
-        mock_tool = MagicMock()
+        mock_tool = make_tool()
         mock_tool_class.return_value = mock_tool
 
         runner = CliRunner()
         result = runner.invoke(cli, ["test-bucket", "--non-interactive"])
 
         assert result.exit_code == 0
-        mock_tool_class.assert_called_once_with(
-            dry_run=False, override_key_id=None, override_key=None
-        )
+        mock_tool_class.assert_called_once_with(**tool_kwargs())
         mock_tool.cleanup_unfinished_uploads.assert_called_once_with(
             "test-bucket", interactive=False
         )
 
+    @patch("b2_cleanup.core.B2CleanupTool")
+    def test_cli_workers(self, mock_tool_class):
+        """Test CLI with a custom worker count."""
+        mock_tool = make_tool()
+        mock_tool_class.return_value = mock_tool
+
+        runner = CliRunner()
+        result = runner.invoke(
+            cli, ["test-bucket", "--workers", "32", "--max-in-flight", "256"]
+        )
+
+        assert result.exit_code == 0
+        mock_tool_class.assert_called_once_with(
+            **tool_kwargs(workers=32, max_in_flight=256)
+        )
+
+    @patch("b2_cleanup.core.B2CleanupTool")
+    def test_cli_page_size(self, mock_tool_class):
+        """Test CLI with a custom listing page size."""
+        mock_tool_class.return_value = make_tool()
+
+        runner = CliRunner()
+        result = runner.invoke(cli, ["test-bucket", "--page-size", "25"])
+
+        assert result.exit_code == 0
+        mock_tool_class.assert_called_once_with(**tool_kwargs(page_size=25))
+
+    def test_cli_max_in_flight_below_workers(self):
+        """Test CLI rejects fewer uploads in flight than workers as a usage error."""
+        runner = CliRunner()
+        result = runner.invoke(cli, ["test-bucket", "--workers", "10", "--max-in-flight", "5"])
+
+        assert result.exit_code == 2
+        assert "must be at least the number of workers (10)" in result.output
+
+    def test_cli_invalid_page_size(self):
+        """Test CLI rejects a page size above the B2 maximum."""
+        runner = CliRunner()
+        result = runner.invoke(cli, ["test-bucket", "--page-size", "101"])
+
+        assert result.exit_code != 0
+
+    @patch("b2_cleanup.core.B2CleanupTool")
+    def test_cli_multiple_buckets(self, mock_tool_class):
+        """Test CLI sweeps several buckets and patterns in one run."""
+        mock_tool = make_tool()
+        mock_tool_class.return_value = mock_tool
+
+        runner = CliRunner()
+        result = runner.invoke(
+            cli, ["bucket-a", "backup-*", "--bucket-workers", "8"]
+        )
+
+        assert result.exit_code == 0
+        mock_tool_class.assert_called_once_with(**tool_kwargs(bucket_workers=8))
+        mock_tool.cleanup_buckets.assert_called_once_with(
+            ("bucket-a", "backup-*"), all_buckets=False
+        )
+        mock_tool.cleanup_unfinished_uploads.assert_not_called()
+
+    @patch("b2_cleanup.core.B2CleanupTool")
+    def test_cli_single_pattern_sweeps(self, mock_tool_class):
+        """Test CLI treats a single glob pattern as a sweep."""
+        mock_tool = make_tool()
+        mock_tool_class.return_value = mock_tool
+
+        runner = CliRunner()
+        result = runner.invoke(cli, ["backup-*"])
+
+        assert result.exit_code == 0
+        mock_tool.cleanup_buckets.assert_called_once_with(("backup-*",), all_buckets=False)
+
+    @patch("b2_cleanup.core.B2CleanupTool")
+    def test_cli_all_buckets(self, mock_tool_class):
+        """Test CLI --all-buckets exits non-zero when a bucket fails."""
+        mock_tool = make_tool(ok=False)
+        mock_tool_class.return_value = mock_tool
+
+        runner = CliRunner()
+        result = runner.invoke(cli, ["--all-buckets"])
+
+        assert result.exit_code == 1
+        mock_tool.cleanup_buckets.assert_called_once_with((), all_buckets=True)
+
+    @patch("b2_cleanup.core.B2CleanupTool")
+    def test_cli_cache_dir(self, mock_tool_class):
+        """Test CLI passes the authorization cache directory."""
+        mock_tool_class.return_value = make_tool()
+
+        runner = CliRunner()
+        result = runner.invoke(cli, ["test-bucket", "--cache-dir", "/tmp/b2-cache"])
+
+        assert result.exit_code == 0
+        mock_tool_class.assert_called_once_with(**tool_kwargs(cache_dir="/tmp/b2-cache"))
+
+    @patch("b2_cleanup.core.B2CleanupTool")
+    def test_cli_cache_dir_from_env(self, mock_tool_class):
+        """Test CLI reads the cache directory from B2_CLEANUP_CACHE_DIR."""
+        mock_tool_class.return_value = make_tool()
+
+        runner = CliRunner()
+        result = runner.invoke(
+            cli, ["test-bucket"], env={"B2_CLEANUP_CACHE_DIR": "/tmp/b2-cache"}
+        )
+
+        assert result.exit_code == 0
+        mock_tool_class.assert_called_once_with(**tool_kwargs(cache_dir="/tmp/b2-cache"))
+
+    @patch("b2_cleanup.core.B2CleanupTool")
+    def test_cli_state_file(self, mock_tool_class):
+        """Test CLI passes the checkpoint journal and closes the tool."""
+        mock_tool = make_tool()
+        mock_tool_class.return_value = mock_tool
+
+        runner = CliRunner()
+        result = runner.invoke(cli, ["test-bucket", "--state-file", "state.jsonl"])
+
+        assert result.exit_code == 0
+        mock_tool_class.assert_called_once_with(**tool_kwargs(state_file="state.jsonl"))
+        mock_tool.close.assert_called_once()
+
+    @patch("b2_cleanup.core.B2CleanupTool")
+    def test_cli_failed_cancellations_exit_non_zero(self, mock_tool_class):
+        """Test CLI exits non-zero when some uploads could not be cancelled."""
+        mock_tool_class.return_value = make_tool(ok=False)
+
+        runner = CliRunner()
+        result = runner.invoke(
+            cli, ["test-bucket", "--max-retries", "5", "--dead-letter", "dead.jsonl"]
+        )
+
+        assert result.exit_code == 1
+        mock_tool_class.assert_called_once_with(
+            **tool_kwargs(max_retries=5, dead_letter_file="dead.jsonl")
+        )
+
+    @patch("b2_cleanup.core.B2CleanupTool")
+    def test_cli_filters(self, mock_tool_class):
+        """Test CLI passes the prefix, age and exclude filters."""
+        mock_tool_class.return_value = make_tool()
+
+        runner = CliRunner()
+        result = runner.invoke(
+            cli,
+            [
+                "test-bucket",
+                "--prefix", "backups/",
+                "--older-than", "1d12h",
+                "--exclude", "*.keep",
+                "--exclude", "backups/live/*",
+            ],
+        )
+
+        assert result.exit_code == 0
+        mock_tool_class.assert_called_once_with(
+            **tool_kwargs(
+                prefix="backups/",
+                older_than=129600.0,
+                exclude=("*.keep", "backups/live/*"),
+            )
+        )
+
+    def test_cli_invalid_older_than(self):
+        """Test CLI rejects an --older-than value that is not a duration."""
+        runner = CliRunner()
+        result = runner.invoke(cli, ["test-bucket", "--older-than", "soon"])
+
+        assert result.exit_code != 0
+        assert "--older-than" in result.output
+
+    @patch("b2_cleanup.core.B2CleanupTool")
+    def test_cli_report(self, mock_tool_class):
+        """Test CLI --report reports on a bucket instead of cleaning it up."""
+        mock_tool = make_tool()
+        mock_tool_class.return_value = mock_tool
+
+        runner = CliRunner()
+        result = runner.invoke(
+            cli, ["test-bucket", "--report", "--sample", "500", "--price-per-gb", "0.01"]
+        )
+
+        assert result.exit_code == 0
+        mock_tool.report_reclaimable.assert_called_once_with(
+            "test-bucket", interactive=True, sample=500, price_per_gb=0.01
+        )
+        mock_tool.cleanup_unfinished_uploads.assert_not_called()
+
+    @patch("b2_cleanup.core.B2CleanupTool")
+    def test_cli_report_all_buckets(self, mock_tool_class):
+        """Test CLI --report with --all-buckets reports on every bucket."""
+        mock_tool = make_tool()
+        mock_tool_class.return_value = mock_tool
+
+        runner = CliRunner()
+        result = runner.invoke(cli, ["--all-buckets", "--report"])
+
+        assert result.exit_code == 0
+        mock_tool.report_buckets.assert_called_once_with(
+            (), all_buckets=True, sample=None, price_per_gb=DEFAULT_STORAGE_PRICE
+        )
+        mock_tool.cleanup_buckets.assert_not_called()
+
+    def test_cli_sample_without_report(self):
+        """Test CLI rejects --sample without --report."""
+        runner = CliRunner()
+        result = runner.invoke(cli, ["test-bucket", "--sample", "10"])
+
+        assert result.exit_code != 0
+        assert "--sample" in result.output
+
+    @patch("b2_cleanup.core.B2CleanupTool")
+    def test_cli_plan(self, mock_tool_class):
+        """Test CLI --plan passes the plan file to the tool."""
+        mock_tool = make_tool()
+        mock_tool_class.return_value = mock_tool
+
+        runner = CliRunner()
+        result = runner.invoke(cli, ["test-bucket", "--plan", "plan.jsonl"])
+
+        assert result.exit_code == 0
+        mock_tool_class.assert_called_once_with(**tool_kwargs(plan_file="plan.jsonl"))
+        mock_tool.cleanup_unfinished_uploads.assert_called_once_with("test-bucket", interactive=True)
+
+    @patch("b2_cleanup.cli.setup_logging")
+    @patch("b2_cleanup.core.B2CleanupTool")
+    def test_cli_plan_discarded_on_error(self, mock_tool_class, mock_setup_logging):
+        """Test CLI tells the tool to discard its plan when the run raises."""
+        mock_tool = make_tool()
+        mock_tool.cleanup_unfinished_uploads.side_effect = RuntimeError("listing failed")
+        mock_tool_class.return_value = mock_tool
+
+        runner = CliRunner()
+        result = runner.invoke(cli, ["test-bucket", "--plan", "plan.jsonl"])
+
+        assert result.exit_code != 0
+        mock_tool.close.assert_called_once_with(ok=False)
+
+    @patch("b2_cleanup.core.B2CleanupTool")
+    def test_cli_apply(self, mock_tool_class, tmp_path):
+        """Test CLI --apply runs a plan without listing buckets."""
+        mock_tool = make_tool()
+        mock_tool_class.return_value = mock_tool
+        plan_file = tmp_path / "plan.jsonl"
+        plan_file.touch()
+
+        runner = CliRunner()
+        result = runner.invoke(cli, ["--apply", str(plan_file)])
+
+        assert result.exit_code == 0
+        mock_tool.apply_plan.assert_called_once_with(str(plan_file))
+        mock_tool.cleanup_unfinished_uploads.assert_not_called()
+        mock_tool.close.assert_called_once()
+
+    @patch("b2_cleanup.core.B2CleanupTool")
+    def test_cli_apply_invalid_plan(self, mock_tool_class, tmp_path):
+        """Test CLI reports an invalid plan file as an error."""
+        mock_tool = make_tool()
+        mock_tool.apply_plan.side_effect = ValueError("plan.jsonl:3: invalid plan entry")
+        mock_tool_class.return_value = mock_tool
+        plan_file = tmp_path / "plan.jsonl"
+        plan_file.touch()
+
+        runner = CliRunner()
+        result = runner.invoke(cli, ["--apply", str(plan_file)])
+
+        assert result.exit_code == 1
+        assert "invalid plan entry" in result.output
+
+    def test_cli_apply_with_bucket(self, tmp_path):
+        """Test CLI rejects --apply combined with bucket names."""
+        plan_file = tmp_path / "plan.jsonl"
+        plan_file.touch()
+
+        runner = CliRunner()
+        result = runner.invoke(cli, ["test-bucket", "--apply", str(plan_file)])
+
+        assert result.exit_code != 0
+        assert "--apply" in result.output
+
+    @patch("b2_cleanup.core.B2CleanupTool")
+    def test_cli_shard(self, mock_tool_class):
+        """Test CLI passes the shard and lease directory."""
+        mock_tool_class.return_value = make_tool()
+
+        runner = CliRunner()
+        result = runner.invoke(
+            cli, ["test-bucket", "--shard", "auto/4", "--lease-dir", "/shared/leases"]
+        )
+
+        assert result.exit_code == 0
+        mock_tool_class.assert_called_once_with(
+            **tool_kwargs(shard=(None, 4), lease_dir="/shared/leases")
+        )
+
+    @pytest.mark.parametrize("args", [["--shard", "5/4"], ["--shard", "auto/4"]])
+    def test_cli_invalid_shard(self, args):
+        """Test CLI rejects out-of-range shards and auto without a lease directory."""
+        runner = CliRunner()
+        result = runner.invoke(cli, ["test-bucket"] + args)
+
+        assert result.exit_code != 0
+        assert "--shard" in result.output
+
+    @patch("b2_cleanup.core.B2CleanupTool")
+    def test_cli_partitions(self, mock_tool_class):
+        """Test CLI passes listing partitions."""
+        mock_tool_class.return_value = make_tool()
+
+        runner = CliRunner()
+        result = runner.invoke(
+            cli, ["test-bucket", "--partition", "logs/", "--partition", "backups/"]
+        )
+
+        assert result.exit_code == 0
+        mock_tool_class.assert_called_once_with(
+            **tool_kwargs(partitions=("logs/", "backups/"))
+        )
+
+    @patch("b2_cleanup.cli.signal")
+    @patch("b2_cleanup.core.B2CleanupTool")
+    def test_cli_watch(self, mock_tool_class, mock_signal):
+        """Test CLI runs a watch with its interval and rescan interval."""
+        mock_tool = make_tool()
+        mock_tool_class.return_value = mock_tool
+
+        runner = CliRunner()
+        result = runner.invoke(
+            cli, ["backup-*", "--older-than", "1d", "--watch", "10m", "--rescan", "1h"]
+        )
+
+        assert result.exit_code == 0
+        mock_tool.watch.assert_called_once()
+        args, kwargs = mock_tool.watch.call_args
+        assert args == (("backup-*",),)
+        assert kwargs["interval"] == 600
+        assert kwargs["rescan_interval"] == 3600
+        mock_signal.signal.assert_called_once_with(mock_signal.SIGTERM, ANY)
+        mock_tool.close.assert_called_once()
+
+    @pytest.mark.parametrize(
+        "args, message",
+        [
+            (["--watch", "10m"], "--watch requires"),
+            (["b", "--watch", "10m", "--state-file", "s.jsonl"], "--state-file"),
+            (["b", "--rescan", "1h"], "--rescan requires --watch"),
+        ],
+    )
+    def test_cli_watch_invalid(self, args, message):
+        """Test CLI rejects watch options that cannot work."""
+        runner = CliRunner()
+        result = runner.invoke(cli, args)
+
+        assert result.exit_code != 0
+        assert message in result.output
+
+    @patch("b2_cleanup.aio.AsyncB2CleanupTool")
+    @patch("b2_cleanup.core.B2CleanupTool")
+    def test_cli_async_engine(self, mock_tool_class, mock_async_class):
+        """Test CLI runs the async engine instead of B2CleanupTool."""
+        tool = AsyncMock()
+        mock_async_class.return_value.__aenter__.return_value = tool
+        tool.cleanup_unfinished_uploads.return_value.ok = True
+
+        runner = CliRunner()
+        result = runner.invoke(
+            cli,
+            [
+                "test-bucket", "--engine", "async", "--workers", "1000", "--dry-run",
+                "--max-in-flight", "2000", "--bucket-workers", "2",
+            ],
+        )
+
+        assert result.exit_code == 0
+        mock_tool_class.assert_not_called()
+        kwargs = mock_async_class.call_args.kwargs
+        assert kwargs["concurrency"] == 1000
+        assert kwargs["max_in_flight"] == 2000
+        assert kwargs["bucket_workers"] == 2
+        assert kwargs["dry_run"] is True
+        tool.cleanup_unfinished_uploads.assert_awaited_once_with("test-bucket")
+
+        result = runner.invoke(cli, ["test-bucket", "--engine", "async"])
+
+        assert result.exit_code == 0
+        assert mock_async_class.call_args.kwargs["concurrency"] == 100
+
+    @pytest.mark.parametrize(
+        "args, message",
+        [
+            (["b", "--engine", "async", "--state-file", "s.jsonl"], "--state-file"),
+            (["backup-*", "--engine", "async"], "plain bucket names"),
+        ],
+    )
+    def test_cli_async_engine_unsupported(self, args, message):
+        """Test CLI rejects options the async engine does not support."""
+        runner = CliRunner()
+        result = runner.invoke(cli, args)
+
+        assert result.exit_code != 0
+        assert message in result.output
+
+    @patch("b2_cleanup.core.B2CleanupTool")
+    def test_cli_budget(self, mock_tool_class):
+        """Test CLI passes run budgets and the cancellation order."""
+        mock_tool_class.return_value = make_tool()
+
+        runner = CliRunner()
+        result = runner.invoke(
+            cli,
+            [
+                "test-bucket", "--max-duration", "45m", "--max-cancels", "1000",
+                "--max-api-calls", "5000", "--order", "oldest",
+            ],
+        )
+
+        assert result.exit_code == 0
+        mock_tool_class.assert_called_once_with(
+            **tool_kwargs(max_duration=2700, max_cancels=1000, max_api_calls=5000, order="oldest")
+        )
+
+    @pytest.mark.parametrize(
+        "args, message",
+        [
+            (["b", "--max-duration", "0s"], "must be positive"),
+            (["b", "--max-cancels", "10", "--report"], "cannot be combined with --report"),
+            (["b", "--order", "oldest", "--watch", "10m"], "--order only applies"),
+            (["b", "--order", "oldest", "--report"], "--order only applies"),
+            (["b", "--engine", "async", "--max-cancels", "10"], "--max-cancels"),
+        ],
+    )
+    def test_cli_budget_invalid(self, args, message):
+        """Test CLI rejects budgets and orders where they do not apply."""
+        runner = CliRunner()
+        result = runner.invoke(cli, args)
+
+        assert result.exit_code != 0
+        assert message in result.output
+
+    @patch("b2_cleanup.accounts.run_accounts")
+    @patch("b2_cleanup.core.B2CleanupTool")
+    def test_cli_accounts(self, mock_tool_class, mock_run_accounts):
+        """Test CLI fans out over the accounts of a config file."""
+        mock_run_accounts.return_value.ok = True
+
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            with open("accounts.toml", "w") as f:
+                f.write('[[accounts]]\nname = "a"\nkey_id = "i"\nkey = "k"\nall_buckets = true\n')
+            result = runner.invoke(
+                cli,
+                ["--accounts", "accounts.toml", "--account-workers", "4", "--dry-run", "--max-cancels", "10"],
+            )
+
+        assert result.exit_code == 0
+        mock_tool_class.assert_not_called()
+        (accounts,), kwargs = mock_run_accounts.call_args
+        assert [account.name for account in accounts] == ["a"]
+        assert kwargs["processes"] == 4
+        assert kwargs["dry_run"] is True
+        assert kwargs["max_cancels"] == 10
+
+        mock_run_accounts.return_value.ok = False
+        with runner.isolated_filesystem():
+            with open("accounts.toml", "w") as f:
+                f.write('[[accounts]]\nname = "a"\nkey_id = "i"\nkey = "k"\nall_buckets = true\n')
+            result = runner.invoke(cli, ["--accounts", "accounts.toml"])
+
+        assert result.exit_code == 1
+
+    @pytest.mark.parametrize(
+        "args, message",
+        [
+            (["b", "--accounts", "accounts.toml"], "cannot be combined with bucket names"),
+            (["--accounts", "accounts.toml", "--key", "k", "--report"], "--key, --report"),
+            (["--accounts", "accounts.toml", "--engine", "async"], "--engine async"),
+            (["--account-workers", "2"], "--account-workers requires --accounts"),
+            (["--accounts", "accounts.toml"], "no [[accounts]] tables"),
+        ],
+    )
+    def test_cli_accounts_invalid(self, args, message):
+        """Test CLI rejects options that do not apply to several accounts, and bad configs."""
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            with open("accounts.toml", "w") as f:
+                f.write("")
+            result = runner.invoke(cli, args)
+
+        assert result.exit_code != 0
+        assert message in result.output
+
+    @patch("b2_cleanup.core.B2CleanupTool")
+    def test_cli_metrics(self, mock_tool_class):
+        """Test CLI passes the metrics file and port."""
+        mock_tool_class.return_value = make_tool()
+
+        runner = CliRunner()
+        result = runner.invoke(
+            cli, ["test-bucket", "--metrics-file", "b2.prom", "--metrics-port", "9300"]
+        )
+
+        assert result.exit_code == 0
+        mock_tool_class.assert_called_once_with(
+            **tool_kwargs(metrics_file="b2.prom", metrics_port=9300)
+        )
+
+    def test_cli_partition_outside_prefix(self):
+        """Test CLI rejects a partition that does not start with the prefix."""
+        runner = CliRunner()
+        result = runner.invoke(cli, ["test-bucket", "--prefix", "a/", "--partition", "b/"])
+
+        assert result.exit_code == 2
+        assert "every --partition must start with --prefix" in result.output
+
+    def test_cli_partition_with_auto_partition(self):
+        """Test CLI rejects explicit partitions combined with --auto-partition."""
+        runner = CliRunner()
+        result = runner.invoke(
+            cli, ["test-bucket", "--partition", "logs/", "--auto-partition"]
+        )
+
+        assert result.exit_code != 0
+        assert "--auto-partition" in result.output
+
+    @patch("b2_cleanup.core.B2CleanupTool")
+    def test_cli_replay(self, mock_tool_class, tmp_path):
+        """Test CLI replays a dead-letter file."""
+        mock_tool = make_tool()
+        mock_tool_class.return_value = mock_tool
+        dead_letter_file = tmp_path / "dead.jsonl"
+        dead_letter_file.touch()
+
+        runner = CliRunner()
+        result = runner.invoke(cli, ["--replay", str(dead_letter_file)])
+
+        assert result.exit_code == 0
+        mock_tool.replay_dead_letters.assert_called_once_with(str(dead_letter_file))
+        mock_tool.cleanup_unfinished_uploads.assert_not_called()
+
+    def test_cli_replay_with_bucket(self, tmp_path):
+        """Test CLI rejects --replay combined with bucket names."""
+        dead_letter_file = tmp_path / "dead.jsonl"
+        dead_letter_file.touch()
+
+        runner = CliRunner()
+        result = runner.invoke(cli, ["test-bucket", "--replay", str(dead_letter_file)])
+
+        assert result.exit_code != 0
+        assert "--replay" in result.output
+
+    def test_cli_all_buckets_with_names(self):
+        """Test CLI rejects --all-buckets combined with bucket names."""
+        runner = CliRunner()
+        result = runner.invoke(cli, ["test-bucket", "--all-buckets"])
+
+        assert result.exit_code != 0
+        assert "--all-buckets" in result.output
+
+    def test_cli_version(self):
+        """Test CLI --version prints the package version."""
+        runner = CliRunner()
+        result = runner.invoke(cli, ["--version"])
+
+        assert result.exit_code == 0
+        assert __version__ in result.output
+
+    def test_cli_invalid_workers(self):
+        """Test CLI rejects a worker count below one."""
+        runner = CliRunner()
+        result = runner.invoke(cli, ["test-bucket", "--workers", "0"])
+
+        assert result.exit_code != 0
+        assert "--workers" in result.output
+
     def test_cli_missing_bucket(self):
         """Test CLI without bucket argument shows interactive selection."""
         runner = CliRunner()
@@ -3,14 +3,44 @@
 import os
 import json
 import subprocess
+import threading
+import time
 from unittest.mock import patch, MagicMock, call
 
 import pytest
 from b2sdk.v2 import B2Api
+from b2sdk.v2.exception import B2ConnectionError
 
 from b2_cleanup.core import B2CleanupTool
 
 
+@pytest.fixture(autouse=True)
+def no_b2_cli_account_info(tmp_path, monkeypatch):
+    """Keep the developer's own b2 CLI credentials out of the tests."""
+    monkeypatch.setenv("B2_ACCOUNT_INFO", str(tmp_path / "missing_account_info"))
+
+
+def unfinished_file(file_id, file_name=None, upload_timestamp=0):
+    """Build a file dict as returned by b2_list_unfinished_large_files."""
+    return {
+        "fileId": file_id,
+        "fileName": file_name or f"{file_id}.txt",
+        "accountId": "account",
+        "bucketId": "bucket_id",
+        "contentType": "application/octet-stream",
+        "fileInfo": {},
+        "fileRetention": {"isClientAuthorizedToRead": False, "value": None},
+        "legalHold": {"isClientAuthorizedToRead": False, "value": None},
+        "action": "start",
+        "uploadTimestamp": upload_timestamp,
+    }
+
+
+def unfinished_page(files, next_file_id=None):
+    """Build a b2_list_unfinished_large_files response."""
+    return {"files": files, "nextFileId": next_file_id}
+
+
 class TestB2CleanupTool:
     """Test the B2CleanupTool class."""
 
@@ -31,6 +61,47 @@ class TestB2CleanupTool:
         )
         assert tool.dry_run is True
 
+    @patch("b2_cleanup.core.B2Api")
+    def test_init_with_cached_authorization(self, mock_b2api, tmp_path):
+        """Test that a cached authorization for the same key skips authorize_account."""
+        mock_b2api.side_effect = lambda info, **kwargs: MagicMock(account_info=info)
+        cache_dir = tmp_path / "cache"
+
+        first = B2CleanupTool(
+            override_key_id="test_key_id", override_key="test_key", cache_dir=str(cache_dir)
+        )
+        first.api.authorize_account.assert_called_once_with(
+            "production", "test_key_id", "test_key"
+        )
+        # Stand in for what b2sdk's authorize_account stores
+        first.api.account_info.set_auth_data(
+            account_id="account",
+            auth_token="token",
+            api_url="https://api.example",
+            download_url="https://f000.example",
+            recommended_part_size=100 * 1024 * 1024,
+            absolute_minimum_part_size=5 * 1024 * 1024,
+            application_key="test_key",
+            realm="production",
+            s3_api_url="https://s3.example",
+            allowed=dict(
+                bucketId=None, bucketName=None, capabilities=["listBuckets"], namePrefix=None
+            ),
+            application_key_id="test_key_id",
+        )
+
+        second = B2CleanupTool(
+            override_key_id="test_key_id", override_key="test_key", cache_dir=str(cache_dir)
+        )
+        second.api.authorize_account.assert_not_called()
+
+        other_key = B2CleanupTool(
+            override_key_id="other_key_id", override_key="other_key", cache_dir=str(cache_dir)
+        )
+        other_key.api.authorize_account.assert_called_once_with(
+            "production", "other_key_id", "other_key"
+        )
+
     @patch("b2_cleanup.core.B2Api")
     @patch.dict("os.environ", {"B2_APPLICATION_KEY_ID": "env_key_id", "B2_APPLICATION_KEY": "env_key"})
     def test_init_with_env_credentials(self, mock_b2api):
@@ -45,7 +116,7 @@ class TestB2CleanupTool:
         )
 
     @patch("b2_cleanup.core.B2Api")
-    @patch("b2_cleanup.core.subprocess.run")
+    @patch("b2_cleanup.credentials.subprocess.run")
     def test_init_with_b2_cli(self, mock_run, mock_b2api):
         """Test initialization using B2 CLI credentials."""
         mock_api = MagicMock()
@@ -68,7 +139,23 @@ class TestB2CleanupTool:
         )
 
     @patch("b2_cleanup.core.B2Api")
-    @patch("b2_cleanup.core.subprocess.run")
+    @patch("b2_cleanup.credentials.subprocess.run")
+    @patch("b2_cleanup.credentials.read_b2_cli_credentials")
+    def test_init_with_b2_cli_account_info(self, mock_read, mock_run, mock_b2api):
+        """Test that stored b2 CLI credentials are used without spawning `b2`."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+        mock_read.return_value = ("cli_key_id", "cli_key")
+
+        B2CleanupTool()
+
+        mock_run.assert_not_called()
+        mock_api.authorize_account.assert_called_once_with(
+            "production", "cli_key_id", "cli_key"
+        )
+
+    @patch("b2_cleanup.core.B2Api")
+    @patch("b2_cleanup.credentials.subprocess.run")
     def test_b2_cli_not_found(self, mock_run, mock_b2api):
         """Test handling when B2 CLI is not installed."""
         mock_api = MagicMock()
@@ -80,7 +167,7 @@ class TestB2CleanupTool:
 
         assert "B2 CLI not found" in str(excinfo.value)
 
-    @patch("b2_cleanup.core.subprocess.run")
+    @patch("b2_cleanup.credentials.subprocess.run")
     def test_b2_cli_command_error(self, mock_run):
         """Test handling when B2 CLI command fails."""
         mock_run.side_effect = subprocess.CalledProcessError(1, "b2 account get", "Error")
@@ -90,7 +177,7 @@ class TestB2CleanupTool:
         
         assert "Could not authorize with Backblaze B2" in str(excinfo.value)
 
-    @patch("b2_cleanup.core.subprocess.run")
+    @patch("b2_cleanup.credentials.subprocess.run")
     def test_b2_cli_invalid_json_response(self, mock_run):
         """Test handling when B2 CLI returns invalid JSON."""
         mock_result = MagicMock()
@@ -109,14 +196,14 @@ class TestB2CleanupTool:
         mock_b2api.return_value = mock_api
         
         mock_bucket = MagicMock()
-        mock_bucket.list_unfinished_large_files.return_value = []
+        mock_api.session.list_unfinished_large_files.return_value = unfinished_page([])
         mock_api.get_bucket_by_name.return_value = mock_bucket
 
         tool = B2CleanupTool(override_key_id="test_id", override_key="test_key")
         tool.cleanup_unfinished_uploads("test-bucket")
 
         mock_api.get_bucket_by_name.assert_called_once_with("test-bucket")
-        mock_bucket.list_unfinished_large_files.assert_called_once()
+        mock_api.session.list_unfinished_large_files.assert_called_once()
         # No calls to cancel_large_file should happen
         mock_api.cancel_large_file.assert_not_called()
 
@@ -126,17 +213,12 @@ class TestB2CleanupTool:
         mock_api = MagicMock()
         mock_b2api.return_value = mock_api
         
-        # Create mock unfinished files
-        mock_file1 = MagicMock()
-        mock_file1.file_id = "file1_id"
-        mock_file1.file_name = "file1.txt"
-        
-        mock_file2 = MagicMock()
-        mock_file2.file_id = "file2_id"
-        mock_file2.file_name = "file2.txt"
+        # Create unfinished files
+        mock_api.session.list_unfinished_large_files.return_value = unfinished_page(
+            [unfinished_file("file1_id"), unfinished_file("file2_id")]
+        )
         
         mock_bucket = MagicMock()
-        mock_bucket.list_unfinished_large_files.return_value = [mock_file1, mock_file2]
         mock_api.get_bucket_by_name.return_value = mock_bucket
 
         # Initialize with dry_run=True
@@ -148,27 +230,174 @@ class TestB2CleanupTool:
         tool.cleanup_unfinished_uploads("test-bucket")
 
         mock_api.get_bucket_by_name.assert_called_once_with("test-bucket")
-        mock_bucket.list_unfinished_large_files.assert_called_once()
+        mock_api.session.list_unfinished_large_files.assert_called_once()
         # No calls to cancel_large_file should happen in dry run mode
         mock_api.cancel_large_file.assert_not_called()
 
+    @patch("b2_cleanup.core.LOGGED_FILES", 2)
+    @patch("b2_cleanup.core.B2Api")
+    def test_per_file_lines_demoted(self, mock_b2api, caplog):
+        """Test that only the first uploads of a bucket get an INFO line each."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+        mock_api.session.list_unfinished_large_files.return_value = unfinished_page(
+            [unfinished_file(f"file{i}_id") for i in range(4)]
+        )
+        mock_api.get_bucket_by_name.return_value = MagicMock()
+
+        tool = B2CleanupTool(dry_run=True, override_key_id="test_id", override_key="test_key")
+        with caplog.at_level("DEBUG", logger="B2Cleanup"):
+            tool.cleanup_unfinished_uploads("test-bucket")
+
+        per_file = [r for r in caplog.records if "would cancel" in r.getMessage()]
+        assert [r.levelname for r in per_file] == ["INFO", "INFO", "DEBUG", "DEBUG"]
+        assert per_file[0].file_id == "file0_id"
+        assert per_file[0].bucket == "test-bucket"
+
+    @patch("b2_cleanup.core.B2Api")
+    def test_cleanup_filters(self, mock_b2api):
+        """Test that prefix, age and exclude filters limit what is cancelled."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+        now_ms = int(time.time() * 1000)
+        mock_api.session.list_unfinished_large_files.return_value = unfinished_page(
+            [
+                unfinished_file("old_id", "logs/old.bin", upload_timestamp=now_ms - 86_400_000),
+                unfinished_file("new_id", "logs/new.bin", upload_timestamp=now_ms),
+                unfinished_file("kept_id", "logs/a.keep", upload_timestamp=0),
+            ]
+        )
+        mock_api.get_bucket_by_name.return_value.id_ = "bucket_id"
+
+        tool = B2CleanupTool(
+            override_key_id="test_id",
+            override_key="test_key",
+            page_size=10,
+            prefix="logs/",
+            older_than=3600,
+            exclude=["*.keep"],
+        )
+        summary = tool.cleanup_unfinished_uploads("test-bucket")
+
+        mock_api.session.list_unfinished_large_files.assert_called_once_with(
+            "bucket_id", None, 10, "logs/"
+        )
+        mock_api.cancel_large_file.assert_called_once_with("old_id")
+        assert summary.found == 1
+        assert summary.skipped == 2
+
+    @patch("b2_cleanup.core.B2Api")
+    def test_report_reclaimable(self, mock_b2api, tmp_path):
+        """Test that a report counts part bytes and caches them by file ID."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+        mock_api.session.list_unfinished_large_files.return_value = unfinished_page(
+            [unfinished_file("file1_id"), unfinished_file("file2_id")]
+        )
+        sizes = {"file1_id": 1_000_000_000, "file2_id": 500_000_000}
+        mock_api.session.list_parts.side_effect = lambda file_id, start, count: {
+            "parts": [{"partNumber": 1, "contentLength": sizes[file_id]}],
+            "nextPartNumber": None,
+        }
+
+        tool = B2CleanupTool(
+            override_key_id="test_id", override_key="test_key", cache_dir=str(tmp_path)
+        )
+        report = tool.report_reclaimable("test-bucket")
+
+        assert report.uploads == report.scanned == 2
+        assert report.estimated_bytes == 1_500_000_000
+        assert report.monthly_cost(0.006) == pytest.approx(0.009)
+        assert mock_api.session.list_parts.call_count == 2
+        mock_api.cancel_large_file.assert_not_called()
+
+        # A second report reads the totals from the cache
+        tool = B2CleanupTool(
+            override_key_id="test_id", override_key="test_key", cache_dir=str(tmp_path)
+        )
+        assert tool.report_reclaimable("test-bucket").estimated_bytes == 1_500_000_000
+        assert mock_api.session.list_parts.call_count == 2
+
+    @patch("b2_cleanup.core.B2Api")
+    def test_report_sampled(self, mock_b2api):
+        """Test that sampling counts parts of only the requested number of uploads."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+        mock_api.session.list_unfinished_large_files.return_value = unfinished_page(
+            [unfinished_file(f"file{i}_id") for i in range(50)]
+        )
+        mock_api.session.list_parts.return_value = {
+            "parts": [{"partNumber": 1, "contentLength": 100}],
+            "nextPartNumber": None,
+        }
+
+        tool = B2CleanupTool(override_key_id="test_id", override_key="test_key")
+        report = tool.report_reclaimable("test-bucket", sample=10)
+
+        assert report.uploads == 50
+        assert report.scanned == 10
+        assert mock_api.session.list_parts.call_count == 10
+        assert report.estimated_bytes == 5000
+        # Every upload has the same size, so there is no sampling error
+        assert report.bytes_low == report.bytes_high == 5000
+
+    @patch("b2_cleanup.core.B2Api")
+    def test_report_part_listing_failure(self, mock_b2api):
+        """Test that an upload whose parts cannot be listed is left out of the estimate."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+        mock_api.session.list_unfinished_large_files.return_value = unfinished_page(
+            [unfinished_file("file1_id"), unfinished_file("file2_id")]
+        )
+
+        def list_parts(file_id, start_part_number, max_part_count):
+            if file_id == "file2_id":
+                raise Exception("API error")
+            return {"parts": [{"partNumber": 1, "contentLength": 100}], "nextPartNumber": None}
+
+        mock_api.session.list_parts.side_effect = list_parts
+
+        tool = B2CleanupTool(override_key_id="test_id", override_key="test_key")
+        report = tool.report_reclaimable("test-bucket")
+
+        assert report.scanned == 1
+        assert report.failed == 1
+        assert not report.ok
+        assert report.estimated_bytes == 200
+
+    @patch("b2_cleanup.core.B2Api")
+    def test_report_buckets(self, mock_b2api):
+        """Test that reports for several buckets are aggregated."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+        mock_api.session.list_unfinished_large_files.return_value = unfinished_page(
+            [unfinished_file("file1_id")]
+        )
+        mock_api.session.list_parts.return_value = {
+            "parts": [{"partNumber": 1, "contentLength": 100}],
+            "nextPartNumber": None,
+        }
+
+        tool = B2CleanupTool(override_key_id="test_id", override_key="test_key")
+        sweep = tool.report_buckets(["bucket-a", "bucket-b"])
+
+        assert sweep.buckets == 2
+        assert sweep.estimated_bytes == 200
+        assert sweep.ok
+        mock_api.cancel_large_file.assert_not_called()
+
     @patch("b2_cleanup.core.B2Api")
     def test_cleanup_unfinished_uploads_delete(self, mock_b2api):
         """Test cleanup with actual deletion."""
         mock_api = MagicMock()
         mock_b2api.return_value = mock_api
         
-        # Create mock unfinished files
-        mock_file1 = MagicMock()
-        mock_file1.file_id = "file1_id"
-        mock_file1.file_name = "file1.txt"
-        
-        mock_file2 = MagicMock()
-        mock_file2.file_id = "file2_id"
-        mock_file2.file_name = "file2.txt"
+        # Create unfinished files
+        mock_api.session.list_unfinished_large_files.return_value = unfinished_page(
+            [unfinished_file("file1_id"), unfinished_file("file2_id")]
+        )
         
         mock_bucket = MagicMock()
-        mock_bucket.list_unfinished_large_files.return_value = [mock_file1, mock_file2]
         mock_api.get_bucket_by_name.return_value = mock_bucket
 
         # Initialize with dry_run=False (default)
@@ -176,14 +405,853 @@ class TestB2CleanupTool:
         tool.cleanup_unfinished_uploads("test-bucket")
 
         mock_api.get_bucket_by_name.assert_called_once_with("test-bucket")
-        mock_bucket.list_unfinished_large_files.assert_called_once()
+        mock_api.session.list_unfinished_large_files.assert_called_once()
         
         # Verify cancel_large_file is called for each file
         assert mock_api.cancel_large_file.call_count == 2
         mock_api.cancel_large_file.assert_has_calls([
             call("file1_id"),
             call("file2_id")
-        ])
+        ], any_order=True)
+
+    @patch("b2_cleanup.core.B2Api")
+    def test_cleanup_collects_results_from_workers(self, mock_b2api):
+        """Test that concurrent cancellations are summarised per file."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+
+        files = [unfinished_file(f"file{i}_id") for i in range(20)]
+        mock_api.session.list_unfinished_large_files.return_value = unfinished_page(files)
+
+        mock_bucket = MagicMock()
+        mock_api.get_bucket_by_name.return_value = mock_bucket
+
+        tool = B2CleanupTool(
+            override_key_id="test_id", override_key="test_key", workers=4, keep_results=True
+        )
+        summary = tool.cleanup_unfinished_uploads("test-bucket")
+
+        assert mock_api.cancel_large_file.call_count == 20
+        assert summary.found == 20
+        assert summary.cancelled == 20
+        assert summary.failed == 0
+        assert sorted(r[0] for r in summary.results) == sorted(f["fileId"] for f in files)
+
+        # By default only failures are kept, so memory does not grow with the bucket
+        tool = B2CleanupTool(override_key_id="test_id", override_key="test_key", workers=4)
+        summary = tool.cleanup_unfinished_uploads("test-bucket")
+
+        assert summary.cancelled == 20
+        assert len(summary.results) == 0
+
+    @patch("b2_cleanup.core.B2Api")
+    def test_cleanup_cancel_error_isolated(self, mock_b2api, tmp_path):
+        """Test that a permanently failing file is dead-lettered without stopping the run."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+
+        files = [unfinished_file(f"file{i}_id") for i in range(5)]
+        mock_api.session.list_unfinished_large_files.return_value = unfinished_page(files)
+        mock_bucket = MagicMock()
+        mock_api.get_bucket_by_name.return_value = mock_bucket
+
+        def cancel(file_id):
+            if file_id == "file2_id":
+                raise Exception("API error")
+
+        mock_api.cancel_large_file.side_effect = cancel
+        dead_letter_file = tmp_path / "dead.jsonl"
+
+        tool = B2CleanupTool(
+            override_key_id="test_id",
+            override_key="test_key",
+            dead_letter_file=str(dead_letter_file),
+        )
+        summary = tool.cleanup_unfinished_uploads("test-bucket")
+        tool.close()
+
+        # Permanent errors are not retried
+        assert mock_api.cancel_large_file.call_count == 5
+        assert summary.cancelled == 4
+        assert summary.failed == 1
+        assert not summary.ok
+        assert [(file_id, str(error)) for file_id, _, error in summary.results] == [
+            ("file2_id", "API error")
+        ]
+        assert [json.loads(line) for line in dead_letter_file.read_text().splitlines()] == [
+            {
+                "bucket": "test-bucket",
+                "fileId": "file2_id",
+                "fileName": "file2_id.txt",
+                "error": "API error",
+                "attempts": 1,
+            }
+        ]
+
+    @patch("b2_cleanup.core.RETRY_BASE_DELAY", 0.01)
+    @patch("b2_cleanup.core.B2Api")
+    def test_cleanup_retries_transient_errors(self, mock_b2api):
+        """Test that transient failures are retried until they succeed or run out."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+
+        mock_api.session.list_unfinished_large_files.return_value = unfinished_page(
+            [unfinished_file("flaky_id"), unfinished_file("down_id"), unfinished_file("ok_id")]
+        )
+        mock_api.get_bucket_by_name.return_value = MagicMock()
+        attempts = {}
+
+        def cancel(file_id):
+            attempts[file_id] = attempts.get(file_id, 0) + 1
+            if file_id == "down_id" or (file_id == "flaky_id" and attempts[file_id] == 1):
+                raise B2ConnectionError("connection reset")
+
+        mock_api.cancel_large_file.side_effect = cancel
+
+        tool = B2CleanupTool(override_key_id="test_id", override_key="test_key", max_retries=2)
+        summary = tool.cleanup_unfinished_uploads("test-bucket")
+
+        assert attempts == {"flaky_id": 2, "down_id": 3, "ok_id": 1}
+        assert summary.found == 3
+        assert summary.cancelled == 2
+        assert summary.failed == 1
+
+    @patch("b2_cleanup.core.RETRY_BASE_DELAY", 0.01)
+    @patch("b2_cleanup.core.B2Api")
+    def test_cleanup_metrics(self, mock_b2api, tmp_path):
+        """Test that a run records its metrics and writes them on close."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+
+        mock_api.session.list_unfinished_large_files.return_value = unfinished_page(
+            [unfinished_file("known_id"), unfinished_file("down_id"), unfinished_file("ok_id")]
+        )
+        mock_api.get_bucket_by_name.return_value = MagicMock()
+
+        def cancel(file_id):
+            if file_id == "down_id":
+                raise B2ConnectionError("connection reset")
+
+        mock_api.cancel_large_file.side_effect = cancel
+        metrics_file = tmp_path / "b2_cleanup.prom"
+
+        tool = B2CleanupTool(
+            override_key_id="test_id",
+            override_key="test_key",
+            max_retries=1,
+            metrics_file=str(metrics_file),
+        )
+        tool.part_cache.put("known_id", 1000)
+        tool.cleanup_unfinished_uploads("test-bucket")
+        tool.close()
+
+        metrics = tool.metrics
+        assert metrics.found.value(bucket="test-bucket") == 3
+        assert metrics.cancelled.value(bucket="test-bucket") == 2
+        assert metrics.failed.value(bucket="test-bucket") == 1
+        assert metrics.reclaimed_bytes.value(bucket="test-bucket") == 1000
+        assert metrics.retries.value() == 1
+        assert metrics.list_seconds.count() == 1
+        assert metrics.cancel_seconds.count() == 4
+        text = metrics_file.read_text()
+        assert 'b2_cleanup_uploads_cancelled_total{bucket="test-bucket"} 2' in text
+        assert "b2_cleanup_last_run_timestamp_seconds " in text
+        assert "b2_cleanup_concurrency_limit " in text
+
+    @patch("b2_cleanup.core.B2Api")
+    def test_replay_dead_letters(self, mock_b2api, tmp_path):
+        """Test that a dead-letter file is replayed and rewritten with what still fails."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+        dead_letter_file = tmp_path / "dead.jsonl"
+        dead_letter_file.write_text(
+            json.dumps({"bucket": "a", "fileId": "file1_id", "fileName": "one"}) + "\n"
+            + json.dumps({"bucket": "b", "fileId": "file2_id", "fileName": "two"}) + "\n"
+        )
+
+        def cancel(file_id):
+            if file_id == "file2_id":
+                raise Exception("still broken")
+
+        mock_api.cancel_large_file.side_effect = cancel
+
+        tool = B2CleanupTool(
+            override_key_id="test_id",
+            override_key="test_key",
+            dead_letter_file=str(dead_letter_file),
+        )
+        sweep = tool.replay_dead_letters(str(dead_letter_file))
+        tool.close()
+
+        assert sweep.cancelled == 1
+        assert sweep.failed == 1
+        mock_api.session.list_unfinished_large_files.assert_not_called()
+        records = [json.loads(line) for line in dead_letter_file.read_text().splitlines()]
+        assert [(r["bucket"], r["fileId"]) for r in records] == [("b", "file2_id")]
+
+    @patch("b2_cleanup.core.B2Api")
+    def test_interrupted_replay_keeps_dead_letters(self, mock_b2api, tmp_path):
+        """Test that a replay into its own file leaves it intact until the replay finishes."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+        dead_letter_file = tmp_path / "dead.jsonl"
+        original = (
+            json.dumps({"bucket": "a", "fileId": "file1_id", "fileName": "one"}) + "\n"
+            + json.dumps({"bucket": "b", "fileId": "file2_id", "fileName": "two"}) + "\n"
+        )
+        dead_letter_file.write_text(original)
+        seen = []
+
+        def cancel(file_id):
+            # The file is untouched while the replay runs
+            seen.append(dead_letter_file.read_text())
+            raise Exception("still broken")
+
+        mock_api.cancel_large_file.side_effect = cancel
+
+        tool = B2CleanupTool(
+            override_key_id="test_id",
+            override_key="test_key",
+            workers=1,
+            dead_letter_file=str(dead_letter_file),
+        )
+        # The process dies after the first bucket
+        with patch.object(tool, "_log_outcome", side_effect=[None, RuntimeError("crash")]):
+            with pytest.raises(RuntimeError):
+                tool.replay_dead_letters(str(dead_letter_file))
+        tool.close()
+
+        assert seen == [original, original]
+        assert dead_letter_file.read_text() == original
+        assert [p.name for p in tmp_path.iterdir()] == ["dead.jsonl"]
+
+    @patch("b2_cleanup.core.B2Api")
+    def test_plan_then_apply(self, mock_b2api, tmp_path):
+        """Test that a plan is written without cancelling and applied without listing."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+        mock_api.session.list_unfinished_large_files.return_value = unfinished_page(
+            [
+                unfinished_file("file1_id", upload_timestamp=1000),
+                unfinished_file("file2_id", upload_timestamp=2000),
+                unfinished_file("file3_id", upload_timestamp=3000),
+            ]
+        )
+        plan_file = tmp_path / "plan.jsonl"
+
+        tool = B2CleanupTool(
+            override_key_id="test_id", override_key="test_key", plan_file=str(plan_file)
+        )
+        summary = tool.cleanup_unfinished_uploads("test-bucket")
+        tool.close()
+
+        assert summary.found == 3
+        mock_api.cancel_large_file.assert_not_called()
+        records = [json.loads(line) for line in plan_file.read_text().splitlines()]
+        assert [(r["bucket"], r["fileId"], r["uploadTimestamp"]) for r in records] == [
+            ("test-bucket", "file1_id", 1000),
+            ("test-bucket", "file2_id", 2000),
+            ("test-bucket", "file3_id", 3000),
+        ]
+
+        mock_api.reset_mock()
+        tool = B2CleanupTool(override_key_id="test_id", override_key="test_key", page_size=2)
+        sweep = tool.apply_plan(str(plan_file))
+
+        assert sweep.cancelled == 3
+        assert [s.bucket_name for s in sweep.summaries] == ["test-bucket"]
+        mock_api.session.list_unfinished_large_files.assert_not_called()
+        mock_api.get_bucket_by_name.assert_not_called()
+        assert sorted(c.args[0] for c in mock_api.cancel_large_file.call_args_list) == [
+            "file1_id", "file2_id", "file3_id"
+        ]
+
+    @patch("b2_cleanup.core.B2Api")
+    def test_failed_plan_not_published(self, mock_b2api, tmp_path):
+        """Test that a plan whose listing failed is discarded instead of looking complete."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+        pages = {
+            None: unfinished_page([unfinished_file("file1_id")], next_file_id="file2_id"),
+            "file2_id": RuntimeError("listing failed"),
+        }
+
+        def list_page(bucket_id, start_file_id, *args):
+            page = pages[start_file_id]
+            if isinstance(page, Exception):
+                raise page
+            return page
+
+        mock_api.session.list_unfinished_large_files.side_effect = list_page
+        plan_file = tmp_path / "plan.jsonl"
+
+        tool = B2CleanupTool(
+            override_key_id="test_id", override_key="test_key", plan_file=str(plan_file)
+        )
+        with pytest.raises(RuntimeError):
+            tool.cleanup_unfinished_uploads("test-bucket")
+        tool.close(ok=False)
+
+        assert list(tmp_path.iterdir()) == []
+
+    @patch("b2_cleanup.core.B2Api")
+    def test_apply_validates_plan_first(self, mock_b2api, tmp_path):
+        """Test that nothing is cancelled when a plan contains an invalid line."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+        plan_file = tmp_path / "plan.jsonl"
+        plan_file.write_text(
+            json.dumps({"bucket": "a", "fileId": "file1_id", "fileName": "one"}) + "\n"
+            + "not json\n"
+        )
+
+        tool = B2CleanupTool(override_key_id="test_id", override_key="test_key")
+        with pytest.raises(ValueError):
+            tool.apply_plan(str(plan_file))
+
+        mock_api.cancel_large_file.assert_not_called()
+
+    @patch("b2_cleanup.core.B2Api")
+    def test_shards_split_bucket(self, mock_b2api, tmp_path):
+        """Test that tools claiming shards through leases cancel each upload once."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+        file_ids = [f"file{i}_id" for i in range(60)]
+        mock_api.session.list_unfinished_large_files.side_effect = (
+            lambda *args: unfinished_page([unfinished_file(f) for f in file_ids])
+        )
+
+        tools = [
+            B2CleanupTool(
+                override_key_id="test_id",
+                override_key="test_key",
+                shard=(None, 3),
+                lease_dir=str(tmp_path),
+            )
+            for _ in range(3)
+        ]
+        summaries = [tool.cleanup_unfinished_uploads("test-bucket") for tool in tools]
+        for tool in tools:
+            tool.close()
+
+        assert sorted(tool.shard[0] for tool in tools) == [1, 2, 3]
+        cancelled = [c.args[0] for c in mock_api.cancel_large_file.call_args_list]
+        assert sorted(cancelled) == sorted(file_ids)
+        assert sum(s.cancelled for s in summaries) == len(file_ids)
+        assert os.listdir(tmp_path) == []
+
+    def test_shard_auto_requires_lease_dir(self):
+        """Test that a shard without an index needs a lease directory."""
+        with pytest.raises(ValueError):
+            B2CleanupTool(override_key_id="test_id", override_key="test_key", shard=(None, 2))
+
+    @patch("b2_cleanup.core.B2Api")
+    def test_cleanup_auto_partition(self, mock_b2api):
+        """Test that discovered partitions are listed separately and merged."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+        names = ["a/1", "a/2", "b/1", "c"]
+        mock_api.session.list_file_versions.side_effect = (
+            lambda bucket_id, start_file_name, start_file_id, count, prefix: {
+                "files": [{"fileName": n} for n in names if n >= (start_file_name or "")][:count]
+            }
+        )
+
+        def list_page(bucket_id, start_file_id, max_file_count, prefix):
+            return unfinished_page(
+                [unfinished_file(f"{n}_id", n) for n in names if n.startswith(prefix)]
+            )
+
+        mock_api.session.list_unfinished_large_files.side_effect = list_page
+
+        tool = B2CleanupTool(
+            override_key_id="test_id", override_key="test_key", auto_partition=True
+        )
+        summary = tool.cleanup_unfinished_uploads("test-bucket")
+
+        prefixes = {c.args[3] for c in mock_api.session.list_unfinished_large_files.call_args_list}
+        assert prefixes == {"a/", "b/", "c"}
+        cancelled = [c.args[0] for c in mock_api.cancel_large_file.call_args_list]
+        assert sorted(cancelled) == ["a/1_id", "a/2_id", "b/1_id", "c_id"]
+        assert summary.cancelled == 4
+
+    @patch("b2_cleanup.core.B2Api")
+    def test_auto_partition_within_call_budget(self, mock_b2api):
+        """Test that partition discovery counts against the API-call budget."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+        names = [f"{i}/file" for i in range(50)]
+        mock_api.session.list_file_versions.side_effect = (
+            lambda bucket_id, start_file_name, start_file_id, count, prefix: {
+                "files": [{"fileName": n} for n in sorted(names) if n >= (start_file_name or "")][:count]
+            }
+        )
+
+        tool = B2CleanupTool(
+            override_key_id="test_id", override_key="test_key", auto_partition=True,
+            max_api_calls=10,
+        )
+        summary = tool.cleanup_unfinished_uploads("test-bucket")
+        tool.close()
+
+        assert mock_api.session.list_file_versions.call_count == 10
+        mock_api.session.list_unfinished_large_files.assert_not_called()
+        assert summary.stopped == "API call"
+
+    @patch("b2_cleanup.core.B2Api")
+    def test_cleanup_streams_while_listing(self, mock_b2api):
+        """Test that cancellation starts before the listing is exhausted."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+
+        def list_page(bucket_id, start_file_id, max_file_count):
+            i = int(start_file_id or 0)
+            if i >= 3:
+                # With a window of one (and one page prefetched), earlier
+                # files must already be cancelled
+                mock_api.cancel_large_file.assert_any_call(f"file{i - 3}_id")
+            next_file_id = str(i + 1) if i < 5 else None
+            return unfinished_page([unfinished_file(f"file{i}_id")], next_file_id)
+
+        mock_api.session.list_unfinished_large_files.side_effect = list_page
+        mock_bucket = MagicMock()
+        mock_api.get_bucket_by_name.return_value = mock_bucket
+
+        tool = B2CleanupTool(
+            override_key_id="test_id",
+            override_key="test_key",
+            workers=1,
+            max_in_flight=1,
+            page_size=1,
+        )
+        summary = tool.cleanup_unfinished_uploads("test-bucket")
+
+        assert summary.found == 6
+        assert summary.cancelled == 6
+
+    @patch("b2_cleanup.core.B2Api")
+    def test_cleanup_resumes_from_checkpoint(self, mock_b2api, tmp_path):
+        """Test that an interrupted run resumes from the journaled cursor."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+
+        interrupted = [True]
+
+        def list_page(bucket_id, start_file_id, max_file_count):
+            i = int(start_file_id or 0)
+            if i == 3 and interrupted[0]:
+                raise KeyboardInterrupt
+            next_file_id = str(i + 1) if i < 4 else None
+            return unfinished_page([unfinished_file(f"file{i}_id")], next_file_id)
+
+        mock_api.session.list_unfinished_large_files.side_effect = list_page
+        mock_api.get_bucket_by_name.return_value = MagicMock()
+        state_file = str(tmp_path / "state.jsonl")
+        tool_args = dict(
+            override_key_id="test_id",
+            override_key="test_key",
+            workers=1,
+            max_in_flight=1,
+            page_size=1,
+            state_file=state_file,
+        )
+
+        tool = B2CleanupTool(**tool_args)
+        with pytest.raises(KeyboardInterrupt):
+            tool.cleanup_unfinished_uploads("test-bucket")
+        tool.close()
+
+        interrupted[0] = False
+        mock_api.session.list_unfinished_large_files.reset_mock()
+        mock_api.cancel_large_file.reset_mock()
+
+        tool = B2CleanupTool(**tool_args)
+        summary = tool.cleanup_unfinished_uploads("test-bucket")
+        tool.close()
+
+        first_call = mock_api.session.list_unfinished_large_files.call_args_list[0]
+        assert first_call == call(mock_api.get_bucket_by_name.return_value.id_, "2", 1)
+        assert [c.args[0] for c in mock_api.cancel_large_file.call_args_list] == [
+            "file2_id", "file3_id", "file4_id"
+        ]
+        assert summary.cancelled == 3
+
+        # A completed bucket starts from scratch on the next run
+        tool = B2CleanupTool(**tool_args)
+        assert tool.journal.cursor("test-bucket") is None
+        tool.close()
+
+    @patch("b2_cleanup.core.B2Api")
+    def test_throttling_response_lowers_concurrency(self, mock_b2api):
+        """Test that 429/503 responses from B2 feed the rate controller."""
+        mock_b2api.return_value = MagicMock()
+
+        tool = B2CleanupTool(override_key_id="test_id", override_key="test_key", workers=8)
+        session = tool._http_session()
+        assert tool.limiter.limit == 8
+
+        ok = MagicMock(status_code=200, headers={})
+        throttled = MagicMock(status_code=429, headers={"Retry-After": "0"})
+        for hook in session.hooks["response"]:
+            hook(ok)
+            hook(throttled)
+
+        assert tool.limiter.limit == 4
+        assert tool.limiter.throttled == 1
+        assert tool.metrics.throttled.value() == 1
+
+    @patch("b2_cleanup.core.B2Api")
+    def test_single_throttle_slows_bucket(self, mock_b2api):
+        """Test that one throttle leaves fewer calls in flight than there are workers."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+        mock_api.session.list_unfinished_large_files.return_value = unfinished_page(
+            [unfinished_file(f"file{i}_id") for i in range(8)]
+        )
+        lock = threading.Lock()
+        release = threading.Event()
+        active = [0]
+        peak = [0]
+
+        def cancel(file_id):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            release.wait(5)
+            with lock:
+                active[0] -= 1
+
+        mock_api.cancel_large_file.side_effect = cancel
+
+        tool = B2CleanupTool(override_key_id="test_id", override_key="test_key", workers=4)
+        tool._on_response(MagicMock(status_code=429, headers={}))
+        run = threading.Thread(target=tool.cleanup_unfinished_uploads, args=("test-bucket",))
+        run.start()
+        time.sleep(0.2)
+        in_flight = peak[0]
+        release.set()
+        run.join()
+
+        assert in_flight == 2
+        assert mock_api.cancel_large_file.call_count == 8
+
+    @patch("b2_cleanup.core.B2Api")
+    def test_sweep_widens_limiter(self, mock_b2api):
+        """Test that a sweep sizes the limiter to the buckets processed at a time."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+        mock_api.session.list_unfinished_large_files.return_value = unfinished_page([])
+        tool = B2CleanupTool(
+            override_key_id="test_id", override_key="test_key", workers=4, bucket_workers=4
+        )
+        maxima = []
+        cleanup = tool.cleanup_unfinished_uploads
+
+        def record(bucket_name, interactive):
+            maxima.append(tool.limiter.maximum)
+            return cleanup(bucket_name, interactive)
+
+        with patch.object(tool, "cleanup_unfinished_uploads", side_effect=record):
+            tool.cleanup_buckets(["bucket-a", "bucket-b"])
+
+        assert maxima == [8, 8]
+        assert tool.limiter.maximum == 4
+
+    def test_invalid_max_in_flight(self):
+        """Test that the in-flight window cannot be smaller than the pool."""
+        with pytest.raises(ValueError):
+            B2CleanupTool(workers=4, max_in_flight=2)
+
+    @patch("b2_cleanup.core.B2Api")
+    def test_resolve_bucket_names(self, mock_b2api):
+        """Test that glob patterns expand against the available buckets."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+        names = ["backup-a", "backup-b", "logs", "media"]
+        mock_api.list_buckets.return_value = [MagicMock() for _ in names]
+        for bucket, name in zip(mock_api.list_buckets.return_value, names):
+            bucket.name = name
+
+        tool = B2CleanupTool(override_key_id="test_id", override_key="test_key")
+
+        assert tool.resolve_bucket_names(["backup-*", "logs", "backup-a", "nope-*"]) == [
+            "backup-a", "backup-b", "logs"
+        ]
+
+    @patch("b2_cleanup.core.B2Api")
+    def test_cleanup_buckets_aggregates(self, mock_b2api):
+        """Test that a sweep aggregates per-bucket results and isolates failures."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+        names = ["bucket-a", "bucket-b", "bucket-c"]
+        mock_api.list_buckets.return_value = [MagicMock() for _ in names]
+        for bucket, name in zip(mock_api.list_buckets.return_value, names):
+            bucket.name = name
+
+        def get_bucket(name):
+            if name == "bucket-c":
+                raise Exception("Bucket not found")
+            bucket = MagicMock()
+            bucket.id_ = name
+            return bucket
+
+        def list_page(bucket_id, start_file_id, max_file_count):
+            return unfinished_page(
+                [unfinished_file(f"{bucket_id}-file{i}") for i in range(3)]
+            )
+
+        mock_api.get_bucket_by_name.side_effect = get_bucket
+        mock_api.session.list_unfinished_large_files.side_effect = list_page
+
+        tool = B2CleanupTool(
+            override_key_id="test_id", override_key="test_key", bucket_workers=2
+        )
+        sweep = tool.cleanup_buckets(all_buckets=True)
+
+        assert sweep.buckets == 3
+        assert sweep.found == 6
+        assert sweep.cancelled == 6
+        assert sorted(s.bucket_name for s in sweep.summaries) == ["bucket-a", "bucket-b"]
+        assert list(sweep.errors) == ["bucket-c"]
+        assert mock_api.cancel_large_file.call_count == 6
+
+    @patch("b2_cleanup.core.B2Api")
+    def test_oldest_first_within_cancel_budget(self, mock_b2api):
+        """Test that the oldest uploads of the whole bucket are cancelled first."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+        pages = {
+            None: unfinished_page(
+                [unfinished_file("new_id", upload_timestamp=5000),
+                 unfinished_file("oldest_id", upload_timestamp=1000)],
+                next_file_id="mid_id",
+            ),
+            "mid_id": unfinished_page(
+                [unfinished_file("mid_id", upload_timestamp=3000),
+                 unfinished_file("old_id", upload_timestamp=2000)],
+            ),
+        }
+        mock_api.session.list_unfinished_large_files.side_effect = (
+            lambda bucket_id, start_file_id, *args: pages[start_file_id]
+        )
+
+        tool = B2CleanupTool(
+            override_key_id="test_id", override_key="test_key", workers=1,
+            max_cancels=2, order="oldest",
+        )
+        summary = tool.cleanup_unfinished_uploads("test-bucket")
+        tool.close()
+
+        assert mock_api.cancel_large_file.call_args_list == [call("oldest_id"), call("old_id")]
+        assert (summary.found, summary.cancelled, summary.remaining) == (4, 2, 2)
+        assert summary.stopped == "cancellation"
+
+    @patch("b2_cleanup.core.OLDEST_FIRST_LIMIT", 2)
+    @patch("b2_cleanup.core.B2Api")
+    def test_oldest_first_without_budget_cancels_everything(self, mock_b2api):
+        """Test that a bucket larger than one oldest-first pass is drained in several passes."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+        files = [
+            unfinished_file("new_id", upload_timestamp=5000),
+            unfinished_file("oldest_id", upload_timestamp=1000),
+            unfinished_file("mid_id", upload_timestamp=3000),
+            unfinished_file("old_id", upload_timestamp=2000),
+            unfinished_file("newest_id", upload_timestamp=6000),
+        ]
+        mock_api.session.list_unfinished_large_files.return_value = unfinished_page(files)
+
+        tool = B2CleanupTool(
+            override_key_id="test_id", override_key="test_key", workers=1, order="oldest",
+        )
+        summary = tool.cleanup_unfinished_uploads("test-bucket")
+        tool.close()
+
+        assert mock_api.cancel_large_file.call_args_list == [
+            call("oldest_id"), call("old_id"), call("mid_id"), call("new_id"), call("newest_id"),
+        ]
+        assert mock_api.session.list_unfinished_large_files.call_count == 3
+        assert (summary.found, summary.cancelled, summary.remaining) == (5, 5, 0)
+        assert summary.stopped is None
+        assert summary.ok
+
+    @pytest.mark.parametrize("order, max_list_calls", [("oldest", 5), ("listing", 2)])
+    @patch("b2_cleanup.core.B2Api")
+    def test_spent_budget_stops_listing_other_buckets(self, mock_b2api, order, max_list_calls):
+        """Test that buckets reached after the budget is spent are not listed."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+
+        def list_page(bucket_id, start_file_id, max_file_count):
+            i = int(start_file_id or 0)
+            return unfinished_page(
+                [unfinished_file(f"{bucket_id}-file{i}-{j}") for j in range(3)],
+                next_file_id=str(i + 1) if i < 4 else None,
+            )
+
+        mock_api.session.list_unfinished_large_files.side_effect = list_page
+        mock_api.get_bucket_by_name.side_effect = lambda name: MagicMock(id_=name)
+
+        tool = B2CleanupTool(
+            override_key_id="test_id", override_key="test_key", workers=1,
+            bucket_workers=1, page_size=3, max_cancels=2, order=order,
+        )
+        sweep = tool.cleanup_buckets(["bucket-a", "bucket-b", "bucket-c"])
+        tool.close()
+
+        # One bucket of five pages is enough to spend two cancellations
+        assert mock_api.session.list_unfinished_large_files.call_count <= max_list_calls
+        assert mock_api.get_bucket_by_name.call_count == 1
+        assert sweep.cancelled == 2
+        skipped = [s for s in sweep.summaries if s.found == 0]
+        assert len(skipped) == 2
+        assert all(s.stopped == "cancellation" for s in skipped)
+
+    @patch("b2_cleanup.core.B2Api")
+    def test_api_call_budget_stops_cleanly(self, mock_b2api, tmp_path):
+        """Test that a run stops within its call budget and leaves the rest resumable."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+        mock_api.session.list_unfinished_large_files.side_effect = (
+            lambda bucket_id, start_file_id, *args: unfinished_page(
+                [unfinished_file(f"{start_file_id or 'f0'}_{i}") for i in range(3)],
+                next_file_id=f"f{int((start_file_id or 'f0')[1:]) + 1}",
+            )
+        )
+        state_file = tmp_path / "state.jsonl"
+
+        tool = B2CleanupTool(
+            override_key_id="test_id", override_key="test_key",
+            max_api_calls=10, state_file=str(state_file),
+        )
+        summary = tool.cleanup_unfinished_uploads("test-bucket")
+        tool.close()
+
+        calls = (
+            mock_api.session.list_unfinished_large_files.call_count
+            + mock_api.cancel_large_file.call_count
+        )
+        assert calls == 10
+        assert summary.stopped == "API call"
+        assert summary.found == summary.cancelled + summary.remaining
+        assert summary.cancelled == mock_api.cancel_large_file.call_count
+        assert not any(json.loads(line).get("complete") for line in state_file.read_text().splitlines())
+
+    @patch("b2_cleanup.core.B2Api")
+    def test_duration_budget_spent_before_listing(self, mock_b2api):
+        """Test that nothing is listed or cancelled once the time budget has run out."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+        mock_api.session.list_unfinished_large_files.return_value = unfinished_page(
+            [unfinished_file("file1_id")]
+        )
+
+        tool = B2CleanupTool(override_key_id="test_id", override_key="test_key", max_duration=0.01)
+        time.sleep(0.02)
+        summary = tool.cleanup_unfinished_uploads("test-bucket")
+        tool.close()
+
+        mock_api.session.list_unfinished_large_files.assert_not_called()
+        mock_api.cancel_large_file.assert_not_called()
+        assert summary.stopped == "time"
+        assert summary.ok
+
+    @patch("b2_cleanup.core.B2Api")
+    def test_dry_run_cancel_budget(self, mock_b2api):
+        """Test that a dry run reports only as many uploads as the budget would cancel."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+        mock_api.session.list_unfinished_large_files.return_value = unfinished_page(
+            [unfinished_file(f"file{i}_id") for i in range(3)]
+        )
+
+        tool = B2CleanupTool(
+            dry_run=True, override_key_id="test_id", override_key="test_key", max_cancels=2
+        )
+        summary = tool.cleanup_unfinished_uploads("test-bucket")
+
+        assert (summary.found, summary.remaining, summary.stopped) == (3, 1, "cancellation")
+
+    @patch("b2_cleanup.core.B2Api")
+    def test_watch_cancels_due_uploads_without_listing(self, mock_b2api):
+        """Test that ticks between rescans cancel remembered uploads once they are due."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+        mock_api.get_bucket_by_name.return_value = MagicMock()
+        older_than = 3600
+        # Too recent at the first tick, due well before the second one
+        recent = (time.time() - older_than + 0.05) * 1000
+        mock_api.session.list_unfinished_large_files.return_value = unfinished_page(
+            [
+                unfinished_file("old_id", upload_timestamp=0),
+                unfinished_file("recent_id", upload_timestamp=recent),
+            ]
+        )
+
+        tool = B2CleanupTool(
+            override_key_id="test_id", override_key="test_key", older_than=older_than
+        )
+        tool.watch(["test-bucket"], interval=0.2, rescan_interval=10, ticks=2)
+
+        mock_api.session.list_unfinished_large_files.assert_called_once()
+        assert mock_api.cancel_large_file.call_args_list == [call("old_id"), call("recent_id")]
+        assert tool.metrics.cancelled.value(bucket="test-bucket") == 2
+        tool.close()
+
+    @patch("b2_cleanup.core.B2Api")
+    def test_watch_rescans_every_tick_by_default(self, mock_b2api):
+        """Test that every tick lists the buckets when no rescan interval is set."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+        mock_api.get_bucket_by_name.return_value = MagicMock()
+        mock_api.session.list_unfinished_large_files.return_value = unfinished_page([])
+
+        tool = B2CleanupTool(override_key_id="test_id", override_key="test_key")
+        tool.watch(["test-bucket"], interval=0.01, ticks=3)
+
+        assert mock_api.session.list_unfinished_large_files.call_count == 3
+        # The API was authorized once, not per tick
+        mock_api.authorize_account.assert_called_once()
+
+    @patch("b2_cleanup.core.B2Api")
+    def test_watch_rejects_state_file(self, mock_b2api, tmp_path):
+        """Test that a watch cannot use a checkpoint journal."""
+        mock_b2api.return_value = MagicMock()
+        tool = B2CleanupTool(
+            override_key_id="test_id",
+            override_key="test_key",
+            state_file=str(tmp_path / "state.jsonl"),
+        )
+
+        with pytest.raises(ValueError, match="state file"):
+            tool.watch(["test-bucket"], interval=1, ticks=1)
+        tool.close()
+
+    def test_invalid_bucket_workers(self):
+        """Test that a bucket worker count below one is rejected."""
+        with pytest.raises(ValueError):
+            B2CleanupTool(bucket_workers=0)
+
+    def test_invalid_worker_count(self):
+        """Test that a worker count below one is rejected."""
+        with pytest.raises(ValueError):
+            B2CleanupTool(workers=0)
+
+    @patch("b2_cleanup.core.B2Api")
+    def test_named_bucket_skips_bucket_listing(self, mock_b2api):
+        """Test that buckets are only enumerated when they are needed."""
+        mock_api = MagicMock()
+        mock_b2api.return_value = mock_api
+        mock_api.session.list_unfinished_large_files.return_value = unfinished_page([])
+
+        tool = B2CleanupTool(override_key_id="test_id", override_key="test_key")
+        tool.cleanup_unfinished_uploads("test-bucket", interactive=False)
+
+        mock_api.list_buckets.assert_not_called()
+
+        tool.available_buckets
+        tool.available_buckets
+        mock_api.list_buckets.assert_called_once()
 
     @patch("b2_cleanup.core.B2Api")
     def test_cleanup_nonexistent_bucket(self, mock_b2api):
@@ -243,6 +1311,13 @@ class TestB2CleanupTool:
             assert "my-real-bucket" in error_msg
             assert "my-other-bucket" in error_msg
 
+        # The bucket list is fetched and indexed once for every lookup
+        with patch('builtins.input', return_value='n'):
+            with pytest.raises(RuntimeError):
+                tool.cleanup_unfinished_uploads("my-reel-bucket", interactive=True)
+        mock_api.list_buckets.assert_called_once()
+        assert tool.bucket_index is tool.bucket_index
+
     @patch("b2_cleanup.core.B2Api")
     def test_interactive_single_suggestion_accepted(self, mock_b2api):
         """Test accepting a single bucket name suggestion."""
@@ -259,6 +1334,7 @@ class TestB2CleanupTool:
             Exception("Bucket not found"),  # First call (with typo)
             MagicMock()  # Second call (with corrected name)
         ]
+        mock_api.session.list_unfinished_large_files.return_value = unfinished_page([])
         
         # Mock the user accepting the suggestion
         with patch('builtins.input', return_value='y'):
@@ -290,6 +1366,7 @@ class TestB2CleanupTool:
             Exception("Bucket not found"),  # First call (with typo)
             MagicMock()  # Second call (with selected name)
         ]
+        mock_api.session.list_unfinished_large_files.return_value = unfinished_page([])
         
         # Mock the user selecting option 2
         with patch('builtins.input', return_value='2'):
@@ -374,7 +1451,7 @@ class TestB2CleanupTool:
         
         # Mock successful bucket access after selection
         mock_bucket = MagicMock()
-        mock_bucket.list_unfinished_large_files.return_value = []
+        mock_api.session.list_unfinished_large_files.return_value = unfinished_page([])
         mock_api.get_bucket_by_name.return_value = mock_bucket
         
         # Mock user selecting option 2
@@ -384,7 +1461,7 @@ class TestB2CleanupTool:
         
         # Should have selected the second bucket
         mock_api.get_bucket_by_name.assert_called_once_with("bucket-two")
-        mock_bucket.list_unfinished_large_files.assert_called_once()
+        mock_api.session.list_unfinished_large_files.assert_called_once()
 
     @patch("b2_cleanup.core.B2Api")
     def test_no_bucket_non_interactive(self, mock_b2api):
@@ -0,0 +1,104 @@
+"""Tests for reading b2 CLI credentials."""
+
+import os
+
+import pytest
+from b2sdk.v2 import SqliteAccountInfo
+
+from b2_cleanup.credentials import b2_cli_account_info_path, read_b2_cli_credentials
+
+
+def write_account_info(path, key_id="cli_key_id", key="cli_key"):
+    """Create a b2 CLI account-info database as `b2 account authorize` would."""
+    info = SqliteAccountInfo(file_name=str(path))
+    info.set_auth_data(
+        account_id="account",
+        auth_token="token",
+        api_url="https://api.example",
+        download_url="https://f000.example",
+        recommended_part_size=100 * 1024 * 1024,
+        absolute_minimum_part_size=5 * 1024 * 1024,
+        application_key=key,
+        realm="production",
+        s3_api_url="https://s3.example",
+        allowed=dict(bucketId=None, bucketName=None, capabilities=["listBuckets"], namePrefix=None),
+        application_key_id=key_id,
+    )
+    return path
+
+
+@pytest.fixture
+def home(tmp_path, monkeypatch):
+    """Point HOME at an empty directory and clear b2 location overrides."""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.delenv("B2_ACCOUNT_INFO", raising=False)
+    monkeypatch.delenv("XDG_CONFIG_HOME", raising=False)
+    return tmp_path
+
+
+class TestB2CliAccountInfoPath:
+    """Test locating the b2 CLI account-info database."""
+
+    def test_env_var_wins(self, home, monkeypatch):
+        """Test that B2_ACCOUNT_INFO takes precedence."""
+        (home / ".b2_account_info").touch()
+        monkeypatch.setenv("B2_ACCOUNT_INFO", str(home / "custom"))
+
+        assert b2_cli_account_info_path() == str(home / "custom")
+
+    def test_legacy_file(self, home):
+        """Test that an existing ~/.b2_account_info is used."""
+        (home / ".b2_account_info").touch()
+
+        assert b2_cli_account_info_path() == str(home / ".b2_account_info")
+
+    def test_xdg_config_home(self, home, monkeypatch):
+        """Test that $XDG_CONFIG_HOME/b2/account_info is used."""
+        config = home / "xdg"
+        (config / "b2").mkdir(parents=True)
+        (config / "b2" / "account_info").touch()
+        monkeypatch.setenv("XDG_CONFIG_HOME", str(config))
+
+        assert b2_cli_account_info_path() == str(config / "b2" / "account_info")
+
+    def test_nothing_found(self, home):
+        """Test that no path is returned, and nothing created, without a database."""
+        assert b2_cli_account_info_path() is None
+        assert os.listdir(home) == []
+
+
+class TestReadB2CliCredentials:
+    """Test reading credentials from the b2 CLI account-info database."""
+
+    def test_reads_credentials(self, tmp_path):
+        """Test that the stored key ID and application key are returned."""
+        path = write_account_info(tmp_path / "account_info")
+
+        assert read_b2_cli_credentials(str(path)) == ("cli_key_id", "cli_key")
+
+    def test_default_location(self, home, monkeypatch):
+        """Test that the b2 CLI location is used when no path is given."""
+        write_account_info(home / ".b2_account_info")
+
+        assert read_b2_cli_credentials() == ("cli_key_id", "cli_key")
+
+    def test_missing_file(self, tmp_path):
+        """Test that a missing database yields no credentials and is not created."""
+        path = tmp_path / "account_info"
+
+        assert read_b2_cli_credentials(str(path)) is None
+        assert not path.exists()
+
+    def test_not_authorized(self, tmp_path):
+        """Test that a database without an account yields no credentials."""
+        path = tmp_path / "account_info"
+        SqliteAccountInfo(file_name=str(path))
+
+        assert read_b2_cli_credentials(str(path)) is None
+
+    def test_not_a_database(self, tmp_path):
+        """Test that a corrupt file yields no credentials."""
+        path = tmp_path / "account_info"
+        path.write_text("not a database")
+
+        assert read_b2_cli_credentials(str(path)) is None
@@ -0,0 +1,106 @@
+"""Tests for upload selection filters."""
+
+import pytest
+
+from b2_cleanup.filters import UploadFilter, parse_duration, parse_shard, shard_of
+from tests.test_core import unfinished_file
+
+NOW = 1_700_000_000
+
+
+class TestParseDuration:
+    """Test the parse_duration function."""
+
+    @pytest.mark.parametrize(
+        "value, seconds",
+        [
+            ("90", 90),
+            ("90s", 90),
+            ("30m", 1800),
+            ("12h", 43200),
+            ("7d", 604800),
+            ("2w", 1209600),
+            ("1d12h", 129600),
+            ("1.5h", 5400),
+            (" 3D ", 259200),
+        ],
+    )
+    def test_valid(self, value, seconds):
+        """Test that supported units and compound durations are parsed."""
+        assert parse_duration(value) == seconds
+
+    @pytest.mark.parametrize("value", ["", "h", "7y", "-1d", "1d 2h", "soon"])
+    def test_invalid(self, value):
+        """Test that malformed durations are rejected."""
+        with pytest.raises(ValueError):
+            parse_duration(value)
+
+
+class TestShards:
+    """Test shard parsing and assignment."""
+
+    @pytest.mark.parametrize(
+        "value, shard", [("1/1", (1, 1)), ("2/4", (2, 4)), ("auto/8", (None, 8))]
+    )
+    def test_parse(self, value, shard):
+        """Test that shard specifications are parsed."""
+        assert parse_shard(value) == shard
+
+    @pytest.mark.parametrize("value", ["0/4", "5/4", "1/0", "4", "a/b", "1/4/2"])
+    def test_parse_invalid(self, value):
+        """Test that malformed or out-of-range shards are rejected."""
+        with pytest.raises(ValueError):
+            parse_shard(value)
+
+    def test_shards_partition_file_ids(self):
+        """Test that every file ID lands in exactly one shard, roughly evenly."""
+        file_ids = [f"4_z27c88f1d182b150646ff0b16_f2{i:020d}_m{i}" for i in range(4000)]
+        shards = [
+            {f for f in file_ids if UploadFilter(shard=(i, 4))(unfinished_file(f))}
+            for i in range(1, 5)
+        ]
+
+        assert set().union(*shards) == set(file_ids)
+        assert sum(len(s) for s in shards) == len(file_ids)
+        assert all(800 < len(s) < 1200 for s in shards)
+        assert all(shard_of(f, 4) == 1 for f in shards[0])
+
+
+class TestUploadFilter:
+    """Test the UploadFilter class."""
+
+    def test_older_than(self):
+        """Test that uploads started after the cutoff are skipped."""
+        upload_filter = UploadFilter(older_than=3600, now=NOW)
+        old = unfinished_file("old_id", upload_timestamp=(NOW - 7200) * 1000)
+        new = unfinished_file("new_id", upload_timestamp=(NOW - 60) * 1000)
+
+        assert upload_filter(old)
+        assert not upload_filter(new)
+        assert upload_filter.skipped == 1
+
+    def test_keep_recent(self):
+        """Test that uploads rejected only for their age are collected."""
+        upload_filter = UploadFilter(older_than=3600, exclude=["*.keep"], now=NOW, keep_recent=True)
+        new_timestamp = (NOW - 60) * 1000
+
+        assert not upload_filter(unfinished_file("new_id", "a.bin", upload_timestamp=new_timestamp))
+        assert not upload_filter(unfinished_file("kept_id", "a.keep", upload_timestamp=new_timestamp))
+        assert upload_filter.recent == [(new_timestamp, "new_id", "a.bin")]
+        assert UploadFilter(older_than=3600).recent is None
+
+    def test_exclude(self):
+        """Test that file names matching an exclude pattern are skipped."""
+        upload_filter = UploadFilter(exclude=["db/*", "*.keep"])
+
+        assert upload_filter(unfinished_file("a", "logs/app.log"))
+        assert not upload_filter(unfinished_file("b", "db/dump.sql"))
+        assert not upload_filter(unfinished_file("c", "logs/app.keep"))
+        assert upload_filter.skipped == 2
+
+    def test_no_criteria_selects_everything(self):
+        """Test that a filter without criteria selects every upload."""
+        upload_filter = UploadFilter()
+
+        assert upload_filter(unfinished_file("a", upload_timestamp=NOW * 1000))
+        assert upload_filter.skipped == 0
@@ -0,0 +1,77 @@
+"""Tests for the checkpoint journal."""
+
+import json
+
+from b2_cleanup.journal import CheckpointJournal
+
+
+def read_records(path):
+    """Return the records in a journal file."""
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+class TestCheckpointJournal:
+    """Test the CheckpointJournal class."""
+
+    def test_new_journal_is_empty(self, tmp_path):
+        """Test that a new journal has no progress recorded."""
+        journal = CheckpointJournal(str(tmp_path / "state.jsonl"))
+
+        assert journal.cursor("bucket") is None
+        assert not journal.is_cancelled("bucket", "file1_id")
+        journal.close()
+
+    def test_progress_survives_reopen(self, tmp_path):
+        """Test that cursors and cancelled files are restored per bucket."""
+        path = str(tmp_path / "state.jsonl")
+        journal = CheckpointJournal(path)
+        journal.record_cancelled("bucket", "file1_id")
+        journal.record_cursor("bucket", "file2_id")
+        journal.record_cursor("bucket", "file5_id")
+        journal.record_cancelled("other", "file9_id")
+        journal.close()
+
+        journal = CheckpointJournal(path)
+        assert journal.cursor("bucket") == "file5_id"
+        assert journal.is_cancelled("bucket", "file1_id")
+        assert not journal.is_cancelled("bucket", "file9_id")
+        assert journal.is_cancelled("other", "file9_id")
+        journal.close()
+
+    def test_complete_resets_bucket(self, tmp_path):
+        """Test that a completed bucket starts from scratch next time."""
+        path = str(tmp_path / "state.jsonl")
+        journal = CheckpointJournal(path)
+        journal.record_cancelled("bucket", "file1_id")
+        journal.record_cursor("bucket", "file2_id")
+        journal.record_complete("bucket")
+        journal.close()
+
+        journal = CheckpointJournal(path)
+        assert journal.cursor("bucket") is None
+        assert not journal.is_cancelled("bucket", "file1_id")
+        journal.close()
+
+    def test_compacted_on_open(self, tmp_path):
+        """Test that superseded records are dropped when the journal is opened."""
+        path = tmp_path / "state.jsonl"
+        journal = CheckpointJournal(str(path))
+        journal.record_cursor("bucket", "file2_id")
+        journal.record_cursor("bucket", "file3_id")
+        journal.record_cancelled("done", "file1_id")
+        journal.record_complete("done")
+        journal.close()
+
+        CheckpointJournal(str(path)).close()
+
+        assert read_records(path) == [{"bucket": "bucket", "cursor": "file3_id"}]
+
+    def test_torn_line_ignored(self, tmp_path):
+        """Test that a partially written last line is skipped."""
+        path = tmp_path / "state.jsonl"
+        path.write_text('{"bucket": "bucket", "cursor": "file2_id"}\n{"bucket": "buc')
+
+        journal = CheckpointJournal(str(path))
+
+        assert journal.cursor("bucket") == "file2_id"
+        journal.close()
@@ -0,0 +1,58 @@
+"""Tests for shard leases."""
+
+import os
+import time
+
+import pytest
+
+from b2_cleanup.lease import ShardLease
+
+
+class TestShardLease:
+    """Test the ShardLease class."""
+
+    def test_claims_first_free_shard(self, tmp_path):
+        """Test that each process claims a different shard."""
+        first = ShardLease(str(tmp_path), 2)
+        second = ShardLease(str(tmp_path), 2)
+
+        assert first.acquire() == 1
+        assert second.acquire() == 2
+        with pytest.raises(RuntimeError, match="All 2 shards"):
+            ShardLease(str(tmp_path), 2).acquire()
+
+        first.release()
+        second.release()
+        assert os.listdir(tmp_path) == []
+
+    def test_specific_shard_held(self, tmp_path):
+        """Test that a shard already held cannot be claimed again."""
+        lease = ShardLease(str(tmp_path), 4)
+        lease.acquire(3)
+
+        with pytest.raises(RuntimeError, match="Shard 3/4"):
+            ShardLease(str(tmp_path), 4).acquire(3)
+        lease.release()
+
+    def test_stale_lease_taken_over(self, tmp_path):
+        """Test that a lease left behind by a dead process can be claimed."""
+        stale = ShardLease(str(tmp_path), 1, ttl=30)
+        path = stale.path(1)
+        open(path, "w").close()
+        os.utime(path, (time.time() - 60, time.time() - 60))
+
+        lease = ShardLease(str(tmp_path), 1, ttl=30)
+        assert lease.acquire() == 1
+        lease.release()
+
+    def test_heartbeat_renews_lease(self, tmp_path):
+        """Test that a held lease is kept fresh."""
+        lease = ShardLease(str(tmp_path), 1, ttl=0.3)
+        lease.acquire()
+        path = lease.path(1)
+        os.utime(path, (0, 0))
+
+        time.sleep(0.3)
+
+        assert time.time() - os.stat(path).st_mtime < 0.3
+        lease.release()
@@ -0,0 +1,241 @@
+"""Tests for the paginated unfinished-file listing."""
+
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from b2_cleanup.budget import RunBudget
+from b2_cleanup.filters import UploadFilter
+from b2_cleanup.listing import UnfinishedFileLister, discover_partitions, merge_pages
+from tests.test_core import unfinished_file, unfinished_page
+
+
+def paged_api(page_count, files_per_page=1):
+    """Build a mock B2Api whose listing returns ``page_count`` pages."""
+    api = MagicMock()
+
+    def list_page(bucket_id, start_file_id, max_file_count):
+        i = int(start_file_id or 0)
+        files = [
+            unfinished_file(f"file{i}_{j}_id") for j in range(files_per_page)
+        ]
+        next_file_id = str(i + 1) if i + 1 < page_count else None
+        return unfinished_page(files, next_file_id)
+
+    api.session.list_unfinished_large_files.side_effect = list_page
+    return api
+
+
+def versions_api(names):
+    """Build a mock B2Api whose b2_list_file_versions serves ``names``."""
+    api = MagicMock()
+    names = sorted(names)
+
+    def list_versions(bucket_id, start_file_name, start_file_id, max_file_count, prefix):
+        matching = [
+            n for n in names
+            if n >= (start_file_name or "") and n.startswith(prefix or "")
+        ]
+        return {"files": [{"fileName": n} for n in matching[:max_file_count]]}
+
+    api.session.list_file_versions.side_effect = list_versions
+    return api
+
+
+class TestUnfinishedFileLister:
+    """Test the UnfinishedFileLister class."""
+
+    def test_iterates_all_pages(self):
+        """Test that files from every page are yielded in order."""
+        api = paged_api(3, files_per_page=2)
+
+        lister = UnfinishedFileLister(api, "bucket_id", page_size=2)
+        file_ids = [f.file_id for f in lister]
+
+        assert file_ids == [
+            "file0_0_id", "file0_1_id",
+            "file1_0_id", "file1_1_id",
+            "file2_0_id", "file2_1_id",
+        ]
+        assert lister.pages_fetched == 3
+        api.session.list_unfinished_large_files.assert_any_call("bucket_id", None, 2)
+        api.session.list_unfinished_large_files.assert_any_call("bucket_id", "2", 2)
+
+    def test_pages_expose_cursor(self):
+        """Test that each page reports the cursor to resume after it."""
+        api = paged_api(2)
+
+        pages = list(UnfinishedFileLister(api, "bucket_id").pages())
+
+        assert [cursor for _, cursor in pages] == ["1", None]
+
+    def test_start_file_id(self):
+        """Test that listing resumes from the given cursor."""
+        api = paged_api(3)
+
+        lister = UnfinishedFileLister(api, "bucket_id", start_file_id="2")
+
+        assert [f.file_id for f in lister] == ["file2_0_id"]
+
+    def test_next_page_prefetched(self):
+        """Test that the next page is requested while the current one is processed."""
+        api = MagicMock()
+        second_page_requested = threading.Event()
+
+        def list_page(bucket_id, start_file_id, max_file_count):
+            if start_file_id is None:
+                return unfinished_page([unfinished_file("file0_id")], "1")
+            second_page_requested.set()
+            return unfinished_page([unfinished_file("file1_id")])
+
+        api.session.list_unfinished_large_files.side_effect = list_page
+
+        pages = UnfinishedFileLister(api, "bucket_id").pages()
+        next(pages)
+
+        # The caller has not asked for the second page yet
+        assert second_page_requested.wait(timeout=5)
+        pages.close()
+
+    def test_without_prefetch(self):
+        """Test that pages are fetched strictly on demand without prefetching."""
+        api = paged_api(3)
+
+        pages = UnfinishedFileLister(api, "bucket_id", prefetch=False).pages()
+        next(pages)
+
+        assert api.session.list_unfinished_large_files.call_count == 1
+        assert len(list(pages)) == 2
+
+    def test_listing_error_propagates(self):
+        """Test that an error fetching a page is raised to the caller."""
+        api = MagicMock()
+        api.session.list_unfinished_large_files.side_effect = Exception("API error")
+
+        with pytest.raises(Exception, match="API error"):
+            list(UnfinishedFileLister(api, "bucket_id"))
+
+    def test_prefix_sent_to_server(self):
+        """Test that a prefix is passed to the listing call."""
+        api = MagicMock()
+        api.session.list_unfinished_large_files.return_value = unfinished_page([])
+
+        list(UnfinishedFileLister(api, "bucket_id", page_size=10, prefix="logs/"))
+
+        api.session.list_unfinished_large_files.assert_called_once_with(
+            "bucket_id", None, 10, "logs/"
+        )
+
+    def test_upload_filter(self):
+        """Test that filtered-out entries are dropped but the cursor is kept."""
+        api = MagicMock()
+        api.session.list_unfinished_large_files.return_value = unfinished_page(
+            [unfinished_file("keep_id", "a.bin"), unfinished_file("skip_id", "b.keep")],
+            "next",
+        )
+        upload_filter = UploadFilter(exclude=["*.keep"])
+
+        pages = UnfinishedFileLister(
+            api, "bucket_id", prefetch=False, upload_filter=upload_filter
+        ).pages()
+        files, cursor = next(pages)
+        pages.close()
+
+        assert [f.file_id for f in files] == ["keep_id"]
+        assert cursor == "next"
+        assert upload_filter.skipped == 1
+
+    @pytest.mark.parametrize("page_size", [0, 101])
+    def test_invalid_page_size(self, page_size):
+        """Test that page sizes outside the B2 limits are rejected."""
+        with pytest.raises(ValueError):
+            UnfinishedFileLister(MagicMock(), "bucket_id", page_size=page_size)
+
+
+class TestDiscoverPartitions:
+    """Test the discover_partitions function."""
+
+    def test_top_level_folders_and_files(self):
+        """Test that each top-level folder and loose file becomes one partition."""
+        api = versions_api(
+            ["a/1", "a/2", "a/b/3", "b/1", "readme", "readme.md", "z/9"]
+        )
+
+        partitions = discover_partitions(api, "bucket_id")
+
+        assert partitions == ["a/", "b/", "readme", "z/"]
+        # One call per partition plus the one that finds nothing more
+        assert api.session.list_file_versions.call_count == 5
+
+    def test_under_prefix(self):
+        """Test that partitions are discovered below a prefix."""
+        api = versions_api(["logs/2024/a", "logs/2025/b", "logs/x", "other/c"])
+
+        assert discover_partitions(api, "bucket_id", prefix="logs/") == [
+            "logs/2024/", "logs/2025/", "logs/x",
+        ]
+
+    def test_limit(self):
+        """Test that discovery gives up beyond the limit."""
+        api = versions_api([f"{i}/file" for i in range(5)])
+
+        assert discover_partitions(api, "bucket_id", limit=3) is None
+
+    def test_budget(self):
+        """Test that discovery takes its calls from the budget and stops when it runs out."""
+        api = versions_api([f"{i}/file" for i in range(5)])
+        budget = RunBudget(max_api_calls=2)
+
+        assert discover_partitions(api, "bucket_id", budget=budget) == ["0/", "1/"]
+        assert api.session.list_file_versions.call_count == 2
+        assert budget.out_of_calls == "API call"
+
+
+class TestMergePages:
+    """Test the merge_pages function."""
+
+    def test_merges_all_partitions(self):
+        """Test that the pages of every partition are yielded exactly once."""
+        apis = [paged_api(3), paged_api(2)]
+        listers = [UnfinishedFileLister(api, "bucket_id", prefetch=False) for api in apis]
+
+        pages = list(merge_pages(listers))
+
+        assert len(pages) == 5
+        assert all(cursor is None for _, cursor in pages)
+
+    def test_partitions_listed_concurrently(self):
+        """Test that a slow partition does not hold back the others."""
+        release = threading.Event()
+        slow = MagicMock()
+
+        def slow_page(*args):
+            release.wait(timeout=5)
+            return unfinished_page([unfinished_file("slow_id")])
+
+        slow.session.list_unfinished_large_files.side_effect = slow_page
+        listers = [
+            UnfinishedFileLister(slow, "bucket_id", prefetch=False),
+            UnfinishedFileLister(paged_api(1), "bucket_id", prefetch=False),
+        ]
+
+        pages = merge_pages(listers)
+        files, _ = next(pages)
+        assert files[0].file_id == "file0_0_id"
+        release.set()
+        files, _ = next(pages)
+        assert files[0].file_id == "slow_id"
+        pages.close()
+
+    def test_error_propagates(self):
+        """Test that an error listing one partition is raised to the caller."""
+        failing = MagicMock()
+        failing.session.list_unfinished_large_files.side_effect = Exception("API error")
+        listers = [
+            UnfinishedFileLister(failing, "bucket_id", prefetch=False),
+            UnfinishedFileLister(paged_api(50), "bucket_id", prefetch=False),
+        ]
+
+        with pytest.raises(Exception, match="API error"):
+            list(merge_pages(listers))
@@ -0,0 +1,83 @@
+"""Tests for the CLI logging setup."""
+
+import json
+import logging
+
+import pytest
+
+from b2_cleanup.logs import JsonFormatter, setup_logging
+
+
+@pytest.fixture
+def restore_logging():
+    """Put the root and tool loggers back the way they were."""
+    root = logging.getLogger()
+    tool = logging.getLogger("B2Cleanup")
+    handlers, level, tool_level = root.handlers[:], root.level, tool.level
+    yield
+    root.handlers[:] = handlers
+    root.setLevel(level)
+    tool.setLevel(tool_level)
+
+
+class TestLogging:
+    """Test log formatting and the queued handlers."""
+
+    def test_json_formatter(self):
+        """Test that records become JSON objects that keep their extra fields."""
+        record = logging.LogRecord(
+            "B2Cleanup", logging.INFO, __file__, 1, "Cancelling %s", ("id1",), None
+        )
+        record.bucket = "b"
+
+        entry = json.loads(JsonFormatter().format(record))
+
+        assert entry["level"] == "INFO"
+        assert entry["logger"] == "B2Cleanup"
+        assert entry["message"] == "Cancelling id1"
+        assert entry["bucket"] == "b"
+        assert "args" not in entry
+
+    def test_setup_logging_json(self, tmp_path, restore_logging):
+        """Test that queued lines reach the log file once the listener stops."""
+        log_file = tmp_path / "cleanup.log"
+        listener = setup_logging(str(log_file), "json")
+        logger = logging.getLogger("B2Cleanup")
+        logger.info("found %d", 3, extra={"bucket": "b"})
+        logger.debug("hidden")
+        listener.stop()
+
+        lines = [json.loads(line) for line in log_file.read_text().splitlines()]
+        assert [(line["message"], line["bucket"]) for line in lines] == [("found 3", "b")]
+
+    def test_setup_logging_verbose(self, tmp_path, restore_logging):
+        """Test that verbose logging keeps the tool's debug lines but not other libraries'."""
+        log_file = tmp_path / "cleanup.log"
+        listener = setup_logging(str(log_file), verbose=True)
+        logging.getLogger("B2Cleanup").debug("per upload")
+        logging.getLogger("b2sdk").debug("per request")
+        listener.stop()
+
+        text = log_file.read_text()
+        assert "[DEBUG] per upload" in text
+        assert "per request" not in text
+
+    @pytest.mark.parametrize("log_format", ["json", "text"])
+    def test_setup_logging_keeps_traceback(self, tmp_path, restore_logging, log_format):
+        """Test that a logged exception survives the queue in either format."""
+        log_file = tmp_path / "cleanup.log"
+        listener = setup_logging(str(log_file), log_format)
+        try:
+            raise RuntimeError("boom")
+        except RuntimeError:
+            logging.getLogger("B2Cleanup").exception("failed %s", "id1")
+        listener.stop()
+
+        text = log_file.read_text()
+        if log_format == "json":
+            entry = json.loads(text)
+            assert entry["message"] == "failed id1"
+            assert "RuntimeError: boom" in entry["exception"]
+        else:
+            assert "[ERROR] failed id1\nTraceback" in text
+            assert "RuntimeError: boom" in text
@@ -0,0 +1,69 @@
+"""Tests for bucket-name suggestions."""
+
+import difflib
+import random
+from unittest.mock import patch
+
+from b2_cleanup.matching import MIN_CANDIDATES, BucketNameIndex, trigrams
+
+
+def bucket_names(count, seed=0):
+    """Generate ``count`` distinct, realistically similar bucket names."""
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < count:
+        names.add(
+            f"{rng.choice(['acme', 'globex', 'initech', 'hooli'])}-"
+            f"{rng.choice(['prod', 'staging', 'dev'])}-"
+            f"{rng.choice(['backups', 'logs', 'media', 'exports'])}-{rng.randint(1, 1000)}"
+        )
+    return sorted(names)
+
+
+class TestBucketNameIndex:
+    """Test the BucketNameIndex class."""
+
+    def test_trigrams(self):
+        """Test that names are lowercased and padded before splitting."""
+        assert trigrams("Ab") == {"  a", " ab", "ab "}
+
+    def test_small_index_matches_difflib(self):
+        """Test that a small index ranks exactly like difflib.get_close_matches."""
+        names = ["my-real-bucket", "my-other-bucket", "logs", "my-reel-buckets"]
+        index = BucketNameIndex(names)
+
+        for query in ["my-reel-bucket", "log", "my-bucket", "unrelated"]:
+            assert index.suggest(query) == difflib.get_close_matches(query, names, n=3, cutoff=0.6)
+
+    def test_large_index_finds_typos(self):
+        """Test that a mistyped name in a large index is ranked like difflib ranks it."""
+        names = bucket_names(5000)
+        index = BucketNameIndex(names)
+
+        for name in names[::250]:
+            query = name.replace("-", "_", 1)
+            best = difflib.SequenceMatcher(None, query, name).ratio()
+            suggestions = index.suggest(query)
+            assert difflib.SequenceMatcher(None, query, suggestions[0]).ratio() >= best
+        assert index.suggest("nothing-like-it") == []
+
+    def test_large_index_scores_few_candidates(self):
+        """Test that a lookup in thousands of names scores only a few with SequenceMatcher."""
+        names = bucket_names(5000)
+        index = BucketNameIndex(names)
+        queries = [name[:-1] + "x" for name in names[::50]]
+        scored = []
+
+        class CountingMatcher(difflib.SequenceMatcher):
+            def set_seq1(self, a):
+                # The constructor sets an empty sequence first; only count names
+                if a:
+                    scored.append(a)
+                super().set_seq1(a)
+
+        with patch("b2_cleanup.matching.SequenceMatcher", CountingMatcher):
+            for query in queries:
+                index.suggest(query)
+
+        # difflib.get_close_matches would score all 5000 names per lookup
+        assert len(scored) <= MIN_CANDIDATES * len(queries)
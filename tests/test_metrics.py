@@ -0,0 +1,87 @@
+"""Tests for Prometheus metrics."""
+
+import os
+import urllib.error
+import urllib.request
+
+import pytest
+
+from b2_cleanup.metrics import Counter, Histogram, Metrics
+from b2_cleanup.throttle import AdaptiveLimiter
+
+
+class TestMetrics:
+    """Test the metric types and their exposition."""
+
+    def test_counter_labels(self):
+        """Test that counters are kept per label set and rendered with escaping."""
+        counter = Counter("uploads_total", "Uploads.")
+        counter.inc(bucket="a")
+        counter.inc(2, bucket="a")
+        counter.inc(bucket='b"c')
+
+        assert counter.value(bucket="a") == 3
+        assert counter.value(bucket="missing") == 0
+        assert counter.render() == [
+            "# HELP uploads_total Uploads.",
+            "# TYPE uploads_total counter",
+            'uploads_total{bucket="a"} 3',
+            'uploads_total{bucket="b\\"c"} 1',
+        ]
+
+    def test_histogram_buckets(self):
+        """Test that histogram buckets are cumulative and end with +Inf."""
+        histogram = Histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 2.0):
+            histogram.observe(value)
+
+        assert histogram.count() == 3
+        assert histogram.render()[2:] == [
+            'latency_seconds_bucket{le="0.1"} 1',
+            'latency_seconds_bucket{le="1.0"} 2',
+            'latency_seconds_bucket{le="+Inf"} 3',
+            "latency_seconds_sum 2.55",
+            "latency_seconds_count 3",
+        ]
+
+    def test_observe_limiter(self):
+        """Test that the rate controller's limit and call rate are exported as gauges."""
+        limiter = AdaptiveLimiter(maximum=16)
+        limiter.on_throttle()
+        metrics = Metrics()
+
+        metrics.observe_limiter(limiter)
+
+        text = metrics.render()
+        assert "b2_cleanup_concurrency_limit 8" in text
+        assert "# TYPE b2_cleanup_call_rate gauge" in text
+        assert metrics.call_rate.value() == limiter.rate
+
+    def test_write_textfile(self, tmp_path):
+        """Test that the textfile is written in place with nothing left behind."""
+        metrics = Metrics()
+        metrics.cancelled.inc(bucket="b")
+        metrics.finish()
+        path = tmp_path / "b2_cleanup.prom"
+
+        metrics.write_textfile(str(path))
+
+        assert os.listdir(tmp_path) == ["b2_cleanup.prom"]
+        text = path.read_text()
+        assert "# TYPE b2_cleanup_list_page_seconds histogram" in text
+        assert 'b2_cleanup_uploads_cancelled_total{bucket="b"} 1' in text
+        assert "b2_cleanup_run_duration_seconds " in text
+
+    def test_serve(self):
+        """Test that the metrics are served over HTTP until stopped."""
+        metrics = Metrics()
+        metrics.retries.inc()
+        port = metrics.serve(0)
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+                body = response.read().decode()
+            assert "b2_cleanup_retries_total 1" in body
+            with pytest.raises(urllib.error.HTTPError):
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/other")
+        finally:
+            metrics.stop()
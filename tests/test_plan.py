@@ -0,0 +1,106 @@
+"""Tests for plan files."""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from b2_cleanup.plan import PlanWriter, read_plan
+
+
+def upload(file_id, upload_timestamp=None):
+    """Build a minimal listed upload."""
+    return SimpleNamespace(
+        file_id=file_id, file_name=f"{file_id}.bin", upload_timestamp=upload_timestamp
+    )
+
+
+class TestPlanWriter:
+    """Test the PlanWriter class."""
+
+    def test_round_trip(self, tmp_path):
+        """Test that written entries are read back in order."""
+        path = tmp_path / "plan.jsonl"
+        writer = PlanWriter(str(path))
+        with writer.section("bucket-a") as section:
+            section.write(upload("a1", 1000))
+            section.write(upload("a2"))
+        writer.close()
+
+        entries = list(read_plan(str(path)))
+
+        assert [(e.bucket_name, e.file_id, e.file_name, e.upload_timestamp) for e in entries] == [
+            ("bucket-a", "a1", "a1.bin", 1000),
+            ("bucket-a", "a2", "a2.bin", None),
+        ]
+        assert writer.written == 2
+
+    def test_sections_kept_contiguous(self, tmp_path):
+        """Test that interleaved buckets are written one after the other."""
+        path = tmp_path / "plan.jsonl"
+        writer = PlanWriter(str(path))
+        first = writer.section("bucket-a")
+        second = writer.section("bucket-b")
+        with first, second:
+            first.write(upload("a1"))
+            second.write(upload("b1"))
+            first.write(upload("a2"))
+        writer.close()
+
+        # bucket-b finished first, so it comes first
+        assert [e.file_id for e in read_plan(str(path))] == ["b1", "a1", "a2"]
+
+    def test_failed_section_left_out(self, tmp_path):
+        """Test that a bucket whose listing failed is not in the plan."""
+        path = tmp_path / "plan.jsonl"
+        writer = PlanWriter(str(path))
+        with pytest.raises(RuntimeError):
+            with writer.section("bucket-a") as section:
+                section.write(upload("a1"))
+                raise RuntimeError("listing failed")
+        writer.close()
+
+        assert list(read_plan(str(path))) == []
+
+    def test_plan_appears_on_close(self, tmp_path):
+        """Test that the plan file only exists once it is complete."""
+        path = tmp_path / "plan.jsonl"
+        writer = PlanWriter(str(path))
+        with writer.section("bucket-a") as section:
+            section.write(upload("a1"))
+
+        assert not path.exists()
+        writer.close()
+        assert path.exists()
+        assert [p.name for p in tmp_path.iterdir()] == ["plan.jsonl"]
+
+
+    def test_discard(self, tmp_path):
+        """Test that a discarded plan never appears and leaves no temporary file."""
+        path = tmp_path / "plan.jsonl"
+        writer = PlanWriter(str(path))
+        with writer.section("bucket-a") as section:
+            section.write(upload("a1"))
+        writer.close(discard=True)
+
+        assert list(tmp_path.iterdir()) == []
+
+class TestReadPlan:
+    """Test the read_plan function."""
+
+    def test_comments_and_blank_lines_ignored(self, tmp_path):
+        """Test that a plan can be annotated during review."""
+        path = tmp_path / "plan.jsonl"
+        path.write_text(
+            "# reviewed\n\n" + json.dumps({"bucket": "b", "fileId": "f1", "fileName": "x"}) + "\n"
+        )
+
+        assert [e.file_id for e in read_plan(str(path))] == ["f1"]
+
+    def test_invalid_line(self, tmp_path):
+        """Test that an invalid line is reported with its line number."""
+        path = tmp_path / "plan.jsonl"
+        path.write_text(json.dumps({"bucket": "b", "fileId": "f1"}) + "\n{\"bucket\": \"b\"}\n")
+
+        with pytest.raises(ValueError, match="plan.jsonl:2"):
+            list(read_plan(str(path)))
@@ -0,0 +1,81 @@
+"""Tests for the compact upload records."""
+
+from b2_cleanup.core import CleanupResults
+from b2_cleanup.records import UploadRecord, UploadRecords
+
+
+def file_dict(file_id, upload_timestamp=None):
+    """Build a raw listing entry with the fields the records drop."""
+    entry = {
+        "fileId": file_id,
+        "fileName": f"{file_id}.bin",
+        "contentType": "application/octet-stream",
+        "fileInfo": {"src_last_modified_millis": "0"},
+        "action": "start",
+    }
+    if upload_timestamp is not None:
+        entry["uploadTimestamp"] = upload_timestamp
+    return entry
+
+
+class TestUploadRecord:
+    """Test the UploadRecord class."""
+
+    def test_from_file_dict(self):
+        """Test that only the needed fields of a listing entry are kept."""
+        record = UploadRecord.from_file_dict(file_dict("a", 1000), "bucket")
+
+        assert (record.bucket_name, record.file_id, record.file_name, record.upload_timestamp) == (
+            "bucket", "a", "a.bin", 1000
+        )
+        assert not hasattr(record, "__dict__")
+
+    def test_dict_round_trip(self):
+        """Test that a record survives the plan file format."""
+        record = UploadRecord("bucket", "a", "a.bin", 1000)
+
+        assert UploadRecord.from_dict(record.to_dict()) == record
+
+
+class TestUploadRecords:
+    """Test the UploadRecords class."""
+
+    def test_sequence(self):
+        """Test that appended records read back as equal records."""
+        records = UploadRecords(
+            "bucket",
+            [UploadRecord.from_file_dict(file_dict(f"f{i}", i or None)) for i in range(3)],
+        )
+
+        assert len(records) == 3
+        assert list(records) == [
+            UploadRecord("bucket", "f0", "f0.bin"),
+            UploadRecord("bucket", "f1", "f1.bin", 1),
+            UploadRecord("bucket", "f2", "f2.bin", 2),
+        ]
+        assert records[-1].file_id == "f2"
+
+    def test_setitem(self):
+        """Test that a record can be replaced in place."""
+        records = UploadRecords("bucket", [UploadRecord("bucket", "a", "a.bin", 1)])
+
+        records[0] = UploadRecord("bucket", "b", "b.bin")
+
+        assert list(records) == [UploadRecord("bucket", "b", "b.bin")]
+
+
+class TestCleanupResults:
+    """Test the CleanupResults class."""
+
+    def test_outcomes(self):
+        """Test that outcomes read back as tuples with errors only where they failed."""
+        error = Exception("boom")
+        results = CleanupResults()
+        results.append("a", "a.bin")
+        results.append("b", "b.bin", error)
+        results.append("c", "c.bin")
+
+        assert len(results) == 3
+        assert list(results) == [("a", "a.bin", None), ("b", "b.bin", error), ("c", "c.bin", None)]
+        assert results[1] == ("b", "b.bin", error)
+        assert results[-1] == ("c", "c.bin", None)
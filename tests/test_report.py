@@ -0,0 +1,149 @@
+"""Tests for reclaimable storage reports."""
+
+import json
+import math
+import time
+from unittest.mock import MagicMock, call
+
+import pytest
+
+from b2_cleanup.report import (
+    PartTotalCache,
+    ReclaimReport,
+    SweepReport,
+    count_part_bytes,
+    format_bytes,
+)
+from b2_cleanup.throttle import AdaptiveLimiter
+
+
+def parts_page(sizes, next_part_number=None):
+    """Build a response as returned by b2_list_parts."""
+    return {
+        "parts": [
+            {"partNumber": i + 1, "contentLength": size} for i, size in enumerate(sizes)
+        ],
+        "nextPartNumber": next_part_number,
+    }
+
+
+class TestCountPartBytes:
+    """Test the count_part_bytes function."""
+
+    def test_sums_all_pages(self):
+        """Test that part sizes are summed across listing pages."""
+        api = MagicMock()
+        api.session.list_parts.side_effect = [parts_page([100, 200], 3), parts_page([50])]
+        limiter = AdaptiveLimiter(maximum=2)
+
+        assert count_part_bytes(api, "file_id", limiter=limiter) == 350
+        api.session.list_parts.assert_has_calls(
+            [call("file_id", None, 1000), call("file_id", 3, 1000)]
+        )
+        assert limiter.rate > 0
+
+    def test_no_parts(self):
+        """Test that an upload without parts holds no bytes."""
+        api = MagicMock()
+        api.session.list_parts.return_value = parts_page([])
+
+        assert count_part_bytes(api, "file_id") == 0
+
+
+@pytest.mark.parametrize(
+    "count, text",
+    [(0, "0 B"), (999, "999 B"), (1500, "1.50 KB"), (2.5e9, "2.50 GB"), (4e15, "4000.00 TB")],
+)
+def test_format_bytes(count, text):
+    """Test that byte counts are shown with decimal units."""
+    assert format_bytes(count) == text
+
+
+class TestPartTotalCache:
+    """Test the PartTotalCache class."""
+
+    def test_persisted(self, tmp_path):
+        """Test that saved totals are loaded by a new cache."""
+        path = tmp_path / "parts.json"
+        cache = PartTotalCache(str(path))
+        cache.put("file_id", 1234)
+        cache.save()
+
+        assert PartTotalCache(str(path)).get("file_id") == 1234
+
+    def test_expired_entries_ignored(self, tmp_path):
+        """Test that totals older than the TTL are not used."""
+        path = tmp_path / "parts.json"
+        path.write_text(json.dumps({"file_id": {"bytes": 1, "saved": time.time() - 120}}))
+
+        assert PartTotalCache(str(path), ttl=60).get("file_id") is None
+
+    def test_corrupt_file_ignored(self, tmp_path):
+        """Test that an unreadable cache file is treated as empty."""
+        path = tmp_path / "parts.json"
+        path.write_text("not json")
+
+        assert PartTotalCache(str(path)).get("file_id") is None
+
+
+class TestReclaimReport:
+    """Test the ReclaimReport estimates."""
+
+    def test_exact(self):
+        """Test that a full scan is reported without uncertainty."""
+        report = ReclaimReport("bucket")
+        report.uploads = 2
+        report.add(100)
+        report.add(300)
+
+        assert report.exact
+        assert report.estimated_bytes == 400
+        assert report.margin == 0
+        assert report.bytes_low == report.bytes_high == 400
+        assert report.monthly_cost(0.006) == pytest.approx(400 / 1e9 * 0.006)
+
+    def test_sampled(self):
+        """Test that a sample is scaled up with a confidence interval."""
+        report = ReclaimReport("bucket")
+        report.uploads = 100
+        for size in (100, 200, 300, 400):
+            report.add(size)
+
+        assert not report.exact
+        assert report.estimated_bytes == 25_000
+        # s = 129.1, so 1.96 * 100 * sqrt(s^2 / 4 * (1 - 4 / 100))
+        assert report.margin == pytest.approx(1.96 * 100 * math.sqrt(16666.67 / 4 * 0.96), rel=1e-4)
+        assert report.bytes_low < report.estimated_bytes < report.bytes_high
+
+    def test_lower_bound_never_below_counted(self):
+        """Test that the interval never goes below the bytes actually counted."""
+        report = ReclaimReport("bucket")
+        report.uploads = 3
+        report.add(0)
+        report.add(1000)
+
+        assert report.bytes_low >= 1000
+
+    def test_single_sample_unbounded(self):
+        """Test that one sampled upload gives no upper bound."""
+        report = ReclaimReport("bucket")
+        report.uploads = 10
+        report.add(100)
+
+        assert math.isinf(report.bytes_high)
+        assert report.bytes_low == 100
+
+    def test_sweep_combines_margins(self):
+        """Test that independent bucket margins add in quadrature."""
+        sweep = SweepReport()
+        for _ in range(2):
+            report = ReclaimReport("bucket")
+            report.uploads = 100
+            for size in (100, 200, 300, 400):
+                report.add(size)
+            sweep.add(report)
+
+        assert sweep.uploads == 200
+        assert sweep.estimated_bytes == 50_000
+        assert sweep.margin == pytest.approx(math.sqrt(2) * sweep.reports[0].margin)
+        assert sweep.ok
@@ -0,0 +1,68 @@
+"""Startup-time regression tests for the CLI.
+
+These run a fresh interpreter so that modules already imported by the test
+session don't hide slow imports.
+"""
+
+import subprocess
+import sys
+
+# Cumulative import time budget for b2_cleanup.cli, in microseconds. Importing
+# b2sdk alone takes several times this long.
+IMPORT_BUDGET_US = 150_000
+
+HEAVY_MODULES = ("b2sdk", "requests", "b2_cleanup.core")
+
+
+def run_python(code, *args):
+    """Run ``code`` in a fresh interpreter and return the completed process."""
+    return subprocess.run(
+        [sys.executable, *args, "-c", code],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+
+def cumulative_import_time(importtime_output, module):
+    """Return the cumulative import time of ``module`` from ``-X importtime`` output."""
+    for line in importtime_output.splitlines():
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    raise AssertionError(f"{module} not found in -X importtime output")
+
+
+class TestStartup:
+    """Test that the CLI starts without loading the B2 SDK."""
+
+    def test_cli_import_skips_heavy_modules(self):
+        """Test that importing the CLI does not import b2sdk."""
+        result = run_python(
+            "import sys, b2_cleanup.cli; "
+            f"print([m for m in {HEAVY_MODULES!r} if m in sys.modules])"
+        )
+
+        assert result.stdout.strip() == "[]"
+
+    def test_help_skips_heavy_modules(self):
+        """Test that --help and --version return without importing b2sdk."""
+        result = run_python(
+            "import sys\n"
+            "from b2_cleanup.cli import cli\n"
+            "for args in (['--help'], ['--version']):\n"
+            "    try:\n"
+            "        cli(args)\n"
+            "    except SystemExit:\n"
+            "        pass\n"
+            f"print([m for m in {HEAVY_MODULES!r} if m in sys.modules])"
+        )
+
+        assert result.stdout.strip().splitlines()[-1] == "[]"
+
+    def test_cli_import_time_budget(self):
+        """Test that importing the CLI stays within its time budget."""
+        result = run_python("import b2_cleanup.cli", "-X", "importtime")
+
+        elapsed = cumulative_import_time(result.stderr, "b2_cleanup.cli")
+        assert elapsed < IMPORT_BUDGET_US, f"b2_cleanup.cli took {elapsed} us to import"
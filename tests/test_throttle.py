@@ -0,0 +1,129 @@
+"""Tests for adaptive rate control."""
+
+import threading
+import time
+from email.utils import formatdate
+
+import pytest
+
+from b2_cleanup.throttle import AdaptiveLimiter, parse_retry_after
+
+
+class TestParseRetryAfter:
+    """Test parsing of Retry-After header values."""
+
+    def test_seconds(self):
+        """Test a delay in seconds."""
+        assert parse_retry_after("5") == 5.0
+
+    def test_http_date(self):
+        """Test an HTTP date in the future."""
+        assert 25 < parse_retry_after(formatdate(time.time() + 30, usegmt=True)) <= 30
+
+    @pytest.mark.parametrize("value", [None, "soon"])
+    def test_invalid(self, value):
+        """Test that missing or malformed values yield None."""
+        assert parse_retry_after(value) is None
+
+
+class TestAdaptiveLimiter:
+    """Test the AdaptiveLimiter class."""
+
+    def test_additive_increase(self):
+        """Test that successes raise the limit by about one per round."""
+        limiter = AdaptiveLimiter(maximum=10, initial=4)
+
+        for _ in range(4):
+            limiter.on_success()
+
+        assert limiter.limit == 4
+        for _ in range(2):
+            limiter.on_success()
+        assert limiter.limit == 5
+
+    def test_increase_capped_at_maximum(self):
+        """Test that the limit never exceeds the maximum."""
+        limiter = AdaptiveLimiter(maximum=3)
+
+        for _ in range(100):
+            limiter.on_success()
+
+        assert limiter.limit == 3
+
+    def test_resize_keeps_backoff(self):
+        """Test that resizing scales a throttled limit instead of resetting it."""
+        limiter = AdaptiveLimiter(maximum=10, cooldown=0)
+        limiter.on_throttle()
+
+        limiter.resize(20)
+        assert (limiter.maximum, limiter.limit) == (20, 10)
+        limiter.resize(10)
+        assert (limiter.maximum, limiter.limit) == (10, 5)
+
+    def test_multiplicative_decrease(self):
+        """Test that throttling halves the limit, down to the minimum."""
+        limiter = AdaptiveLimiter(maximum=16, cooldown=0)
+
+        assert limiter.on_throttle()
+        assert limiter.limit == 8
+        for _ in range(10):
+            limiter.on_throttle()
+        assert limiter.limit == 1
+        assert limiter.throttled == 11
+
+    def test_decrease_cooldown(self):
+        """Test that a burst of throttling responses decreases the limit once."""
+        limiter = AdaptiveLimiter(maximum=16, cooldown=60)
+
+        assert limiter.on_throttle()
+        assert not limiter.on_throttle()
+        assert limiter.limit == 8
+
+    def test_retry_after_pauses_new_calls(self):
+        """Test that Retry-After holds back new calls until it has passed."""
+        limiter = AdaptiveLimiter(maximum=4)
+        limiter.on_throttle(retry_after=0.2)
+
+        start = time.monotonic()
+        with limiter:
+            pass
+
+        assert time.monotonic() - start >= 0.15
+
+    def test_limit_bounds_concurrency(self):
+        """Test that no more than limit calls run at once."""
+        limiter = AdaptiveLimiter(maximum=2)
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def call():
+            with limiter:
+                with lock:
+                    active.append(1)
+                    peak.append(len(active))
+                time.sleep(0.01)
+                with lock:
+                    active.pop()
+
+        threads = [threading.Thread(target=call) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert max(peak) == 2
+
+    def test_rate(self):
+        """Test that the rate reflects recent successes."""
+        limiter = AdaptiveLimiter(maximum=4)
+
+        for _ in range(20):
+            limiter.on_success()
+
+        assert limiter.rate == pytest.approx(2.0)
+
+    def test_invalid_limits(self):
+        """Test that an empty range of limits is rejected."""
+        with pytest.raises(ValueError):
+            AdaptiveLimiter(maximum=2, minimum=3)